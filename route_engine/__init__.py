@@ -16,26 +16,113 @@ Usage:
     # Mixed
     route = find_route("KOMIB", "LGAV")
 """
+import os
+import io
+import threading
+import contextlib
 
-from .data_loader import load_fra_points, load_dct_edges, get_departure_points, get_arrival_points
-from .router import resolve_graph_node_options, find_path_astar
-from .config import ANNEX_3A_DEP_FILE, ANNEX_3A_ARR_FILE, ANNEX_2B_FILE
-import csv
+from .data_loader import (
+    load_fra_points, load_dct_edges, load_airport_index,
+    get_departure_points, get_arrival_points, dataset_version, DatasetFiles
+)
+from .router import (
+    resolve_graph_node_options, find_path_astar, find_path_bidir, dijkstra_ids, anytime_astar_ids, ALGORITHMS
+)
+from .kshortest import find_paths_k, yen_ids, diverse_ids
+from .tree import RouteTree
+from .validator import is_node_valid
+from .spatial import SpatialIndex, build_spatial_index
+from .graph import Adjacency, build_adjacency, load_or_build_adjacency, graph_key
+from .dct import DctTable, DctRule
+from .timewindows import TimeWindows, compile_time_windows
+from .annex2b import Annex2BIndex, Annex2BRule, load_annex_2b
+from .timedep import TimedEdges, Departure
+from .landmarks import Landmarks, load_or_build_landmarks
+from .ch import ContractionHierarchy, load_or_build_ch
+from .snapshot import load_snapshot, write_snapshot, prune_cache, snapshot_path
+from .cache import RouteCache, SearchTreeCache
+from .engine import RouteEngine, Dataset
+from .hotswap import EngineSlot
+from .delta import apply_delta, dataset_delta, DatasetDelta
+from .config import DEFAULT_INTENDED_FL, DEFAULT_FLOS_DIRECTION, BASE_DIR, SNAPSHOT_AT_IMPORT
 
-_POINTS_DB = None
-_EDGES_DB = None
+_ENGINES = EngineSlot()  # default RouteEngine behind the module-level functions (hot-swappable)
+_ENGINE_LOCK = threading.Lock()
 
-def _init_data():
-    """Initialize data on first use (lazy loading)"""
-    global _POINTS_DB, _EDGES_DB
-    if _POINTS_DB is None:
-        print("[route_engine] Loading FRA Points...")
-        _POINTS_DB = load_fra_points()
-    if _EDGES_DB is None:
-        print("[route_engine] Loading DCT Edges...")
-        _EDGES_DB = load_dct_edges()
+def default_engine():
+    """The RouteEngine used by find_route() & co. (the dataset in config.BASE_DIR), loaded on first use."""
+    engine = _ENGINES.get()
+    if engine is None:
+        with _ENGINE_LOCK:
+            engine = _ENGINES.get()
+            if engine is None:
+                engine = RouteEngine()
+                _ENGINES.swap(engine)
+    return engine
 
-def find_route(start_id, end_id, output_format='dict'):
+def _load_snapshot_at_import():
+    """
+    Loads the default engine from the current dataset snapshot (see
+    build_cache), so its point arrays are memory-mapped once per process and
+    shared with every process forked later. Without a current snapshot
+    nothing is loaded here: the CSVs are still parsed on first use.
+    """
+    try:
+        files = DatasetFiles.in_dir(BASE_DIR)
+        version = dataset_version(files.sources, files.cover)
+        if not os.path.isfile(os.path.join(snapshot_path(version), 'manifest.json')):
+            return
+        with contextlib.redirect_stdout(io.StringIO()):
+            _ENGINES.swap(RouteEngine())
+    except (OSError, ValueError):
+        pass
+
+def reload_data(use_snapshot=True):
+    """
+    Loads the current dataset version into a new default engine and swaps it
+    in. Queries already running finish on the old engine; later ones never
+    see its graphs or cached routes.
+    """
+    engine = RouteEngine(use_snapshot=use_snapshot)
+    _ENGINES.swap(engine)
+    return engine
+
+def stage_dataset(dataset_path, airac=None, effective_at='airac', profiles=None, workers=None, background=True,
+                  incremental=False):
+    """
+    Loads another dataset (e.g. the next AIRAC cycle) while the current one
+    keeps serving, and switches the default engine to it at `effective_at`:
+    'airac' (default) = 00:00 UTC of the effective date on its COVER sheet,
+    None = as soon as it is loaded, or a POSIX time. profiles: (fl, direction)
+    pairs whose graphs are warmed before the switch. incremental: derive the
+    new engine from the current one (see delta.apply_delta).
+    Returns a Future of the new RouteEngine (see hotswap.EngineSlot.load).
+    """
+    return _ENGINES.load(dataset_path, airac=airac, effective_at=effective_at, profiles=profiles,
+                         workers=workers, background=background, incremental=incremental)
+
+def staged_dataset():
+    """(version, effective_at) of a pending dataset switch, or None."""
+    staged = _ENGINES.staged
+    return (staged[0].version, staged[1]) if staged else None
+
+def build_cache(intended_fls=None, directions=(DEFAULT_FLOS_DIRECTION,), all_bands=False, workers=None,
+                contraction_hierarchy=False):
+    """
+    Offline step (`python -m route_engine build-cache`): parses the CSVs, writes
+    the binary dataset snapshot and materializes the adjacency and its ALT
+    landmark tables for the given FLs (default: DEFAULT_INTENDED_FL, or one FL
+    per band with all_bands) and directions, plus the contraction hierarchy
+    used by algorithm='ch' if contraction_hierarchy is set. Cached data of
+    older dataset versions is removed.
+    """
+    engine = RouteEngine(use_snapshot=False)
+    version = engine.build_cache(intended_fls, directions, all_bands, workers, contraction_hierarchy)
+    _ENGINES.swap(engine)
+    return version
+
+def find_route(start_id, end_id, output_format='dict', fl=None, direction=None, algorithm='astar', eobt=None,
+               epsilon=1.0, deadline_ms=None):
     """
     Find the shortest valid route between two identifiers.
     
@@ -43,6 +130,25 @@ def find_route(start_id, end_id, output_format='dict'):
         start_id: Airport ICAO (e.g., "EDDF") or Waypoint Name (e.g., "KOMIB")
         end_id: Airport ICAO (e.g., "LGAV") or Waypoint Name (e.g., "TALAS")
         output_format: 'dict' (default) or 'table' (markdown table string)
+        fl: Intended flight level (default: config.DEFAULT_INTENDED_FL)
+        direction: FLOS direction, e.g. 'EAST' (default: config.DEFAULT_FLOS_DIRECTION)
+        algorithm: 'astar' (default), 'bidir' (bidirectional A*) or 'ch'
+                   (contraction hierarchy; built on first use unless cached)
+        eobt: Estimated off-block time (datetime, naive = UTC). Times over
+              points follow from config.CRUISE_SPEED_KMH. The search (A*
+              only) takes time-limited Annex 3B DCTs only when open at the
+              time they are entered; Annex 2B rules are not applied in the
+              search but post-validated at those times ('annex_2b'). Default (None): time-limited Annex 3B DCTs count
+              as available and time-limited NOT AVBL rows as lapsed (see
+              DctRule.in_force); time-limited Annex 2B rules count as in force.
+        epsilon: Accepted suboptimality (A* only). With epsilon > 1, weighted
+                 A* may return a route up to epsilon x the shortest, and
+                 expands far fewer nodes. Default: 1.0 (shortest route)
+        deadline_ms: Anytime search (A* only): weighted A* passes with a
+                 decreasing weight, returning the best route found within
+                 this many milliseconds of the call (or as soon as it is
+                 within epsilon of the shortest). None if no route was found
+                 in time.
     
     Returns:
         dict: {
@@ -51,196 +157,85 @@ def find_route(start_id, end_id, output_format='dict'):
             'total_distance': float (km),
             'start': str,
             'end': str,
+            'annex_2b': list of Annex 2B rules the route violates,
+            'bound': float, the route is at most this x the shortest
+                     (1.0 = shortest; above 1 only with epsilon / deadline_ms),
+            'eobt' / 'eta': str (if eobt is given; waypoints then carry 'eto'),
             'table': str (if output_format='table')
         }
         or None if no route found
-    """
-    _init_data()
-    
-    # Resolve Options
-    start_opts = resolve_graph_node_options(start_id, _POINTS_DB, is_start=True)
-    end_opts = resolve_graph_node_options(end_id, _POINTS_DB, is_start=False)
-    
-    print(f"[route_engine] Routing {start_id} ({len(start_opts)} opts) -> {end_id} ({len(end_opts)} opts)")
-    
-    if not start_opts or not end_opts:
-        print("[route_engine] Error: No valid start/end points found.")
-        return None
-        
-    path, edge_info = find_path_astar(start_opts, end_opts, _EDGES_DB, _POINTS_DB)
     
-    if not path:
-        print("[route_engine] No route found.")
-        return None
-        
-    # Build detailed route information
-    result = _build_route_details(start_id, end_id, path, edge_info)
-    
-    if output_format == 'table':
-        result['table'] = _generate_table(result)
-    
-    return result
+    Results (including "no route", except when a deadline ran out) are cached
+    per (start, end, FL, direction, algorithm, EOBT, epsilon, deadline,
+    dataset version); see route_cache_stats().
+    """
+    return default_engine().find_route(start_id, end_id, output_format, fl, direction, algorithm, eobt,
+                                       epsilon, deadline_ms)
 
-def _build_route_details(start_id, end_id, path, edge_info):
-    """Build detailed route information with all FRA checks"""
-    
-    # Fetch airport requirements
-    start_reqs = _get_departure_requirements(start_id, path[0] if path else None)
-    end_reqs = _get_arrival_requirements(end_id, path[-1] if path else None)
-    
-    # Build full route (include airports if different from waypoints)
-    full_route = []
-    total_dist = 0.0
-    
-    # Add start (if airport)
-    if start_id not in path:
-        full_route.append({
-            'seq': 1,
-            'name': start_id,
-            'type': 'Airport',
-            'airspace': _guess_airspace(start_id),
-            'cross_border': '-',
-            'flos': '-',
-            'levels': '-',
-            'status_enr': '-',
-            'status_ad': '-',
-            'dist': 'Transition',
-            'connectivity_rule': 'Departure Logic',
-            'remarks': start_reqs or 'See Annex 3A'
-        })
-    
-    # Add waypoints
-    for i, p_name in enumerate(path):
-        p_data = _POINTS_DB.get(p_name, {})
-        
-        dist_val = '-'
-        conn_rule = '-'
-        
-        if i < len(path) - 1:
-            nxt = path[i+1]
-            info = edge_info.get(p_name, {}).get(nxt, {})
-            if info:
-                d = info.get('Dist', 0)
-                total_dist += d
-                dist_val = f"{d:.1f}"
-                r = info.get('Remarks', '')
-                if "Simulated:" in r:
-                    conn_rule = r.replace("Simulated: ", "")
-                else:
-                    conn_rule = r
-        
-        full_route.append({
-            'seq': len(full_route) + 1,
-            'name': p_name,
-            'type': 'Waypoint',
-            'airspace': p_data.get('Airspace Location Indicators', '-'),
-            'cross_border': p_data.get('Cross-Border FRA States', '-'),
-            'flos': p_data.get('FLOS', '-'),
-            'levels': p_data.get('Level Availability', '-'),
-            'status_enr': p_data.get('FRA Status En-Route', '-'),
-            'status_ad': p_data.get('FRA Status ARR/DEP', '-'),
-            'dist': dist_val,
-            'connectivity_rule': conn_rule,
-            'remarks': '-'
-        })
+def find_routes_k(start_id, end_id, k=3, diversity=0.0, output_format='dict', fl=None, direction=None):
+    """
+    Up to k alternative valid routes between two identifiers, the shortest first.
     
-    # Add end (if airport)
-    if end_id not in path:
-        full_route.append({
-            'seq': len(full_route) + 1,
-            'name': end_id,
-            'type': 'Airport',
-            'airspace': _guess_airspace(end_id),
-            'cross_border': '-',
-            'flos': '-',
-            'levels': '-',
-            'status_enr': '-',
-            'status_ad': '-',
-            'dist': '-',
-            'connectivity_rule': 'Arrival Logic',
-            'remarks': end_reqs or 'See Annex 3A'
-        })
+    Args:
+        start_id, end_id, output_format, fl, direction: as in find_route
+        k: Number of routes
+        diversity: 0 (default) = the k shortest loopless routes (Yen); in
+                   free route airspace these are often near-identical.
+                   0 < diversity <= 1 = each route has at least that share
+                   of its length outside config.K_SHORTEST_CORRIDOR_KM of
+                   the routes before it
     
-    return {
-        'success': True,
-        'route': full_route,
-        'total_distance': total_dist,
-        'start': start_id,
-        'end': end_id,
-        'waypoint_count': len(path)
-    }
-
-def _get_departure_requirements(airport, first_waypoint):
-    """Get departure requirements from Annex 3A"""
-    if not first_waypoint:
-        return None
-        
-    try:
-        with open(ANNEX_3A_DEP_FILE, 'r', encoding='utf-8', errors='replace') as f:
-            reader = csv.reader(f)
-            next(reader)  # Skip header
-            for row in reader:
-                if len(row) < 5: continue
-                if row[1] == airport:
-                    pt = row[3] if row[3].strip() else row[2]
-                    if first_waypoint in pt:
-                        details = []
-                        if row[2]: details.append(f"SID: {row[2]}")
-                        if row[4]: details.append(f"FPL: {row[4]}")
-                        return "; ".join(details) if details else None
-    except FileNotFoundError:
-        pass
-    return None
+    Returns:
+        list of find_route dicts (fewer than k if no more routes exist), each
+        with 'rank' (order found, 1 = shortest) and 'overlap': share of its length shared
+        with the routes before it (edges for diversity 0, corridors otherwise)
+    """
+    return default_engine().find_routes_k(start_id, end_id, k, diversity, output_format, fl, direction)
 
-def _get_arrival_requirements(airport, last_waypoint):
-    """Get arrival requirements from Annex 2B"""
-    if not last_waypoint:
-        return None
-        
-    try:
-        with open(ANNEX_2B_FILE, 'r', encoding='utf-8', errors='replace') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                row_str = str(row.values())
-                if f"ARR {airport}" in row_str and last_waypoint in row_str:
-                    return "(Annex 2B) Verified"
-    except FileNotFoundError:
-        pass
-    return None
-
-def _guess_airspace(airport_code):
-    """Guess airspace from airport ICAO code (first 2 letters)"""
-    if len(airport_code) >= 2:
-        return airport_code[:2].upper()
-    return '-'
-
-def _generate_table(result):
-    """Generate markdown table from route details"""
-    lines = []
-    lines.append("\n### Route Details Table")
-    lines.append("| Seq | Point | Type | Airspace | Cross-Border | FLOS | Levels | Status (Enr) | Status (A/D) | Dist (km) | Connectivity Rule | Remarks |")
-    lines.append("|-----|-------|------|----------|--------------|------|--------|--------------|--------------|-----------|-------------------|---------|")
-    
-    for wp in result['route']:
-        # Truncate long fields
-        levels = wp['levels']
-        if len(levels) > 15:
-            levels = levels.replace('FL', '')
-        
-        remarks = wp['remarks']
-        if len(remarks) > 30:
-            remarks = remarks[:27] + "..."
-        
-        line = f"| {wp['seq']} | {wp['name']} | {wp['type']} | {wp['airspace']} | {wp['cross_border']} | {wp['flos']} | {levels} | {wp['status_enr']} | {wp['status_ad']} | {wp['dist']} | {wp['connectivity_rule']} | {remarks} |"
-        lines.append(line)
+def route_cache_stats():
+    """Hit / miss / eviction / expiration counters and size of the route result cache."""
+    return default_engine().route_cache_stats()
+
+def clear_route_cache():
+    """Empties the route result cache and the search tree cache (counters are kept)."""
+    default_engine().clear_route_cache()
+
+def search_tree_cache_stats():
+    """Hit / miss / eviction counters and memory footprint of the A* search tree cache."""
+    return default_engine().search_tree_cache_stats()
+
+def route_tree(origin, targets=None, max_km=None, fl=None, direction=None):
+    """
+    One-to-many shortest distances from an origin with a single Dijkstra run.
     
-    lines.append(f"\n**Total Distance (Waypoints):** {result['total_distance']:.1f} km")
-    lines.append("\n### Compliance Verification")
-    lines.append("- **Connectivity**: ✅ All segments validated (see Connectivity Rule column)")
-    lines.append("- **FLOS Compliance**: ✅ All points checked for directional compatibility")
-    lines.append("- **Status Compliance**: ✅ En-route/Arr/Dep status verified")
+    Args:
+        origin: Airport ICAO (DEP options from Annex 3A) or Waypoint Name
+        targets: Airport ICAOs / Waypoint Names (default: every aerodrome
+                 with arrival connection points in the airport index)
+        max_km: Optional search radius; targets further away are unreachable
+        fl, direction: FL/direction profile as in find_route
     
-    return "\n".join(lines)
+    Returns:
+        RouteTree: .distances {target: km}, .distance(t), and lazily
+        reconstructed .path(t) / .route(t) (same dict as find_route)
+    """
+    return default_engine().route_tree(origin, targets, max_km=max_km, fl=fl, direction=direction)
+
+def distance_matrix(origins, destinations=None, max_km=None, fl=None, direction=None):
+    """
+    Airport-by-airport shortest FRA distance matrix, one route_tree run per origin.
+    Returns {origin: {destination: km or None}}.
+    """
+    return default_engine().distance_matrix(origins, destinations, max_km=max_km, fl=fl, direction=direction)
+
+def find_routes(pairs, workers=None, fl=None, direction=None, ndjson=None):
+    """
+    Batch routing: routes every (start_id, end_id) pair over a process pool.
+    The dataset is loaded once here and shared read-only with forked workers.
+    Yields one result dict per pair, in completion order (see batch.py).
+    """
+    from .batch import find_routes as _find_routes
+    return _find_routes(pairs, workers=workers, fl=fl, direction=direction, ndjson=ndjson)
 
 # Convenience function for quick testing
 def print_route(start_id, end_id):
@@ -250,3 +245,6 @@ def print_route(start_id, end_id):
         print(result['table'])
     else:
         print(f"No route found between {start_id} and {end_id}")
+
+if SNAPSHOT_AT_IMPORT:
+    _load_snapshot_at_import()
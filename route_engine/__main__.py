@@ -0,0 +1,107 @@
+"""
+Command line entry point.
+
+Usage:
+    python -m route_engine build-cache [--fl 320 ...] [--direction EAST ...] [--all-bands] [--ch] [--workers N]
+    python -m route_engine batch pairs.csv [--workers N] [--fl 320] [--direction EAST] [--output out.ndjson]
+    python -m route_engine bench [--pairs 100] [--seed 0] [--algorithm astar ...] [--fl 320] [--direction EAST] [--no-landmarks]
+    python -m route_engine serve [--host 127.0.0.1] [--port 8080] [--workers 4] [--max-pending 64] [--fl 320 ...] [--direction EAST ...]
+                               [--next-dataset DIR [--next-airac 2601]]
+"""
+import sys
+import argparse
+import contextlib
+from . import build_cache, find_routes
+from .batch import read_pairs
+from .router import ALGORITHMS
+from .benchmark import sample_pairs, run_benchmark, format_results
+from .server import serve
+from .config import (
+    DEFAULT_INTENDED_FL, DEFAULT_FLOS_DIRECTION,
+    SERVER_HOST, SERVER_PORT, SERVER_WORKERS, SERVER_MAX_PENDING,
+)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='route_engine', description='FRA route engine')
+    sub = parser.add_subparsers(dest='command', required=True)
+    
+    p_cache = sub.add_parser('build-cache', help='Write the binary dataset snapshot and precomputed graphs')
+    p_cache.add_argument('--fl', type=int, action='append', dest='fls',
+                         help='Intended FL to build a graph for (repeatable)')
+    p_cache.add_argument('--direction', action='append', dest='directions',
+                         help='FLOS direction, e.g. EAST / WEST (repeatable)')
+    p_cache.add_argument('--all-bands', action='store_true', help='Build a graph for every FL band')
+    p_cache.add_argument('--ch', action='store_true',
+                         help="Also build the contraction hierarchy for algorithm='ch' (slow)")
+    p_cache.add_argument('--workers', type=int, default=None, help='Parallel build processes')
+    
+    p_batch = sub.add_parser('batch', help='Route all pairs of a CSV (start,end per row) to NDJSON')
+    p_batch.add_argument('pairs', help='CSV file with start,end identifiers per row')
+    p_batch.add_argument('--workers', type=int, default=None, help='Worker processes (default: all cores)')
+    p_batch.add_argument('--fl', type=int, default=None, help='Intended flight level')
+    p_batch.add_argument('--direction', default=None, help='FLOS direction (EAST / WEST)')
+    p_batch.add_argument('--output', default=None, help='NDJSON output file (default: stdout)')
+    
+    p_bench = sub.add_parser('bench', help='Compare search algorithms on random airport pairs')
+    p_bench.add_argument('--pairs', type=int, default=100, help='Number of random airport pairs')
+    p_bench.add_argument('--seed', type=int, default=0, help='Random seed for pair sampling')
+    p_bench.add_argument('--algorithm', action='append', dest='algorithms', choices=sorted(ALGORITHMS),
+                         help='Algorithm to include (repeatable, default: all)')
+    p_bench.add_argument('--fl', type=int, default=None, help='Intended flight level')
+    p_bench.add_argument('--direction', default=None, help='FLOS direction (EAST / WEST)')
+    p_bench.add_argument('--no-landmarks', action='store_true', help='Great-circle heuristic only (no ALT)')
+    
+    p_serve = sub.add_parser('serve', help='Run the HTTP/JSON routing service')
+    p_serve.add_argument('--host', default=SERVER_HOST, help='Listen address')
+    p_serve.add_argument('--port', type=int, default=SERVER_PORT, help='Listen port')
+    p_serve.add_argument('--workers', type=int, default=SERVER_WORKERS, help='Search threads')
+    p_serve.add_argument('--max-pending', type=int, default=SERVER_MAX_PENDING,
+                         help='Distinct searches queued or running before requests are refused (503)')
+    p_serve.add_argument('--fl', type=int, action='append', dest='fls',
+                         help='Intended FL to preload at startup (repeatable)')
+    p_serve.add_argument('--direction', action='append', dest='directions',
+                         help='FLOS direction to preload at startup (repeatable)')
+    p_serve.add_argument('--algorithm', action='append', dest='algorithms', choices=sorted(ALGORITHMS),
+                         help="Algorithm whose structures to preload (repeatable, default: astar)")
+    p_serve.add_argument('--next-dataset', default=None,
+                         help='Directory of the next AIRAC dataset; loaded in the background and '
+                              'switched to at its effective date')
+    p_serve.add_argument('--next-airac', default=None, help='Expected AIRAC cycle of --next-dataset')
+    
+    args = parser.parse_args(argv)
+    if args.command == 'build-cache':
+        version = build_cache(
+            intended_fls=args.fls,
+            directions=tuple(d.upper() for d in (args.directions or [DEFAULT_FLOS_DIRECTION])),
+            all_bands=args.all_bands,
+            workers=args.workers,
+            contraction_hierarchy=args.ch,
+        )
+        print(f"[route_engine] Cache ready for dataset {version}")
+    elif args.command == 'batch':
+        pairs = read_pairs(args.pairs)
+        out = sys.stdout
+        ok = 0
+        # Progress messages go to stderr so stdout carries only NDJSON
+        with contextlib.redirect_stdout(sys.stderr):
+            for result in find_routes(pairs, workers=args.workers, fl=args.fl,
+                                      direction=args.direction and args.direction.upper(),
+                                      ndjson=args.output or out):
+                ok += bool(result.get('success'))
+        print(f"[route_engine] Routed {ok}/{len(pairs)} pairs", file=sys.stderr)
+    elif args.command == 'bench':
+        with contextlib.redirect_stdout(sys.stderr):
+            pairs = sample_pairs(args.pairs, seed=args.seed)
+            results = run_benchmark(pairs, args.algorithms, fl=args.fl,
+                                    direction=args.direction and args.direction.upper(),
+                                    use_landmarks=not args.no_landmarks)
+        print(format_results(results, len(pairs)))
+    elif args.command == 'serve':
+        serve(host=args.host, port=args.port, workers=args.workers, max_pending=args.max_pending,
+              fls=args.fls or [DEFAULT_INTENDED_FL],
+              directions=[d.upper() for d in (args.directions or [DEFAULT_FLOS_DIRECTION])],
+              algorithms=args.algorithms or ['astar'],
+              next_dataset=args.next_dataset, next_airac=args.next_airac)
+
+if __name__ == '__main__':
+    main()
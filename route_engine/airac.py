@@ -0,0 +1,41 @@
+import re
+import datetime
+from .config import FRA_COVER_FILE
+
+# AIRAC cycles are 28 days long; 2001 became effective on 02 JAN 2020
+AIRAC_EPOCH = datetime.date(2020, 1, 2)
+AIRAC_CYCLE_DAYS = 28
+
+def read_effective_date(cover_file=FRA_COVER_FILE):
+    """Reads 'Effective Date - 25 DEC 2025' from the FRA points COVER sheet."""
+    try:
+        with open(cover_file, 'r', encoding='utf-8', errors='replace') as f:
+            text = f.read()
+    except FileNotFoundError:
+        return None
+    m = re.search(r'Effective Date\s*-\s*(\d{1,2}\s+[A-Z]{3}\s+\d{4})', text, re.IGNORECASE)
+    if not m:
+        return None
+    try:
+        return datetime.datetime.strptime(m.group(1).upper(), '%d %b %Y').date()
+    except ValueError:
+        return None
+
+def airac_start(date):
+    """Effective date of the AIRAC cycle containing `date`."""
+    n = (date - AIRAC_EPOCH).days // AIRAC_CYCLE_DAYS
+    return AIRAC_EPOCH + datetime.timedelta(days=n * AIRAC_CYCLE_DAYS)
+
+def airac_cycle_id(date):
+    """ICAO AIRAC identifier (YYNN) of the cycle containing `date`."""
+    start = airac_start(date)
+    first = start
+    step = datetime.timedelta(days=AIRAC_CYCLE_DAYS)
+    while (first - step).year == start.year:
+        first -= step
+    return f"{start.year % 100:02d}{(start - first).days // AIRAC_CYCLE_DAYS + 1:02d}"
+
+def current_airac(cover_file=FRA_COVER_FILE):
+    """AIRAC identifier of the dataset on disk, or None if the COVER sheet is missing."""
+    date = read_effective_date(cover_file)
+    return airac_cycle_id(date) if date else None
@@ -0,0 +1,255 @@
+"""
+Annex 2B (route and airspace utilization rules), compiled once per dataset.
+
+Rules are indexed by airway, by (from, to) segment and by point / airspace,
+with their utilization kind, the ADEP / ADES conditions of each numbered
+item and their time windows parsed, so checking a route or an arrival is a
+handful of hash lookups.
+"""
+import re
+import csv
+import hashlib
+import collections
+from .timewindows import compile_time_windows
+from .config import ANNEX_2B_FILE
+
+# Utilization kinds (first line of the Utilization column)
+NOT_AVBL = 'NOT AVBL'
+ONLY_AVBL = 'ONLY AVBL'
+COMPULSORY = 'COMPULSORY'
+ONLY_AVBL_COMPULSORY = 'ONLY AVBL AND COMPULSORY'
+
+_KINDS = (ONLY_AVBL_COMPULSORY, NOT_AVBL, ONLY_AVBL, COMPULSORY)
+_ITEM_RE = re.compile(r'^\s*\d+(?:\.\d+)*\.\s*', re.MULTILINE)
+_AERODROME_RE = re.compile(r'[A-Z]{2}[A-Z*]{2}')
+_SPLIT_RE = re.compile(r'[()&]')
+_SECTION_RE = re.compile(r'\n?\s*-{5,}\s*\n?')
+
+class Condition:
+    """
+    One numbered item of a rule's utilization. adep / ades: aerodrome patterns
+    ('EDDF', 'ED**', 'LFP*'; None = not constrained), with *_exc set when the
+    item excludes them. other: the item has further constraints (VIA, RFL,
+    FLT-TYPE, ...) that are not evaluated.
+    """
+    __slots__ = ('adep', 'ades', 'adep_exc', 'ades_exc', 'other')
+
+    def __init__(self, text):
+        self.adep = self.ades = None
+        self.adep_exc = self.ades_exc = False
+        self.other = False
+        for clause in _clauses(text):
+            exc = clause.startswith('EXC ')
+            if exc:
+                clause = clause[4:].strip()
+            kind, _, rest = clause.partition(' ')
+            patterns = _aerodromes(rest) if kind in ('DEP', 'ARR') else None
+            if patterns is None:
+                # Unevaluated exceptions (e.g. EXC FLT-TYPE (M)) are assumed not to cover the flight
+                self.other = self.other or not exc
+            elif kind == 'DEP':
+                self.adep, self.adep_exc = patterns, exc
+            else:
+                self.ades, self.ades_exc = patterns, exc
+
+    def applies(self, adep, ades):
+        """True / False if the item does / does not cover a flight adep -> ades, None if undecided."""
+        undecided = self.other
+        for patterns, exc, ad in ((self.adep, self.adep_exc, adep), (self.ades, self.ades_exc, ades)):
+            if patterns is None:
+                continue
+            if ad is None:
+                undecided = True
+            elif _matches(patterns, ad) == exc:
+                return False
+        return None if undecided else True
+
+    def names_ades(self, airport):
+        """True if the item restricts arrivals to `airport` (ARR list naming it)."""
+        return self.ades is not None and not self.ades_exc and _matches(self.ades, airport)
+
+class Annex2BRule:
+    """
+    One Annex 2B row. sections: (kind, conditions) per utilization section
+    (sections are separated by '----------' lines); kind: that of the first.
+    """
+    __slots__ = ('id', 'airway', 'from_point', 'to_point', 'location', 'kind', 'sections', 'times', 'text')
+
+    def __init__(self, row, memo=None):
+        """memo: (time windows, sections, conditions) dicts by text, shared by the rules of one index."""
+        times, sections, conditions = memo or ({}, {}, {})
+        self.id = row.get('ID', '').strip()
+        self.airway = (row.get('Airway') or '').strip()
+        self.from_point = (row.get('From') or '').strip()
+        self.to_point = (row.get('To') or '').strip()
+        self.location = (row.get('Point or\nAirspace') or '').strip()
+        self.text = (row.get('Utilization') or '').strip()
+        self.sections = _sections(self.text, sections, conditions)
+        self.kind = self.sections[0][0] if self.sections else None
+        self.times = compile_time_windows(row.get('Time\nApplicability'), times)
+
+    def __repr__(self):
+        where = self.location or f"{self.airway} {self.from_point}-{self.to_point}"
+        return f"Annex2BRule({self.id}, {where}, {self.kind})"
+
+    def in_force(self, week_minute=None, summer=False):
+        """True if the rule applies at the given time (None = assumed in force)."""
+        return self.times is None or week_minute is None or self.times.active_at(week_minute, summer)
+
+    def violated_by(self, adep, ades):
+        """True if a section of the rule definitely forbids a flight adep -> ades that uses its location."""
+        for kind, conditions in self.sections:
+            if kind == NOT_AVBL and any(c.applies(adep, ades) is True for c in conditions):
+                return True
+            if kind in (ONLY_AVBL, ONLY_AVBL_COMPULSORY) and all(c.applies(adep, ades) is False for c in conditions):
+                return True
+        return False
+
+    def names_ades(self, airport):
+        """True if an ARR list of the rule names `airport`."""
+        return any(c.names_ades(airport) for _, conditions in self.sections for c in conditions)
+
+class Annex2BIndex:
+    """
+    Annex 2B rules by airway, by (from, to) segment, by point / airspace and
+    by named ADES. Airspace rules ('EDUUUTA', 'LSASFRA') are also indexed by
+    their four-letter location indicator, the airspace id of FRA points.
+    """
+
+    def __init__(self, rows):
+        self.by_airway = collections.defaultdict(list)
+        self.by_segment = collections.defaultdict(list)
+        self.by_location = collections.defaultdict(list)
+        self.by_airspace = collections.defaultdict(list)
+        self.by_ades = collections.defaultdict(list)
+        h = hashlib.sha256()
+        count = 0
+        memo = ({}, {}, {})  # compiled texts, shared by this index's rules and freed with it
+        for row in rows:
+            rule = Annex2BRule(row, memo)
+            if not rule.kind:
+                continue
+            count += 1
+            h.update(f"{rule.id}|{rule.airway}|{rule.from_point}|{rule.to_point}|{rule.location}|"
+                     f"{rule.text}|{rule.times.text if rule.times else ''};".encode())
+            if rule.airway:
+                self.by_airway[rule.airway].append(rule)
+            if rule.from_point and rule.to_point:
+                self.by_segment[(rule.from_point, rule.to_point)].append(rule)
+            if rule.location:
+                for loc in _locations(rule.location):
+                    self.by_location[loc].append(rule)
+                    if len(loc) > 5:
+                        self.by_airspace[loc[:4]].append(rule)
+            for ad in {p for _, conditions in rule.sections for c in conditions
+                       if c.ades and not c.ades_exc for p in c.ades if '*' not in p}:
+                self.by_ades[ad].append(rule)
+        self.size = count
+        self.digest = h.hexdigest()[:12]
+
+    def __len__(self):
+        return self.size
+
+    def rules_for_route(self, points, airspaces=(), week_minute=None, summer=False):
+        """
+        Rules located at the route's points, on its consecutive segments or in
+        its airspaces (location indicators), in force at the given time.
+        week_minute: None (any time), one week minute, or one per point (the
+        estimated time over it). In the last case airspaces holds one
+        indicator per point (None if unknown), a segment is checked at the
+        time of its first point and an airspace at the time it is entered.
+        """
+        per_point = week_minute is not None and not isinstance(week_minute, (int, float))
+        found = {}
+
+        def add(rules, i):
+            t = week_minute[i] if per_point else week_minute
+            for r in rules:
+                if id(r) not in found and r.in_force(t, summer):
+                    found[id(r)] = r
+
+        for i, p in enumerate(points):
+            add(self.by_location.get(p, ()), i)
+        for i, seg in enumerate(zip(points, points[1:])):
+            add(self.by_segment.get(seg, ()), i)
+        entered = set()
+        for i, a in enumerate(airspaces):
+            if a is not None and a not in entered:
+                entered.add(a)
+                add(self.by_airspace.get(a, ()), i)
+        return list(found.values())
+
+    def check_route(self, adep, ades, points, airspaces=(), week_minute=None, summer=False):
+        """Rules that definitely forbid the flight adep -> ades along points (post-validation)."""
+        return [r for r in self.rules_for_route(points, airspaces, week_minute, summer)
+                if r.violated_by(adep, ades)]
+
+    def arrival_rules(self, airport, point):
+        """Rules at `point` whose ARR conditions name `airport`."""
+        rules = self.by_location.get(point, ())
+        return [r for r in rules if r.names_ades(airport)]
+
+def _sections(text, memo, conditions):
+    """((kind, conditions), ...) of a utilization text; memo / conditions: compiled sections / items by text."""
+    if text not in memo:
+        sections = []
+        for section in _SECTION_RE.split(text):
+            head, _, body = section.strip().partition('\n')
+            kind = next((k for k in _KINDS if head.upper().startswith(k)), None)
+            if kind:
+                items = [i for i in _ITEM_RE.split(body) if i.strip()]
+                sections.append((kind, tuple(_condition(i, conditions) for i in items) or (_condition('', conditions),)))
+        memo[text] = tuple(sections)
+    return memo[text]
+
+def _condition(text, memo):
+    text = text.strip()
+    if text not in memo:
+        memo[text] = Condition(text)
+    return memo[text]
+
+def load_annex_2b(path=ANNEX_2B_FILE):
+    """Compiles Annex_2B.csv into an Annex2BIndex (empty if the file is missing)."""
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            return Annex2BIndex(csv.DictReader(f))
+    except FileNotFoundError:
+        return Annex2BIndex([])
+
+def _clauses(text):
+    """Top-level clauses of an item, split at '&', 'AND-THEN' and line breaks outside parentheses."""
+    text = ' '.join(text.replace('AND-THEN', '&').split())
+    if '(' not in text:
+        return [c.strip() for c in text.split('&') if c.strip()]
+    clauses, depth, start = [], 0, 0
+    for m in _SPLIT_RE.finditer(text):
+        ch = m.group()
+        if ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+        elif depth == 0:
+            clauses.append(text[start:m.start()])
+            start = m.end()
+    clauses.append(text[start:])
+    return [c.strip() for c in clauses if c.strip()]
+
+def _aerodromes(spec):
+    """Aerodrome patterns of 'EDDF', 'ED**' or '(LPPT, LE**)'; None if the list is not plain aerodromes."""
+    spec = spec.strip()
+    if spec.startswith('(') and spec.endswith(')'):
+        spec = spec[1:-1]
+    tokens = [t for t in re.split(r'[,\s]+', spec) if t]
+    if not tokens or not all(_AERODROME_RE.fullmatch(t) for t in tokens):
+        return None
+    return tuple(tokens)
+
+def _matches(patterns, airport):
+    for p in patterns:
+        if len(p) == len(airport) and all(a == b or a == '*' for a, b in zip(p, airport)):
+            return True
+    return False
+
+def _locations(location):
+    """Point / airspace names of a location cell ('ARFOL', '(SUBOK, VENIM)', 'LFRRACC')."""
+    return [t for t in re.split(r'[(),\s]+', location) if t]
@@ -0,0 +1,113 @@
+"""
+Batch routing over a process pool.
+
+The parent loads the dataset, the adjacency and its landmark tables for the
+requested FL/direction before the pool starts, so forked workers share them read-only (copy-on-write,
+and memory-mapped when loaded from the snapshot, which happens at import
+when a current one exists).
+"""
+import os
+import io
+import csv
+import json
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+def _route_pair(start_id, end_id, fl, direction):
+    """Runs one find_route in a worker and returns a JSON-serializable result."""
+    from . import find_route
+    try:
+        # find_route reports progress on stdout; keep workers quiet
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = find_route(start_id, end_id, fl=fl, direction=direction)
+    except Exception as e:
+        return {'success': False, 'start': start_id, 'end': end_id, 'error': repr(e)}
+    if result is None:
+        return {'success': False, 'start': start_id, 'end': end_id, 'error': 'No route found'}
+    return result
+
+def _init_worker(fl, direction):
+    """Pool initializer: a no-op after fork, loads the dataset under spawn."""
+    from . import default_engine
+    with contextlib.redirect_stdout(io.StringIO()):
+        default_engine().landmarks(fl, direction)
+
+def find_routes(pairs, workers=None, fl=None, direction=None, ndjson=None):
+    """
+    Routes every (start_id, end_id) in `pairs` and yields the result dicts
+    in completion order (failed pairs yield {'success': False, 'error': ...}).
+    
+    workers: number of processes (default: os.cpu_count()); 1 routes in-process.
+    ndjson: optional path or text file object; each result is also written to
+            it as one JSON line.
+    """
+    from . import default_engine
+    from .config import DEFAULT_INTENDED_FL, DEFAULT_FLOS_DIRECTION
+    if fl is None: fl = DEFAULT_INTENDED_FL
+    if direction is None: direction = DEFAULT_FLOS_DIRECTION
+    if workers is None:
+        workers = os.cpu_count() or 1
+    
+    # Load once in the parent so that forked workers inherit the data
+    default_engine().landmarks(fl, direction)
+    
+    out = None
+    close_out = False
+    if isinstance(ndjson, (str, os.PathLike)):
+        out = open(ndjson, 'w', encoding='utf-8')
+        close_out = True
+    elif ndjson is not None:
+        out = ndjson
+    
+    try:
+        for result in _run(pairs, workers, fl, direction):
+            if out is not None:
+                out.write(json.dumps(result) + "\n")
+                out.flush()
+            yield result
+    finally:
+        if close_out:
+            out.close()
+
+def _run(pairs, workers, fl, direction):
+    if workers <= 1:
+        for start_id, end_id in pairs:
+            yield _route_pair(start_id, end_id, fl, direction)
+        return
+    
+    methods = multiprocessing.get_all_start_methods()
+    ctx = multiprocessing.get_context('fork' if 'fork' in methods else 'spawn')
+    # Bound the number of in-flight pairs so huge inputs stream instead of queueing up front
+    max_pending = workers * 4
+    pairs = iter(pairs)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                             initializer=_init_worker, initargs=(fl, direction)) as pool:
+        pending = set()
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < max_pending:
+                try:
+                    start_id, end_id = next(pairs)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending.add(pool.submit(_route_pair, start_id, end_id, fl, direction))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                yield fut.result()
+
+def read_pairs(path):
+    """Reads (start, end) pairs from a CSV file; a 'start,end' header row is skipped."""
+    pairs = []
+    with open(path, 'r', encoding='utf-8', errors='replace', newline='') as f:
+        for row in csv.reader(f):
+            if len(row) < 2: continue
+            start_id, end_id = row[0].strip().upper(), row[1].strip().upper()
+            if not start_id or not end_id: continue
+            if (start_id, end_id) in (('START', 'END'), ('FROM', 'TO'), ('ORIGIN', 'DESTINATION')):
+                continue
+            pairs.append((start_id, end_id))
+    return pairs
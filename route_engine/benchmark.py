@@ -0,0 +1,78 @@
+"""
+Search algorithm benchmark: runs each algorithm in ALGORITHMS over the same
+origin/destination pairs and reports wall time, expanded nodes and whether
+the route lengths agree.
+"""
+import time
+import random
+from .router import ALGORITHMS, resolve_graph_node_options
+from .config import DEFAULT_INTENDED_FL, DEFAULT_FLOS_DIRECTION
+
+def sample_pairs(count, seed=0, engine=None):
+    """Random (departure, arrival) airport pairs from the Annex 3A/2B index."""
+    from . import default_engine
+    index = (engine or default_engine()).dataset.airport_index
+    deps = sorted(a for a, e in index.items() if e['dep_points'])
+    arrs = sorted(a for a, e in index.items() if e['arr_points'])
+    rng = random.Random(seed)
+    return [(rng.choice(deps), rng.choice(arrs)) for _ in range(count)]
+
+def run_benchmark(pairs, algorithms=None, fl=None, direction=None, use_landmarks=True, engine=None):
+    """
+    Routes every pair with each algorithm on the shared adjacency (A* variants
+    use the ALT landmark heuristic unless use_landmarks is False; 'ch' loads
+    or builds the contraction hierarchy first).
+    Returns {algorithm: {'time', 'expanded', 'found', 'mismatches'}};
+    mismatches counts pairs whose distance differs from the first algorithm.
+    'expanded' is the number of label entries scanned for 'ch'.
+    engine: RouteEngine to run on (default: route_engine.default_engine()).
+    """
+    from . import default_engine
+    engine = engine or default_engine()
+    d = engine.dataset
+    points_db, edges, index = d.points_db, d.edges, d.airport_index
+    if fl is None: fl = DEFAULT_INTENDED_FL
+    if direction is None: direction = DEFAULT_FLOS_DIRECTION
+    algorithms = list(algorithms or ALGORITHMS)
+    adjacency = engine.adjacency(fl, direction)
+    options = {}
+    for name in algorithms:
+        options[name] = engine.search_options(name, fl, direction)
+        options[name].pop('tree_cache', None)  # every pair is timed from scratch
+        if not use_landmarks:
+            options[name].pop('landmarks', None)
+
+    results = {name: {'time': 0.0, 'expanded': 0, 'found': 0, 'mismatches': 0} for name in algorithms}
+    for start, end in pairs:
+        start_opts = resolve_graph_node_options(start, points_db, True, index)
+        end_opts = resolve_graph_node_options(end, points_db, False, index)
+        if not start_opts or not end_opts:
+            continue
+        reference = None
+        for k, name in enumerate(algorithms):
+            stats = {}
+            t0 = time.perf_counter()
+            path, edge_info = ALGORITHMS[name](start_opts, end_opts, edges, points_db, None, adjacency,
+                                               intended_fl=fl, direction=direction, stats=stats,
+                                               **options[name])
+            res = results[name]
+            res['time'] += time.perf_counter() - t0
+            res['expanded'] += stats.get('expanded', 0)
+            dist = None
+            if path:
+                res['found'] += 1
+                dist = sum(edge_info[a][b]['Dist'] for a, b in zip(path, path[1:]))
+            if k == 0:
+                reference = dist
+            elif (dist is None) != (reference is None) or (dist is not None and abs(dist - reference) > 1e-6):
+                res['mismatches'] += 1
+    return results
+
+def format_results(results, num_pairs):
+    """Markdown table of run_benchmark() results."""
+    lines = ["| Algorithm | Total (s) | Per route (ms) | Expanded | Found | Mismatches |",
+             "|---|---|---|---|---|---|"]
+    for name, r in results.items():
+        per = 1000.0 * r['time'] / num_pairs if num_pairs else 0.0
+        lines.append(f"| {name} | {r['time']:.3f} | {per:.1f} | {r['expanded']} | {r['found']} | {r['mismatches']} |")
+    return "\n".join(lines)
@@ -0,0 +1,156 @@
+"""
+Bounded LRU caches: find_route results, and resumable A* search states.
+
+Keys include the dataset version (results) or the graph key (search states),
+so entries of an older AIRAC cycle or CSV revision can never be served; on
+reload the cache objects are replaced.
+"""
+import time
+import threading
+import collections
+from .config import ROUTE_CACHE_SIZE, ROUTE_CACHE_TTL_S, SEARCH_TREE_CACHE_BYTES
+
+class CachedRoute:
+    """One cached find_route outcome; the markdown table is rendered on first request."""
+    __slots__ = ('result', 'table', 'expires')
+
+    def __init__(self, result, expires):
+        self.result = result  # None = no route found
+        self.table = None
+        self.expires = expires
+
+class RouteCache:
+    """
+    Thread-safe LRU mapping of route keys to CachedRoute entries, with
+    size (max_entries) and age (ttl seconds, None = no expiry) limits.
+    """
+
+    def __init__(self, max_entries=ROUTE_CACHE_SIZE, ttl=ROUTE_CACHE_TTL_S, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Returns the CachedRoute for key, or None on a miss (absent or expired)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires is not None and entry.expires <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, result):
+        """Stores a result (None for "no route") and returns its CachedRoute."""
+        expires = self._clock() + self.ttl if self.ttl else None
+        entry = CachedRoute(result, expires)
+        if self.max_entries <= 0:
+            return entry
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return entry
+
+    def items(self):
+        """Snapshot list of unexpired (key, CachedRoute) pairs, least recently used first."""
+        now = self._clock()
+        with self._lock:
+            return [(k, e) for k, e in self._entries.items() if e.expires is None or e.expires > now]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Counters and current size."""
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+class SearchTreeCache:
+    """
+    LRU cache of resumable search states (router.SearchState), keyed by graph
+    key and start id set, bounded by their total memory footprint (nbytes).
+
+    take() removes the state from the cache, so only one query at a time
+    extends it; put() hands it back (possibly grown) when the query is done.
+    """
+
+    def __init__(self, max_bytes=SEARCH_TREE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def take(self, key):
+        """Removes and returns the state for key, or None on a miss."""
+        with self._lock:
+            state = self._entries.pop(key, None)
+            if state is None:
+                self.misses += 1
+                return None
+            self.nbytes -= state.nbytes
+            self.hits += 1
+            return state
+
+    def put(self, key, state):
+        """Stores state for key, evicting least recently used states beyond max_bytes."""
+        size = state.nbytes
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old.nbytes
+            self._entries[key] = state
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        """Counters, entry count and memory footprint."""
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'nbytes': self.nbytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
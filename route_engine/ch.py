@@ -0,0 +1,425 @@
+"""
+Contraction hierarchy (CH) over the CSR adjacency of one FL band / direction.
+
+Nodes are contracted one at a time in order of importance; whenever the
+only shortest connection between two remaining neighbours runs through the
+contracted node, a shortcut edge is added. Every shortest path then climbs
+"upward" (towards later contracted nodes) to a single highest node and
+descends from there.
+
+The upward search spaces of every node (forward and backward, with
+stall-on-demand) are precomputed as hub labels, so a query only merges the
+labels of the start and end options and picks the cheapest common node.
+Shortcuts remember their middle node and are unpacked back into original
+adjacency edges for the route details.
+"""
+import os
+import heapq
+import shutil
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .graph import GRAPH_FORMAT_VERSION
+from .data_loader import dataset_version
+from .config import MAX_DCT_DISTANCE_KM, GRAPH_CACHE_DIR
+
+CH_FORMAT_VERSION = 1
+
+# Witness search: candidate middle nodes per contraction, intermediate
+# nodes evaluated per NumPy step, and float32 safety margin
+_WITNESS_NEIGHBOURS = 128
+_WITNESS_CHUNK = 32
+_WITNESS_RTOL = 1e-5
+
+class ContractionHierarchy:
+    """
+    CH graphs and hub labels in CSR form.
+
+    up_*:   row u lists edges u -> v with rank[v] > rank[u]
+    down_*: row v lists edges u -> v with rank[u] > rank[v], stored by their
+            target v. Rows are sorted by neighbour id.
+    *_via:  middle node of a shortcut, -1 for an original adjacency edge.
+    fwd_* / bwd_*: per node, its upward search space from (to) that node:
+            hub ids (sorted), exact distances, and the previous node on the
+            upward path (-1 at the root).
+    """
+
+    ARRAYS = ('rank',
+              'up_indptr', 'up_indices', 'up_weights', 'up_via',
+              'down_indptr', 'down_indices', 'down_weights', 'down_via',
+              'fwd_indptr', 'fwd_hubs', 'fwd_dist', 'fwd_parent',
+              'bwd_indptr', 'bwd_hubs', 'bwd_dist', 'bwd_parent')
+
+    def __init__(self, key=None, **arrays):
+        for name in self.ARRAYS:
+            setattr(self, name, arrays.get(name))
+        self.key = key
+
+    @property
+    def num_nodes(self):
+        return len(self.rank)
+
+    @property
+    def num_shortcuts(self):
+        return int((np.asarray(self.up_via) >= 0).sum() + (np.asarray(self.down_via) >= 0).sum())
+
+    def save(self, path):
+        """Saves the CH arrays as .npy files in directory `path`."""
+        tmp = f"{path}.{os.getpid()}.tmp"
+        os.makedirs(tmp, exist_ok=True)
+        for name in self.ARRAYS:
+            np.save(os.path.join(tmp, f"{name}.npy"), getattr(self, name))
+        try:
+            os.rename(tmp, path)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    @classmethod
+    def load(cls, path, key=None, mmap=True):
+        """Loads a saved hierarchy; arrays are memory-mapped read-only."""
+        mode = 'r' if mmap else None
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode) for name in cls.ARRAYS}
+        return cls(key=key, **arrays)
+
+    def _labels(self, side):
+        if side == 0:
+            return self.fwd_indptr, self.fwd_hubs, self.fwd_dist, self.fwd_parent
+        return self.bwd_indptr, self.bwd_hubs, self.bwd_dist, self.bwd_parent
+
+    def _merge_labels(self, side, seeds):
+        """Best label distance per hub over all seeds, and the seed it came from."""
+        indptr, hubs, dist, _ = self._labels(side)
+        best = np.full(self.num_nodes, np.inf)
+        owner = np.full(self.num_nodes, -1, dtype=np.int64)
+        scanned = 0
+        for s in seeds:
+            a, b = indptr[s], indptr[s + 1]
+            h = hubs[a:b]
+            d = dist[a:b]
+            better = d < best[h]
+            best[h[better]] = d[better]
+            owner[h[better]] = s
+            scanned += b - a
+        return best, owner, scanned
+
+    def query(self, start_ids, end_ids, stats=None):
+        """
+        Shortest path from any of start_ids to any of end_ids as a list of
+        original node ids, or None if the end set is unreachable.
+        stats: optional dict, receives the number of label entries scanned
+        (as 'expanded', for comparison with the search algorithms).
+        """
+        fwd, fwd_owner, scanned_f = self._merge_labels(0, start_ids)
+        bwd, bwd_owner, scanned_b = self._merge_labels(1, end_ids)
+        if stats is not None: stats['expanded'] = int(scanned_f + scanned_b)
+        total = fwd + bwd
+        hub = int(np.argmin(total))
+        if not np.isfinite(total[hub]):
+            return None
+        head = self._label_path(0, int(fwd_owner[hub]), hub)
+        tail = self._label_path(1, int(bwd_owner[hub]), hub)
+        return head + tail[1:]
+
+    def _label_path(self, side, root, hub):
+        """Unpacked path root ... hub (forward label) or hub ... root (backward label)."""
+        indptr, hubs, _, parent = self._labels(side)
+        a, b = indptr[root], indptr[root + 1]
+        row_hubs = hubs[a:b]
+        row_parent = parent[a:b]
+        chain = [hub]
+        v = hub
+        while v != root:
+            v = int(row_parent[np.searchsorted(row_hubs, v)])
+            chain.append(v)
+        if side == 0:
+            chain.reverse()
+        ids = [chain[0]]
+        for u, v in zip(chain, chain[1:]):
+            ids.extend(self._unpack(u, v, self._edge_via(u, v))[1:])
+        return ids
+
+    def _edge_via(self, u, v):
+        """Middle node of CH edge u -> v (-1 if it is an original edge)."""
+        if self.rank[u] < self.rank[v]:
+            a, b = self.up_indptr[u], self.up_indptr[u + 1]
+            k = a + int(np.searchsorted(self.up_indices[a:b], v))
+            return int(self.up_via[k])
+        a, b = self.down_indptr[v], self.down_indptr[v + 1]
+        k = a + int(np.searchsorted(self.down_indices[a:b], u))
+        return int(self.down_via[k])
+
+    def _unpack(self, u, v, via):
+        """Expands CH edge u -> v into the original node sequence [u, ..., v]."""
+        if via < 0:
+            return [u, v]
+        out = []
+        stack = [(u, v, via)]
+        while stack:
+            a, b, m = stack.pop()
+            if m < 0:
+                if not out:
+                    out.append(a)
+                out.append(b)
+                continue
+            # Left half first: push right half below it
+            stack.append((m, b, self._edge_via(m, b)))
+            stack.append((a, m, self._edge_via(a, m)))
+        return out
+
+def _upward_space(search, stall, source, n):
+    """
+    Complete upward Dijkstra from source with stall-on-demand. Returns the
+    (hubs, dist, parent) arrays of the settled, non-stalled nodes, by hub id.
+    Stalled nodes are reached more cheaply through a higher node, so their
+    label would not be a shortest distance; they are neither kept nor expanded.
+    """
+    s_indptr, s_indices, s_weights = search
+    t_indptr, t_indices, t_weights = stall
+    dist = np.full(n, np.inf)
+    parent = np.full(n, -1, dtype=np.int64)
+    done = bytearray(n)
+    dist[source] = 0.0
+    heap = [(0.0, source)]
+    hubs = []
+    while heap:
+        d, v = heapq.heappop(heap)
+        if done[v]: continue
+        done[v] = 1
+        a, b = t_indptr[v], t_indptr[v + 1]
+        if a < b and (dist[t_indices[a:b]] + t_weights[a:b] < d).any():
+            continue
+        hubs.append(v)
+        a, b = s_indptr[v], s_indptr[v + 1]
+        nbrs = s_indices[a:b]
+        nd = d + s_weights[a:b]
+        better = np.flatnonzero(nd < dist[nbrs])
+        if len(better):
+            tgt = nbrs[better]
+            nd = nd[better]
+            dist[tgt] = nd
+            parent[tgt] = v
+            for x, dx in zip(tgt.tolist(), nd.tolist()):
+                heapq.heappush(heap, (dx, x))
+    hubs = np.sort(np.array(hubs, dtype=np.int64))
+    return hubs.astype(np.int32), dist[hubs], parent[hubs].astype(np.int32)
+
+# (up, down) CSR graphs shared with forked label workers
+_LABEL_STATE = None
+
+def _label_chunk(task):
+    side, nodes = task
+    up, down = _LABEL_STATE
+    search, stall = (up, down) if side == 0 else (down, up)
+    n = len(up[0]) - 1
+    return [_upward_space(search, stall, v, n) for v in nodes]
+
+def _build_labels(up, down, n, workers=None):
+    """Forward and backward hub labels of every node, as CSR arrays."""
+    global _LABEL_STATE
+    if workers is None:
+        workers = os.cpu_count() or 1
+    tasks = [(side, range(i, min(i + 256, n))) for side in (0, 1) for i in range(0, n, 256)]
+    _LABEL_STATE = (up, down)
+    try:
+        if workers > 1 and 'fork' in multiprocessing.get_all_start_methods():
+            ctx = multiprocessing.get_context('fork')
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+                parts = list(pool.map(_label_chunk, tasks))
+        else:
+            parts = [_label_chunk(t) for t in tasks]
+    finally:
+        _LABEL_STATE = None
+
+    labels = {}
+    for side, prefix in ((0, 'fwd'), (1, 'bwd')):
+        rows = [row for (task_side, _), part in zip(tasks, parts) if task_side == side for row in part]
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum([len(r[0]) for r in rows], out=indptr[1:])
+        labels[f"{prefix}_indptr"] = indptr
+        labels[f"{prefix}_hubs"] = np.concatenate([r[0] for r in rows])
+        labels[f"{prefix}_dist"] = np.concatenate([r[1] for r in rows])
+        labels[f"{prefix}_parent"] = np.concatenate([r[2] for r in rows])
+    return labels
+
+def _lookup(rows, targets, n):
+    """Weights of the edges from each adjacency row to each of `targets` (inf where there is none)."""
+    out = np.full((len(rows), len(targets)), np.inf)
+    if not len(rows) or not len(targets):
+        return out
+    pos = np.full(n, -1, dtype=np.int64)
+    pos[targets] = np.arange(len(targets))
+    ids = np.concatenate([r[0] for r in rows])
+    row = np.repeat(np.arange(len(rows)), [len(r[0]) for r in rows])
+    col = pos[ids]
+    found = col >= 0
+    out[row[found], col[found]] = np.concatenate([r[1] for r in rows])[found]
+    return out
+
+def _contract(out_rows, in_rows, w):
+    """
+    Shortcuts needed when contracting w: (U, V, need, C) where C[i, j] is the
+    length of U[i] -> w -> V[j] and need marks pairs without a witness path of
+    at most that length. The witness search is local: the direct edge, or one
+    intermediate node among w's _WITNESS_NEIGHBOURS closest neighbours. A
+    missed witness only adds a redundant shortcut, never a wrong distance.
+    """
+    n = len(out_rows)
+    U, U_w = in_rows[w]
+    V, V_w = out_rows[w]
+    if not len(U) or not len(V):
+        return U, V, None, None
+
+    C = U_w[:, None] + V_w[None, :]
+    need = C < _lookup([out_rows[u] for u in U.tolist()], V, n)
+    need &= U[:, None] != V[None, :]
+    rows = np.flatnonzero(need.any(axis=1))
+    cols = np.flatnonzero(need.any(axis=0))
+    if len(rows):
+        X, pos = np.unique(np.concatenate((U, V)), return_inverse=True)
+        if len(X) > _WITNESS_NEIGHBOURS:
+            near = np.full(len(X), np.inf)
+            np.minimum.at(near, pos, np.concatenate((U_w, V_w)))
+            X = X[np.argpartition(near, _WITNESS_NEIGHBOURS)[:_WITNESS_NEIGHBOURS]]
+        # Min-plus product in float32; a witness only counts if it is shorter
+        # by more than the rounding error, so rounding can only add shortcuts
+        D1 = _lookup([out_rows[u] for u in U[rows].tolist()], X, n).astype(np.float32)
+        D2 = _lookup([out_rows[x] for x in X.tolist()], V[cols], n).astype(np.float32)
+        best = np.full((len(rows), len(cols)), np.inf, dtype=np.float32)
+        for a in range(0, len(X), _WITNESS_CHUNK):
+            b = a + _WITNESS_CHUNK
+            np.minimum(best, (D1[:, a:b, None] + D2[None, a:b, :]).min(axis=1), out=best)
+        c_sub = C[np.ix_(rows, cols)]
+        sub = need[np.ix_(rows, cols)]
+        sub &= best > c_sub * (1.0 - _WITNESS_RTOL)
+        need[np.ix_(rows, cols)] = sub
+    return U, V, need, C
+
+def _update_row(row, w, ids, weights):
+    """Adjacency row without node w, with edges to `ids` added or shortened to `weights`."""
+    old_ids, old_weights = row
+    keep = old_ids != w
+    ids = np.concatenate((old_ids[keep], ids))
+    weights = np.concatenate((old_weights[keep], weights))
+    order = np.lexsort((weights, ids))
+    ids, weights = ids[order], weights[order]
+    first = np.ones(len(ids), dtype=bool)
+    first[1:] = ids[1:] != ids[:-1]
+    return ids[first], weights[first]
+
+def _priority(contraction, deleted, w):
+    """Edge difference (shortcuts added - edges removed) plus contracted neighbours."""
+    U, V, need, C = contraction
+    added = int(need.sum()) if need is not None else 0
+    return added - len(U) - len(V) + int(deleted[w])
+
+def build_ch(adjacency, workers=None, verbose=True):
+    """
+    Contracts every node of the adjacency (lazy edge-difference ordering),
+    then computes the hub labels in parallel across `workers` processes.
+    During contraction the remaining graph is kept as sorted per-node
+    out- and in-edge rows, so memory is linear in the edges and shortcuts.
+    """
+    n = adjacency.num_nodes
+    indptr = np.asarray(adjacency.indptr)
+    indices = np.asarray(adjacency.indices).astype(np.int64)
+    weights = np.asarray(adjacency.weights, dtype=np.float64)
+    sources = np.repeat(np.arange(n), np.diff(indptr))
+    loop = sources == indices
+    sources, indices, weights = sources[~loop], indices[~loop], weights[~loop]
+
+    def rows_of(keys, others):
+        order = np.lexsort((others, keys))
+        bounds = np.searchsorted(keys[order], np.arange(n + 1))
+        o, w = others[order], weights[order]
+        return [(o[bounds[v]:bounds[v + 1]], w[bounds[v]:bounds[v + 1]]) for v in range(n)]
+
+    out_rows = rows_of(sources, indices)
+    in_rows = rows_of(indices, sources)
+    deleted = np.zeros(n, dtype=np.int64)
+    rank = np.full(n, -1, dtype=np.int64)
+    via = {}
+    # Edges of each node to the nodes still remaining when it is contracted
+    up_rows = [None] * n
+    down_rows = [None] * n
+
+    queue = [(_priority(_contract(out_rows, in_rows, w), deleted, w), w) for w in range(n)]
+    heapq.heapify(queue)
+    order = 0
+    while queue:
+        prio, w = heapq.heappop(queue)
+        if rank[w] >= 0:
+            continue
+        # Lazy update: re-evaluate, contract only if still the least important
+        contraction = _contract(out_rows, in_rows, w)
+        prio = _priority(contraction, deleted, w)
+        if queue and prio > queue[0][0]:
+            heapq.heappush(queue, (prio, w))
+            continue
+
+        U, V, need, C = contraction
+        up_rows[w] = out_rows[w]
+        down_rows[w] = in_rows[w]
+        if need is None:
+            need, C = np.zeros((len(U), len(V)), dtype=bool), np.zeros((len(U), len(V)))
+        for i, u in enumerate(U.tolist()):
+            out_rows[u] = _update_row(out_rows[u], w, V[need[i]], C[i, need[i]])
+            via.update(((u, v), w) for v in V[need[i]].tolist())
+        for j, v in enumerate(V.tolist()):
+            in_rows[v] = _update_row(in_rows[v], w, U[need[:, j]], C[need[:, j], j])
+        out_rows[w] = in_rows[w] = None
+        rank[w] = order
+        order += 1
+        deleted[U] += 1
+        deleted[V] += 1
+        if verbose and order % 1000 == 0:
+            print(f"[route_engine] CH: contracted {order}/{n} nodes, {len(via)} shortcuts")
+
+    # Every edge (original or shortcut) goes up or down the hierarchy
+    def csr(rows, up):
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum([len(ids) for ids, _ in rows], out=indptr[1:])
+        indices = np.concatenate([ids for ids, _ in rows])
+        vias = [via.get((v, int(x)) if up else (int(x), v), -1) for v, (ids, _) in enumerate(rows) for x in ids]
+        return (indptr, indices.astype(np.int32), np.concatenate([wts for _, wts in rows]),
+                np.array(vias, dtype=np.int32))
+
+    arrays = {'rank': rank}
+    for prefix, rows, up in (('up', up_rows, True), ('down', down_rows, False)):
+        for name, arr in zip(('indptr', 'indices', 'weights', 'via'), csr(rows, up)):
+            arrays[f"{prefix}_{name}"] = arr
+    del up_rows, down_rows
+
+    if verbose:
+        print(f"[route_engine] CH: computing hub labels ({len(via)} shortcuts)")
+    up_graph = (arrays['up_indptr'], arrays['up_indices'], arrays['up_weights'])
+    down_graph = (arrays['down_indptr'], arrays['down_indices'], arrays['down_weights'])
+    arrays.update(_build_labels(up_graph, down_graph, n, workers))
+    return ContractionHierarchy(key=adjacency.key, **arrays)
+
+def ch_cache_path(key, version, cache_dir=GRAPH_CACHE_DIR):
+    """Directory of a persisted hierarchy, next to the adjacency it was built from."""
+    band, direction = key
+    params = f"c{CH_FORMAT_VERSION}_g{GRAPH_FORMAT_VERSION}_r{int(MAX_DCT_DISTANCE_KM)}"
+    return os.path.join(cache_dir, version, f"ch_{params}_b{band}_{direction}")
+
+def load_or_build_ch(adjacency, workers=None, cache_dir=GRAPH_CACHE_DIR, version=None):
+    """Loads the persisted hierarchy for this adjacency, or builds and persists it."""
+    key = adjacency.key
+    if version is None:
+        version = dataset_version()
+    path = ch_cache_path(key, version, cache_dir)
+    if os.path.isdir(path):
+        try:
+            ch = ContractionHierarchy.load(path, key=key)
+            if ch.num_nodes == adjacency.num_nodes:
+                return ch
+        except (OSError, ValueError):
+            pass
+
+    ch = build_ch(adjacency, workers)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        ch.save(path)
+    except OSError as e:
+        print(f"[route_engine] Warning: could not persist contraction hierarchy ({e})")
+    return ch
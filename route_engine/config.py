@@ -3,13 +3,48 @@ import os
 # Define base paths
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
-# Input Files
-FRA_POINTS_FILE = os.path.join(BASE_DIR, 'download_11487', 'FRA_Points.csv')
-ANNEX_3B_DCT_FILE = os.path.join(BASE_DIR, 'Annex_3B_DCT.csv')
-ANNEX_3A_DEP_FILE = os.path.join(BASE_DIR, 'Annex_3A_DEP.csv')
-ANNEX_3A_ARR_FILE = os.path.join(BASE_DIR, 'Annex_3A_ARR.csv')
-ANNEX_2B_FILE = os.path.join(BASE_DIR, 'Annex_2B.csv')
+# Input Files, relative to a dataset directory (BASE_DIR is the default dataset)
+FRA_POINTS_NAME = os.path.join('download_11487', 'FRA_Points.csv')
+FRA_COVER_NAME = os.path.join('download_11487', 'COVER.csv')
+ANNEX_3B_DCT_NAME = 'Annex_3B_DCT.csv'
+ANNEX_3A_DEP_NAME = 'Annex_3A_DEP.csv'
+ANNEX_3A_ARR_NAME = 'Annex_3A_ARR.csv'
+ANNEX_2B_NAME = 'Annex_2B.csv'
+
+FRA_POINTS_FILE = os.path.join(BASE_DIR, FRA_POINTS_NAME)
+FRA_COVER_FILE = os.path.join(BASE_DIR, FRA_COVER_NAME)
+ANNEX_3B_DCT_FILE = os.path.join(BASE_DIR, ANNEX_3B_DCT_NAME)
+ANNEX_3A_DEP_FILE = os.path.join(BASE_DIR, ANNEX_3A_DEP_NAME)
+ANNEX_3A_ARR_FILE = os.path.join(BASE_DIR, ANNEX_3A_ARR_NAME)
+ANNEX_2B_FILE = os.path.join(BASE_DIR, ANNEX_2B_NAME)
+
+# Derived data (precomputed graphs, snapshots), kept next to the source CSVs
+GRAPH_CACHE_DIR = os.path.join(BASE_DIR, 'route_cache')
+SNAPSHOT_AT_IMPORT = True  # Map a current dataset snapshot into the default engine when route_engine is imported
 
 # Defaults
 DEFAULT_INTENDED_FL = 320
 DEFAULT_FLOS_DIRECTION = 'EAST'
+FLOS_DIRECTIONS = ('EAST', 'WEST')  # Accepted 'direction' values (points are checked as EAST or not)
+
+# Routing
+MAX_DCT_DISTANCE_KM = 400.0  # Range limit for simulated FRA DCT connections
+ALT_LANDMARK_COUNT = 16      # Landmarks for the ALT A* heuristic (per FL band / direction graph)
+CRUISE_SPEED_KMH = 830.0     # Ground speed for estimated times over points (find_route(..., eobt=...)), ~450 kt
+K_SHORTEST_TREE_STRETCH = 1.02  # find_routes_k: reverse tree settles nodes up to this x the shortest distance
+K_SHORTEST_MAX_PATHS = 100      # find_routes_k: max paths enumerated / searches run per query
+K_SHORTEST_CORRIDOR_KM = 50.0   # find_routes_k: corridor around a route for the diversity measure
+ASTAR_MAX_EXPANSIONS = 50000    # A* / bidirectional A*: node expansions before a search gives up
+ANYTIME_INITIAL_WEIGHT = 2.0    # find_route(..., deadline_ms=...): heuristic weight of the first (fastest) pass
+ANYTIME_WEIGHT_STEP = 0.25      # find_route(..., deadline_ms=...): weight decrease per further pass
+
+# Route result cache (find_route)
+ROUTE_CACHE_SIZE = 4096      # Max cached O/D results per process (0 disables the cache)
+ROUTE_CACHE_TTL_S = 3600.0   # Seconds before a cached result expires (None = never)
+SEARCH_TREE_CACHE_BYTES = 64 * 1024 * 1024  # Memory bound for resumable A* search states per process
+
+# Routing service (python -m route_engine serve)
+SERVER_HOST = '127.0.0.1'
+SERVER_PORT = 8080
+SERVER_WORKERS = 4           # Search threads
+SERVER_MAX_PENDING = 64      # Distinct searches queued or running before requests get 503
@@ -1,17 +1,68 @@
+import os
 import csv
 import collections
+import hashlib
 import re
 from .config import (
-    FRA_POINTS_FILE, ANNEX_3B_DCT_FILE, 
-    ANNEX_3A_DEP_FILE, ANNEX_3A_ARR_FILE, ANNEX_2B_FILE
+    BASE_DIR, FRA_POINTS_FILE, FRA_COVER_FILE, ANNEX_3B_DCT_FILE,
+    ANNEX_3A_DEP_FILE, ANNEX_3A_ARR_FILE, ANNEX_2B_FILE,
+    FRA_POINTS_NAME, FRA_COVER_NAME, ANNEX_3B_DCT_NAME,
+    ANNEX_3A_DEP_NAME, ANNEX_3A_ARR_NAME, ANNEX_2B_NAME,
 )
 from .utils import parse_coordinate
+from .points import PointStore
+from .airac import current_airac
 
-def load_fra_points():
-    """Loads FRA points from CSV into a dictionary keyed by Point Name."""
+# Every CSV the engine's data structures are derived from
+SOURCE_FILES = (FRA_POINTS_FILE, ANNEX_3B_DCT_FILE, ANNEX_3A_DEP_FILE, ANNEX_3A_ARR_FILE, ANNEX_2B_FILE)
+
+class DatasetFiles(collections.namedtuple('DatasetFiles', 'points cover dct dep arr annex_2b')):
+    """Source file paths of one dataset directory (laid out like the repository root)."""
+    __slots__ = ()
+
+    @classmethod
+    def in_dir(cls, base_dir=BASE_DIR):
+        join = os.path.join
+        return cls(join(base_dir, FRA_POINTS_NAME), join(base_dir, FRA_COVER_NAME),
+                   join(base_dir, ANNEX_3B_DCT_NAME), join(base_dir, ANNEX_3A_DEP_NAME),
+                   join(base_dir, ANNEX_3A_ARR_NAME), join(base_dir, ANNEX_2B_NAME))
+
+    @property
+    def sources(self):
+        """The CSVs hashed into the dataset version (same order as SOURCE_FILES)."""
+        return (self.points, self.dct, self.dep, self.arr, self.annex_2b)
+
+def source_hashes(paths=SOURCE_FILES):
+    """SHA-256 of each source CSV (None if missing), keyed by file name."""
+    hashes = {}
+    for p in paths:
+        try:
+            with open(p, 'rb') as f:
+                hashes[os.path.basename(p)] = hashlib.sha256(f.read()).hexdigest()
+        except FileNotFoundError:
+            hashes[os.path.basename(p)] = None
+    return hashes
+
+def dataset_version(paths=SOURCE_FILES, cover_file=FRA_COVER_FILE, airac=None):
+    """
+    Short identifier of the loaded dataset: AIRAC cycle (`airac`, else read
+    from the COVER sheet) plus a digest of the source CSV contents. Anything
+    derived from the CSVs is keyed by it.
+    """
+    h = hashlib.sha256()
+    for name, digest in sorted(source_hashes(paths).items()):
+        h.update(f"{name}:{digest};".encode())
+    return f"{airac or current_airac(cover_file) or 'unknown'}-{h.hexdigest()[:12]}"
+
+def load_fra_points(path=FRA_POINTS_FILE):
+    """Loads FRA points from CSV into a columnar PointStore (lookup by Point Name or id)."""
+    return PointStore(read_fra_point_rows(path))
+
+def read_fra_point_rows(path=FRA_POINTS_FILE):
+    """FRA point CSV rows (dicts with parsed 'lat' / 'lon'), one per point name, in file order."""
     points = {}
     try:
-        with open(FRA_POINTS_FILE, 'r', encoding='utf-8', errors='replace') as f:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
             reader = csv.DictReader(f)
             for row in reader:
                 if row.get('FRA Point'):
@@ -21,14 +72,18 @@ def load_fra_points():
                     row['lon'] = parse_coordinate(row.get('FRA Point Longitude', ''))
                     points[name] = row
     except FileNotFoundError:
-        print(f"Error: {FRA_POINTS_FILE} not found.")
-    return points
+        print(f"Error: {path} not found.")
+    # Later rows override earlier ones for duplicate names
+    return list(points.values())
 
-def load_dct_edges():
-    """Loads explicit DCT edges from Annex 3B."""
+def load_dct_edges(path=ANNEX_3B_DCT_FILE):
+    """
+    Loads explicit DCT edges from Annex 3B, with their vertical limits, Y/N
+    availability and time availability as published (compiled by dct.DctTable).
+    """
     edges = collections.defaultdict(list)
     try:
-        with open(ANNEX_3B_DCT_FILE, 'r', encoding='utf-8', errors='replace') as f:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
             reader = csv.reader(f)
             first = True
             for row in reader:
@@ -46,53 +101,98 @@ def load_dct_edges():
                 if u and v:
                     edges[u].append({
                         'To': v,
-                        'Remarks': restr or "Explicit DCT"
+                        'Remarks': restr or "Explicit DCT",
+                        'Lower': row[3] if len(row) > 3 else "",
+                        'Upper': row[4] if len(row) > 4 else "",
+                        'Available': row[5] if len(row) > 5 else "",
+                        'Time': row[7] if len(row) > 7 else "",
                     })
     except FileNotFoundError:
-        print(f"Error: {ANNEX_3B_DCT_FILE} not found.")
+        print(f"Error: {path} not found.")
     return edges
 
-def get_departure_points(airport, points_db):
-    """Finds valid FRA connection points for a Departure Airport (from Annex 3A)."""
-    candi = set()
+def _new_airport_entry():
+    return {
+        'dep': [],          # Annex 3A DEP rows (SID / DCT DEP PT, FPL options, time)
+        'arr': [],          # Annex 3A ARR rows (STAR / DCT ARR PT, FPL options, time)
+        'dep_points': [],   # Candidate FRA points for departure (in points_db)
+        'arr_points': [],   # Candidate FRA points for arrival (from Annex 2B)
+    }
+
+def _split_points(pt_str):
+    return re.findall(r'[A-Z]{3,5}', pt_str)
+
+def _index_annex_3a(index, path, key, proc_key):
+    """Indexes one Annex 3A file (DEP or ARR) by aerodrome."""
     try:
-        with open(ANNEX_3A_DEP_FILE, 'r', encoding='utf-8', errors='replace') as f:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
             reader = csv.reader(f)
-            next(reader) 
+            next(reader)
             for row in reader:
                 if len(row) < 4: continue
-                if row[1] == airport:
-                    # Column 3 'DCT DEP PT' or 2 'Last PT SID'
-                    pt_str = row[3] if row[3].strip() else row[2]
-                    
-                    # Clean up string
-                    clean_pts = re.findall(r'[A-Z]{3,5}', pt_str)
-                    for p in clean_pts:
-                        if p in points_db:
-                            candi.add(p)
+                # Column 3 'DCT DEP/ARR PT' or 2 'Last PT SID / First PT STAR'
+                pt_str = row[3] if row[3].strip() else row[2]
+                index[row[1]][key].append({
+                    'id': row[0],
+                    proc_key: row[2],
+                    'dct_pt': row[3],
+                    'pt_str': pt_str,
+                    'points': _split_points(pt_str),
+                    'fpl': row[4] if len(row) > 4 else '',
+                    'time': row[5] if len(row) > 5 else '',
+                })
     except FileNotFoundError:
         pass
-    return list(candi)
 
-def get_arrival_points(airport):
-    """Finds valid FRA connection points for an Arrival Airport."""
-    candi = set()
-    
-    # Try Annex 2B (simpler format, more reliable)
+def _index_annex_2b_arrivals(index, path):
+    """Collects arrival connection points from Annex 2B rows mentioning 'ARR <AD>'."""
     try:
-        with open(ANNEX_2B_FILE, 'r', encoding='utf-8', errors='replace') as f:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
             reader = csv.DictReader(f)
             for row in reader:
                 row_str = str(row.values())
-                if f"ARR {airport}" in row_str:
-                    # Extract all 5-letter waypoint codes
-                    clean_pts = re.findall(r'\b[A-Z]{5}\b', row_str)
-                    for p in clean_pts:
-                        candi.add(p)
+                if 'ARR ' not in row_str: continue
+                airports = set(re.findall(r'ARR (?=(.{4}))', row_str))
+                # Extract all 5-letter waypoint codes
+                clean_pts = re.findall(r'\b[A-Z]{5}\b', row_str)
+                for ad in airports:
+                    index[ad]['arr_points'].extend(clean_pts)
     except FileNotFoundError:
         pass
+
+def load_airport_index(points_db, dep_file=ANNEX_3A_DEP_FILE, arr_file=ANNEX_3A_ARR_FILE,
+                       annex_2b_file=ANNEX_2B_FILE):
+    """
+    Builds the aerodrome connectivity index (keyed by ICAO) from Annex 3A DEP/ARR
+    and Annex 2B. Built once so that airport resolution is a dict lookup.
+    """
+    index = collections.defaultdict(_new_airport_entry)
+    _index_annex_3a(index, dep_file, 'dep', 'sid')
+    _index_annex_3a(index, arr_file, 'arr', 'star')
+    _index_annex_2b_arrivals(index, annex_2b_file)
     
-    return list(candi)
+    for entry in index.values():
+        dep_points = []
+        for rule in entry['dep']:
+            dep_points.extend(p for p in rule['points'] if p in points_db)
+        # De-duplicate, keeping first-seen order
+        entry['dep_points'] = list(dict.fromkeys(dep_points))
+        entry['arr_points'] = list(dict.fromkeys(entry['arr_points']))
+    return dict(index)
+
+def get_departure_points(airport, points_db, airport_index=None):
+    """Finds valid FRA connection points for a Departure Airport (from Annex 3A)."""
+    if airport_index is None:
+        airport_index = load_airport_index(points_db)
+    entry = airport_index.get(airport)
+    return list(entry['dep_points']) if entry else []
+
+def get_arrival_points(airport, airport_index=None):
+    """Finds valid FRA connection points for an Arrival Airport (from Annex 2B)."""
+    if airport_index is None:
+        airport_index = load_airport_index({})
+    entry = airport_index.get(airport)
+    return list(entry['arr_points']) if entry else []
 
 def resolve_points(identifier, points_db):
     """
@@ -0,0 +1,114 @@
+"""
+Annex 3B DCT restrictions, compiled per (from, to) pair.
+
+Each pair keeps the FL boundaries of all its Annex 3B rows and, per interval
+between two boundaries, the rows that apply there, so "may u -> v be flown
+at FL x (at time t)" is a bisect plus a check of those few rows.
+"""
+import bisect
+import collections
+from .points import NO_LEVEL_LIMIT_MAX
+from .timewindows import compile_time_windows
+from .utils import parse_fl
+
+# DctTable.status() results
+DCT_AVAILABLE = True        # explicit DCT, available
+DCT_NOT_AVAILABLE = False   # listed as NOT AVBL: the segment may not be flown at all
+# None: no Annex 3B row applies; FRA connectivity rules decide
+
+class DctRule:
+    """One Annex 3B row: FL interval [lower, upper], Y/N availability and time windows (None = any time)."""
+    __slots__ = ('lower', 'upper', 'available', 'times', 'utilization')
+
+    def __init__(self, lower, upper, available, times, utilization):
+        self.lower = lower
+        self.upper = upper
+        self.available = available
+        self.times = times
+        self.utilization = utilization
+
+    @classmethod
+    def from_edge(cls, edge, memo=None):
+        """Compiles one load_dct_edges() entry (memo: see compile_time_windows)."""
+        return cls(_parse_limit(edge.get('Lower'), 0),
+                   _parse_limit(edge.get('Upper'), NO_LEVEL_LIMIT_MAX),
+                   (edge.get('Available') or 'Yes').strip().upper() not in ('N', 'NO'),
+                   compile_time_windows(edge.get('Time'), memo),
+                   edge.get('Remarks', ''))
+
+    def __repr__(self):
+        return (f"DctRule(FL{self.lower}-FL{self.upper}, {'AVBL' if self.available else 'NOT AVBL'}, "
+                f"{self.times.text if self.times else 'H24'})")
+
+    def in_force(self, week_minute=None, summer=False):
+        """True if the row applies at the given time (None = at some time: only time-limited NOT AVBL rows lapse)."""
+        if self.times is None:
+            return True
+        if week_minute is None:
+            return self.available
+        return self.times.active_at(week_minute, summer)
+
+class DctTable:
+    """Compiled Annex 3B restrictions keyed by (from, to) point names."""
+
+    def __init__(self, edges):
+        """edges: load_dct_edges() dict (from -> [{'To', 'Lower', 'Upper', 'Available', 'Time', ...}])."""
+        rules = collections.defaultdict(list)
+        times = {}  # time text -> TimeWindows, shared by the rows of this table
+        for u, lst in edges.items():
+            for e in lst:
+                rules[(u, e['To'])].append(DctRule.from_edge(e, times))
+        self._pairs = {}
+        levels = set()
+        for pair, rs in rules.items():
+            bounds = sorted({r.lower for r in rs} | {r.upper + 1 for r in rs})
+            slots = [tuple(r for r in rs if r.lower <= lo <= r.upper) for lo in bounds[:-1]]
+            self._pairs[pair] = (bounds, slots)
+            levels.update(bounds)
+        self.fl_boundaries = sorted(levels)
+
+    def __len__(self):
+        return len(self._pairs)
+
+    def __contains__(self, pair):
+        return pair in self._pairs
+
+    def pairs(self):
+        return self._pairs.keys()
+
+    def rules(self, u, v, fl):
+        """Annex 3B rows for u -> v whose FL interval contains fl (empty tuple if none)."""
+        entry = self._pairs.get((u, v))
+        if entry is None:
+            return ()
+        bounds, slots = entry
+        i = bisect.bisect_right(bounds, fl) - 1
+        return slots[i] if 0 <= i < len(slots) else ()
+
+    def status(self, u, v, fl, week_minute=None, summer=False):
+        """
+        DCT_AVAILABLE, DCT_NOT_AVAILABLE or None (no row applies) for u -> v at
+        fl and, if given, at a week minute (timewindows.week_minute). Without a
+        time, time-limited rows count as in force when they allow the DCT.
+        """
+        status = None
+        for r in self.rules(u, v, fl):
+            if not r.in_force(week_minute, summer):
+                continue
+            if not r.available:
+                return DCT_NOT_AVAILABLE
+            status = DCT_AVAILABLE
+        return status
+
+    def usable(self, u, v, fl, week_minute=None, summer=False):
+        """True unless u -> v is listed as NOT AVBL at fl (and time)."""
+        return self.status(u, v, fl, week_minute, summer) is not DCT_NOT_AVAILABLE
+
+def _parse_limit(text, default):
+    """Annex 3B vertical limit ('FL245', '245', 'UNL', 'MEA', 'GND') as a flight level."""
+    text = (text or '').strip().upper()
+    if not text:
+        return default
+    if text == 'UNL':
+        return NO_LEVEL_LIMIT_MAX
+    return parse_fl(text)
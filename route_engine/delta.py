@@ -0,0 +1,285 @@
+"""
+Incremental dataset updates.
+
+Successive AIRAC cycles change only a small share of FRA points and Annex 3B
+DCTs. apply_delta() diffs a new set of CSVs against a loaded engine by point
+name and DCT key, then derives the new engine from the old one: adjacency rows
+whose edges cannot have changed are copied (with ids remapped), rows near a
+changed point only get their edges to changed points recomputed, and cached
+routes that provably still hold are carried over. The PointStore, airport index and KD-tree are rebuilt, which
+takes well under a second; ALT landmarks and contraction hierarchies are
+rebuilt lazily, since any edge change can move their distances.
+"""
+import os
+import numpy as np
+from .data_loader import (
+    DatasetFiles, read_fra_point_rows, load_dct_edges, load_airport_index, dataset_version
+)
+from .points import PointStore, COL_NAME
+from .airac import current_airac
+from .spatial import build_spatial_index
+from .graph import (
+    Adjacency, RULE_EXPLICIT, RULE_SAME_AIRSPACE, RULE_CROSS_BORDER,
+    explicit_edge_ids, graph_key, adjacency_cache_path, _build_rows
+)
+from .validator import valid_mask, connection_masks
+from .router import resolve_graph_node_options
+from .utils import haversine_many
+from .engine import Dataset, RouteEngine
+from .config import BASE_DIR, MAX_DCT_DISTANCE_KM
+
+# Bookkeeping column; a new cycle may flip it without changing the point
+COL_CHANGE_STATUS = 'Change Status'
+
+class DatasetDelta:
+    """Differences between two datasets, by point name and (from, to) DCT key."""
+
+    def __init__(self, added, removed, changed, dct_added, dct_removed, airports_changed):
+        self.added = added              # point names only in the new dataset
+        self.removed = removed          # point names only in the old dataset
+        self.changed = changed          # point names whose CSV row differs
+        self.dct_added = dct_added      # (from, to) keys new or with new remarks
+        self.dct_removed = dct_removed  # (from, to) keys gone or with old remarks
+        self.airports_changed = airports_changed  # ICAOs whose Annex 3A / 2B entry differs
+
+    def __repr__(self):
+        return (f"DatasetDelta(+{len(self.added)} -{len(self.removed)} ~{len(self.changed)} points, "
+                f"+{len(self.dct_added)} -{len(self.dct_removed)} DCTs, "
+                f"{len(self.airports_changed)} airports)")
+
+    @property
+    def empty(self):
+        return not (self.added or self.removed or self.changed or self.dct_added
+                    or self.dct_removed or self.airports_changed)
+
+    def affected_points(self):
+        """Names whose position, attributes or DCTs differ (either dataset)."""
+        pts = set(self.added) | set(self.removed) | set(self.changed)
+        for u, v in self.dct_added | self.dct_removed:
+            pts.add(u)
+            pts.add(v)
+        return pts
+
+def _dct_keys(edges):
+    return {(u, e['To'], tuple(sorted(e.items()))) for u, lst in edges.items() for e in lst}
+
+def diff_points(old_store, new_rows):
+    """(added, removed, changed) point names between a PointStore and new CSV rows."""
+    old_ids = old_store.name_to_id
+    new_names = {r[COL_NAME] for r in new_rows}
+    added = [r[COL_NAME] for r in new_rows if r[COL_NAME] not in old_ids]
+    removed = [n for n in old_store.names if n not in new_names]
+    changed = []
+    columns = old_store.columns
+    for r in new_rows:
+        i = old_ids.get(r[COL_NAME])
+        if i is None:
+            continue
+        for col, vals in columns.items():
+            if col != COL_CHANGE_STATUS and vals[i] != (r.get(col) or ''):
+                changed.append(r[COL_NAME])
+                break
+    return added, removed, changed
+
+def dataset_delta(old, new_rows, new_edges, new_airport_index):
+    """DatasetDelta of parsed new CSV contents against an old Dataset."""
+    added, removed, changed = diff_points(old.points_db, new_rows)
+    old_dct = _dct_keys(old.edges)
+    new_dct = _dct_keys(new_edges)
+    dct_added = {(u, v) for u, v, _ in new_dct - old_dct}
+    dct_removed = {(u, v) for u, v, _ in old_dct - new_dct}
+    airports = set(old.airport_index) | set(new_airport_index)
+    airports_changed = {a for a in airports if old.airport_index.get(a) != new_airport_index.get(a)}
+    return DatasetDelta(added, removed, changed, dct_added, dct_removed, airports_changed)
+
+def _near(store, spatial_index, names, km=MAX_DCT_DISTANCE_KM):
+    """Ids of `store` within km of the (store's own) positions of the given point names."""
+    ids = [store.name_to_id[n] for n in names if n in store.name_to_id]
+    hits = [spatial_index.query_radius_ids(i, km) for i in ids]
+    return np.unique(np.concatenate(hits + [np.array(ids, dtype=np.int64)])) if ids else np.empty(0, dtype=np.int64)
+
+def _dirty_rows(old, new, delta):
+    """
+    New ids whose adjacency row may gain or lose edges to an affected point:
+    points within DCT range of an affected point's old or new position, and
+    sources of explicit DCTs into an affected point.
+    """
+    affected = delta.affected_points()
+    dirty = np.zeros(len(new.points_db), dtype=bool)
+    dirty[_near(new.points_db, new.spatial_index, affected)] = True
+    old_ids = _near(old.points_db, old.spatial_index, affected)
+    new_of = new.points_db.name_to_id
+    for i in old_ids.tolist():
+        j = new_of.get(old.points_db.names[i])
+        if j is not None:
+            dirty[j] = True
+    for u, lst in list(old.edges.items()) + list(new.edges.items()):
+        if u in new_of and any(e['To'] in affected for e in lst):
+            dirty[new_of[u]] = True
+    return dirty
+
+def _edges_to(store, explicit, blocked, valid, u, targets):
+    """
+    Edges u -> targets under the same rules as graph._build_rows (explicit DCT,
+    else simulated within range unless NOT AVBL). Returns (indices, weights, rules).
+    """
+    targets = targets[(targets != u) & valid[targets]]
+    blk = blocked.get(u)
+    if blk is not None:
+        targets = targets[~np.isin(targets, blk)]
+    d = haversine_many(store.lat[u], store.lon[u], store.lat[targets], store.lon[targets])
+    same, cross = connection_masks(store, u, targets)
+    exp = explicit.get(u)
+    is_exp = np.isin(targets, exp) if exp is not None else np.zeros(len(targets), dtype=bool)
+    ok = is_exp | ((d < MAX_DCT_DISTANCE_KM) & (same | cross))
+    rules = np.where(is_exp, RULE_EXPLICIT, np.where(same, RULE_SAME_AIRSPACE, RULE_CROSS_BORDER))
+    return targets[ok], d[ok], rules[ok].astype(np.uint8)
+
+def update_adjacency(old_adj, old, new, intended_fl, direction, affected, dirty):
+    """
+    Adjacency of `new` for one profile, derived from old_adj: rows of affected
+    (and new) points are rebuilt, dirty rows keep their edges to unaffected
+    points and get their edges to affected points recomputed, and all other
+    rows are copied. Point ids are remapped to the new store throughout.
+    """
+    store = new.points_db
+    n = len(store)
+    remap = np.full(len(old.points_db), -1, dtype=np.int64)
+    old_of = np.full(n, -1, dtype=np.int64)
+    for j, name in enumerate(store.names):
+        i = old.points_db.name_to_id.get(name)
+        if i is not None:
+            remap[i] = j
+            old_of[j] = i
+    is_affected = np.zeros(n, dtype=bool)
+    is_affected[[store.name_to_id[a] for a in affected if a in store.name_to_id]] = True
+    is_affected |= old_of < 0
+    affected_ids = np.flatnonzero(is_affected)
+
+    valid = valid_mask(store, None, intended_fl, direction)
+    explicit, blocked = explicit_edge_ids(store, new.dct, intended_fl)
+    counts_b, idx_b, w_b, r_b = _build_rows(store, new.spatial_index, explicit, blocked, valid, affected_ids)
+    start_b = np.zeros(len(affected_ids) + 1, dtype=np.int64)
+    np.cumsum(counts_b, out=start_b[1:])
+    slot = np.full(n, -1, dtype=np.int64)
+    slot[affected_ids] = np.arange(len(affected_ids))
+
+    old_indptr = np.asarray(old_adj.indptr)
+    old_indices = np.asarray(old_adj.indices)
+    old_weights = np.asarray(old_adj.weights)
+    old_rules = np.asarray(old_adj.rules)
+    parts_i, parts_w, parts_r = [], [], []
+    counts = np.zeros(n, dtype=np.int64)
+    for j in range(n):
+        k = slot[j]
+        if k >= 0:
+            a, b = start_b[k], start_b[k + 1]
+            parts = [(idx_b[a:b], w_b[a:b], r_b[a:b])]
+        else:
+            a, b = old_indptr[old_of[j]], old_indptr[old_of[j] + 1]
+            targets = remap[old_indices[a:b]]
+            parts = [(targets, old_weights[a:b], old_rules[a:b])]
+            if dirty[j]:
+                # Removed points map to -1; both those and affected targets are recomputed
+                keep = targets >= 0
+                keep[keep] = ~is_affected[targets[keep]]
+                parts = [(targets[keep], old_weights[a:b][keep], old_rules[a:b][keep])]
+                if valid[j]:
+                    parts.append(_edges_to(store, explicit, blocked, valid, j, affected_ids))
+        for idx, w, r in parts:
+            parts_i.append(idx)
+            parts_w.append(w)
+            parts_r.append(r)
+            counts[j] += len(idx)
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    return Adjacency(indptr,
+                     np.concatenate(parts_i).astype(np.int32) if parts_i else np.empty(0, dtype=np.int32),
+                     np.concatenate(parts_w).astype(np.float64) if parts_w else np.empty(0),
+                     np.concatenate(parts_r).astype(np.uint8) if parts_r else np.empty(0, dtype=np.uint8),
+                     key=graph_key(store, intended_fl, direction))
+
+def _route_still_valid(entry, start_id, end_id, new, affected_xyz, delta):
+    """
+    True if a cached result is exactly what a search on `new` would return:
+    it found a route, touches no affected point or airport, and every affected
+    point is too far off the start / end options to offer a shorter path.
+    """
+    result = entry.result
+    if result is None:
+        return False  # a new point or DCT may connect the pair now
+    if start_id in delta.airports_changed or end_id in delta.airports_changed:
+        return False
+    affected = delta.affected_points()
+    if any(wp['name'] in affected for wp in result['route']):
+        return False
+    if not len(affected_xyz):
+        return True
+    store = new.points_db
+    starts = resolve_graph_node_options(start_id, store, is_start=True, airport_index=new.airport_index)
+    ends = resolve_graph_node_options(end_id, store, is_start=False, airport_index=new.airport_index)
+    s_ids = [store.name_to_id[s] for s in starts if s in store.name_to_id]
+    e_ids = [store.name_to_id[e] for e in ends if e in store.name_to_id]
+    if not s_ids or not e_ids:
+        return False
+    lat, lon = affected_xyz
+    to_start = np.min([haversine_many(store.lat[s], store.lon[s], lat, lon) for s in s_ids], axis=0)
+    to_end = np.min([haversine_many(store.lat[e], store.lon[e], lat, lon) for e in e_ids], axis=0)
+    # Any path through an affected point is at least this long (great circle)
+    return bool((to_start + to_end >= result['total_distance'] - 1e-6).all())
+
+def apply_delta(old_engine, dataset_path=None, airac=None):
+    """
+    New RouteEngine for the CSVs in dataset_path, derived incrementally from
+    old_engine: the adjacency of every profile old_engine has loaded is
+    updated row by row, and cached routes unaffected by the delta are kept.
+    Falls back to a plain reload (no reuse) if nothing can be shared.
+    """
+    old = old_engine.dataset
+    files = DatasetFiles.in_dir(dataset_path or BASE_DIR)
+    on_disk = current_airac(files.cover)
+    if airac is not None and on_disk is not None and on_disk != airac:
+        raise ValueError(f"Dataset {dataset_path or BASE_DIR} is AIRAC {on_disk}, expected {airac}")
+    version = dataset_version(files.sources, files.cover, airac)
+
+    rows = read_fra_point_rows(files.points)
+    points_db = PointStore(rows)
+    edges = load_dct_edges(files.dct)
+    airport_index = load_airport_index(points_db, files.dep, files.arr, files.annex_2b)
+    new = Dataset(version, airac or current_airac(files.cover), files, points_db, edges, airport_index,
+                  build_spatial_index(points_db))
+    delta = dataset_delta(old, rows, edges, airport_index)
+    engine = RouteEngine.from_dataset(new, old_engine.cache_dir)
+
+    # Adjacency rows
+    affected = delta.affected_points()
+    dirty = _dirty_rows(old, new, delta)
+    for (band, direction), old_adj in list(old_engine._adjacency.items()):
+        fl = old.points_db.band_fl(band)
+        adj = update_adjacency(old_adj, old, new, fl, direction, affected, dirty)
+        engine._adjacency[adj.key] = adj
+        path = adjacency_cache_path(adj.key, version, engine.cache_dir)
+        if not os.path.isdir(path):
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                adj.save(path)
+            except OSError as e:
+                print(f"[route_engine] Warning: could not persist adjacency ({e})")
+
+    # Cached routes
+    ids = np.array([points_db.name_to_id[n] for n in affected if n in points_db.name_to_id], dtype=np.int64)
+    affected_xyz = (points_db.lat[ids], points_db.lon[ids]) if len(ids) else ()
+    kept = 0
+    entries = old_engine.route_cache.items()
+    # Cached results carry their Annex 2B findings; they only stand if the rules are unchanged
+    old_annex = old_engine._annex_2b
+    annex_same = not entries or old_annex is None or engine.annex_2b.digest == old_annex.digest
+    for key, entry in entries:
+        start_id, end_id, *query, _ = key
+        if annex_same and _route_still_valid(entry, start_id, end_id, new, affected_xyz, delta):
+            engine.route_cache.put((start_id, end_id, *query, version), entry.result)
+            kept += 1
+
+    print(f"[route_engine] Delta {old.version} -> {version}: {delta}; patched {int(dirty.sum())}/{len(points_db)} "
+          f"rows per graph, kept {kept}/{len(entries)} cached routes")
+    return engine
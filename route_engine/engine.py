@@ -0,0 +1,580 @@
+"""
+RouteEngine: one loaded dataset plus the graphs and caches derived from it.
+
+The Dataset (points, DCT edges, airport index, spatial index) is immutable
+once loaded, per-profile structures are built under a lock, and all search
+state is local to a query, so one engine can be shared by many threads and
+several engines (e.g. the current and the next AIRAC cycle) can coexist in
+one process.
+"""
+import math
+import time
+import threading
+import functools
+from .data_loader import (
+    DatasetFiles, load_fra_points, load_dct_edges, load_airport_index, dataset_version
+)
+from .airac import current_airac
+from .router import resolve_graph_node_options, dijkstra_ids, ALGORITHMS
+from .kshortest import find_paths_k
+from .tree import RouteTree
+from .validator import is_node_valid
+from .spatial import build_spatial_index
+from .dct import DctTable
+from .annex2b import load_annex_2b
+from .timedep import TimedEdges, Departure
+from .graph import load_or_build_adjacency, graph_key
+from .landmarks import load_or_build_landmarks
+from .ch import load_or_build_ch
+from .snapshot import load_snapshot, write_snapshot, prune_cache
+from .cache import RouteCache, SearchTreeCache
+from .config import BASE_DIR, GRAPH_CACHE_DIR, DEFAULT_INTENDED_FL, DEFAULT_FLOS_DIRECTION
+
+class Dataset:
+    """
+    One loaded FRA / RAD dataset (AIRAC cycle + CSV revision). Nothing in it
+    is modified after construction, and it modifies none of the objects passed
+    in (points_db is copied if the DCT limits split its FL bands further), so
+    it is shared by threads and engines without locking.
+    """
+    __slots__ = ('version', 'airac', 'files', 'points_db', 'edges', 'dct', 'airport_index', 'spatial_index')
+
+    def __init__(self, version, airac, files, points_db, edges, airport_index, spatial_index):
+        self.version = version
+        self.airac = airac
+        self.files = files
+        self.edges = edges
+        self.dct = DctTable(edges)
+        # Graphs are built per FL band, so bands must also split at DCT vertical
+        # limits; a store without them is copied, never changed in place
+        self.points_db = points_db.with_fl_boundaries(self.dct.fl_boundaries)
+        self.airport_index = airport_index
+        self.spatial_index = spatial_index
+
+    @classmethod
+    def load(cls, files, airac=None, use_snapshot=True, cache_dir=GRAPH_CACHE_DIR):
+        """Loads the dataset from its binary snapshot if one is current, else from the CSVs."""
+        version = dataset_version(files.sources, files.cover, airac)
+        points_db = edges = airport_index = None
+        if use_snapshot:
+            snap = load_snapshot(version, cache_dir)
+            if snap:
+                print(f"[route_engine] Loaded snapshot {version}")
+                points_db, edges, airport_index = snap
+        if points_db is None:
+            print("[route_engine] Loading FRA Points...")
+            points_db = load_fra_points(files.points)
+            print("[route_engine] Loading DCT Edges...")
+            edges = load_dct_edges(files.dct)
+            print("[route_engine] Indexing Airport Connectivity (Annex 3A / 2B)...")
+            airport_index = load_airport_index(points_db, files.dep, files.arr, files.annex_2b)
+        return cls(version, airac or current_airac(files.cover), files, points_db, edges, airport_index,
+                   build_spatial_index(points_db))
+
+class RouteEngine:
+    """
+    Route finding over one dataset.
+
+    dataset_path: directory with the source CSVs, laid out like the repository
+                  root (default: config.BASE_DIR).
+    airac: expected AIRAC cycle id (e.g. '2513'); a dataset whose COVER sheet
+           names another cycle is rejected. Without a COVER sheet it labels
+           the dataset version instead.
+
+    The dataset is loaded on construction; adjacency, landmark and CH
+    structures are loaded (or built) per FL band / direction on first use.
+    """
+
+    def __init__(self, dataset_path=None, airac=None, use_snapshot=True, cache_dir=GRAPH_CACHE_DIR):
+        self.files = DatasetFiles.in_dir(dataset_path or BASE_DIR)
+        on_disk = current_airac(self.files.cover)
+        if airac is not None and on_disk is not None and on_disk != airac:
+            raise ValueError(f"Dataset {dataset_path or BASE_DIR} is AIRAC {on_disk}, expected {airac}")
+        self._setup(Dataset.load(self.files, airac, use_snapshot, cache_dir), cache_dir)
+
+    @classmethod
+    def from_dataset(cls, dataset, cache_dir=GRAPH_CACHE_DIR):
+        """Engine over an already loaded Dataset (e.g. one produced by delta.apply_delta)."""
+        engine = cls.__new__(cls)
+        engine.files = dataset.files
+        engine._setup(dataset, cache_dir)
+        return engine
+
+    def _setup(self, dataset, cache_dir):
+        self.cache_dir = cache_dir
+        self.dataset = dataset
+        self.route_cache = RouteCache()
+        self.tree_cache = SearchTreeCache()  # resumable A* search trees per start option set
+        self._adjacency = {}  # graph_key (FL band, direction) -> Adjacency
+        self._landmarks = {}  # graph_key (FL band, direction) -> Landmarks (ALT tables)
+        self._ch = {}         # graph_key (FL band, direction) -> ContractionHierarchy
+        self._timed = {}      # graph_key (FL band, direction) -> TimedEdges (time-limited Annex 3B edges)
+        self._annex_2b = None  # Annex2BIndex, compiled on first use
+        self._lock = threading.RLock()  # serializes loading / building of the above
+
+    def __repr__(self):
+        return f"RouteEngine({self.dataset.version!r})"
+
+    @property
+    def version(self):
+        return self.dataset.version
+
+    @property
+    def airac(self):
+        return self.dataset.airac
+
+    @property
+    def annex_2b(self):
+        """Annex 2B rules indexed by airway, segment and point / airspace (compiled once)."""
+        if self._annex_2b is None:
+            with self._lock:
+                if self._annex_2b is None:
+                    print("[route_engine] Indexing Annex 2B rules...")
+                    self._annex_2b = load_annex_2b(self.files.annex_2b)
+        return self._annex_2b
+
+    def adjacency(self, intended_fl=DEFAULT_INTENDED_FL, direction=DEFAULT_FLOS_DIRECTION, workers=None):
+        """Returns the CSR adjacency for an FL/direction profile (loaded or built once)."""
+        key = graph_key(self.dataset.points_db, intended_fl, direction)
+        adj = self._adjacency.get(key)
+        if adj is None:
+            with self._lock:
+                adj = self._adjacency.get(key)
+                if adj is None:
+                    d = self.dataset
+                    print(f"[route_engine] Loading Adjacency (FL band {key[0]}, {key[1]})...")
+                    adj = load_or_build_adjacency(d.points_db, d.spatial_index, d.dct, intended_fl, direction,
+                                                  workers=workers, cache_dir=self.cache_dir, version=d.version)
+                    self._adjacency[key] = adj
+        return adj
+
+    def landmarks(self, intended_fl=DEFAULT_INTENDED_FL, direction=DEFAULT_FLOS_DIRECTION, workers=None):
+        """Returns the ALT landmark tables for an FL/direction profile (loaded or built once)."""
+        adj = self.adjacency(intended_fl, direction, workers=workers)
+        landmarks = self._landmarks.get(adj.key)
+        if landmarks is None:
+            with self._lock:
+                landmarks = self._landmarks.get(adj.key)
+                if landmarks is None:
+                    print(f"[route_engine] Loading Landmarks (FL band {adj.key[0]}, {adj.key[1]})...")
+                    landmarks = load_or_build_landmarks(self.dataset.points_db, adj, workers=workers,
+                                                        cache_dir=self.cache_dir, version=self.version)
+                    self._landmarks[adj.key] = landmarks
+        return landmarks
+
+    def hierarchy(self, intended_fl=DEFAULT_INTENDED_FL, direction=DEFAULT_FLOS_DIRECTION, workers=None):
+        """Returns the contraction hierarchy for an FL/direction profile (loaded or built once)."""
+        adj = self.adjacency(intended_fl, direction, workers=workers)
+        ch = self._ch.get(adj.key)
+        if ch is None:
+            with self._lock:
+                ch = self._ch.get(adj.key)
+                if ch is None:
+                    print(f"[route_engine] Loading Contraction Hierarchy (FL band {adj.key[0]}, {adj.key[1]})...")
+                    ch = load_or_build_ch(adj, workers=workers, cache_dir=self.cache_dir, version=self.version)
+                    self._ch[adj.key] = ch
+        return ch
+
+    def timed_edges(self, intended_fl=DEFAULT_INTENDED_FL, direction=DEFAULT_FLOS_DIRECTION):
+        """Time-limited edges of an FL/direction profile's adjacency (compiled once)."""
+        adj = self.adjacency(intended_fl, direction)
+        timed = self._timed.get(adj.key)
+        if timed is None:
+            with self._lock:
+                timed = self._timed.get(adj.key)
+                if timed is None:
+                    timed = TimedEdges(self.dataset.points_db, adj, self.dataset.dct, intended_fl)
+                    self._timed[adj.key] = timed
+        return timed
+
+    def search_options(self, algorithm, fl, direction):
+        """Precomputed structures the selected search algorithm runs on."""
+        if algorithm == 'ch':
+            return {'hierarchy': self.hierarchy(fl, direction)}
+        if algorithm == 'astar':
+            return {'landmarks': self.landmarks(fl, direction), 'tree_cache': self.tree_cache}
+        return {'landmarks': self.landmarks(fl, direction)}
+
+    def build_cache(self, intended_fls=None, directions=(DEFAULT_FLOS_DIRECTION,), all_bands=False,
+                    workers=None, contraction_hierarchy=False):
+        """
+        Writes the binary dataset snapshot and materializes the adjacency and
+        its ALT landmark tables (plus the contraction hierarchy if requested)
+        for the given FLs and directions; see the module level build_cache().
+        Cached data of other dataset versions is removed.
+        """
+        d = self.dataset
+        path = write_snapshot(d.version, d.points_db, d.edges, d.airport_index, self.cache_dir,
+                              self.files.sources, self.files.cover)
+        print(f"[route_engine] Wrote snapshot {path}")
+
+        if intended_fls is None:
+            if all_bands:
+                # One representative FL per band
+                intended_fls = [b for b in d.points_db.fl_boundaries if 0 <= b <= 660]
+            else:
+                intended_fls = [DEFAULT_INTENDED_FL]
+        for fl in intended_fls:
+            for direction in directions:
+                self.landmarks(fl, direction, workers=workers)
+                if contraction_hierarchy:
+                    self.hierarchy(fl, direction, workers=workers)
+        prune_cache(d.version, self.cache_dir)
+        return d.version
+
+    def find_route(self, start_id, end_id, output_format='dict', fl=None, direction=None, algorithm='astar',
+                   eobt=None, epsilon=1.0, deadline_ms=None):
+        """Shortest valid route between two identifiers; see route_engine.find_route()."""
+        started = time.perf_counter()
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown algorithm '{algorithm}' (expected one of: {', '.join(ALGORITHMS)})")
+        if eobt is not None and algorithm != 'astar':
+            raise ValueError(f"Time-dependent routing (eobt) requires algorithm='astar', not '{algorithm}'")
+        if not epsilon >= 1.0:
+            raise ValueError(f"epsilon must be >= 1, not {epsilon}")
+        if deadline_ms is not None and not deadline_ms > 0:
+            raise ValueError(f"deadline_ms must be > 0, not {deadline_ms}")
+        bounded = epsilon != 1.0 or deadline_ms is not None
+        if bounded and algorithm != 'astar':
+            raise ValueError(f"Bounded-suboptimal / anytime search requires algorithm='astar', not '{algorithm}'")
+        if fl is None: fl = DEFAULT_INTENDED_FL
+        if direction is None: direction = DEFAULT_FLOS_DIRECTION
+        d = self.dataset
+
+        cache = self.route_cache
+        key = (start_id, end_id, fl, direction, algorithm, eobt, epsilon, deadline_ms, d.version)
+        entry = cache.get(key)
+        if entry is not None:
+            print(f"[route_engine] Routing {start_id} -> {end_id} (cached)")
+            return _cached_result(entry, output_format)
+
+        # Resolve Options
+        start_opts = resolve_graph_node_options(start_id, d.points_db, is_start=True, airport_index=d.airport_index)
+        end_opts = resolve_graph_node_options(end_id, d.points_db, is_start=False, airport_index=d.airport_index)
+
+        print(f"[route_engine] Routing {start_id} ({len(start_opts)} opts) -> {end_id} ({len(end_opts)} opts)")
+
+        if not start_opts or not end_opts:
+            print("[route_engine] Error: No valid start/end points found.")
+            cache.put(key, None)
+            return None
+
+        adjacency = self.adjacency(fl, direction)
+        search = ALGORITHMS[algorithm]
+        options = self.search_options(algorithm, fl, direction)
+        departure = None
+        if eobt is not None:
+            departure = options['departure'] = Departure(eobt, self.timed_edges(fl, direction))
+        stats = {}
+        if bounded:
+            options['epsilon'] = epsilon
+            if deadline_ms is not None:
+                options['deadline'] = started + deadline_ms / 1000.0
+            options['stats'] = stats
+        path, edge_info = search(start_opts, end_opts, d.edges, d.points_db, d.spatial_index, adjacency,
+                                 intended_fl=fl, direction=direction, **options)
+
+        if not path:
+            print("[route_engine] No route found.")
+            if deadline_ms is None:  # running out of time does not mean there is no route
+                cache.put(key, None)
+            return None
+
+        # Build detailed route information
+        result = _build_route_details(d, start_id, end_id, path, edge_info, self.annex_2b, departure)
+        # Rounded up, so the reported bound is never below the achieved one (1e-9: float noise of w x 1e4)
+        result['bound'] = math.ceil(stats.get('bound', 1.0) * 1e4 - 1e-9) / 1e4
+        return _cached_result(cache.put(key, result), output_format)
+
+    def find_routes_k(self, start_id, end_id, k=3, diversity=0.0, output_format='dict', fl=None, direction=None):
+        """Up to k alternative routes, the shortest first; see route_engine.find_routes_k()."""
+        if fl is None: fl = DEFAULT_INTENDED_FL
+        if direction is None: direction = DEFAULT_FLOS_DIRECTION
+        d = self.dataset
+
+        start_opts = resolve_graph_node_options(start_id, d.points_db, is_start=True, airport_index=d.airport_index)
+        end_opts = resolve_graph_node_options(end_id, d.points_db, is_start=False, airport_index=d.airport_index)
+
+        print(f"[route_engine] Routing {start_id} ({len(start_opts)} opts) -> {end_id} ({len(end_opts)} opts) (k={k})")
+
+        if not start_opts or not end_opts:
+            print("[route_engine] Error: No valid start/end points found.")
+            return []
+
+        found = find_paths_k(start_opts, end_opts, d.edges, d.points_db, d.spatial_index,
+                             self.adjacency(fl, direction), intended_fl=fl, direction=direction,
+                             k=k, diversity=diversity, landmarks=self.landmarks(fl, direction))
+        results = []
+        for rank, (path, edge_info, overlap) in enumerate(found, 1):
+            result = _build_route_details(d, start_id, end_id, path, edge_info, self.annex_2b)
+            result['rank'] = rank
+            result['overlap'] = round(overlap, 3)
+            if output_format == 'table':
+                result['table'] = _generate_table(result)
+            results.append(result)
+        if not results:
+            print("[route_engine] No route found.")
+        return results
+
+    def route_tree(self, origin, targets=None, max_km=None, fl=None, direction=None):
+        """One-to-many shortest distances from an origin; see route_engine.route_tree()."""
+        if fl is None: fl = DEFAULT_INTENDED_FL
+        if direction is None: direction = DEFAULT_FLOS_DIRECTION
+        d = self.dataset
+
+        if targets is None:
+            targets = [ad for ad, entry in d.airport_index.items() if entry['arr_points']]
+
+        name_to_id = d.points_db.name_to_id
+        start_opts = resolve_graph_node_options(origin, d.points_db, is_start=True, airport_index=d.airport_index)
+        start_ids = [name_to_id[s] for s in start_opts
+                     if s in name_to_id and is_node_valid(d.points_db, name_to_id[s], fl, direction)]
+
+        target_options = {}
+        for t in targets:
+            opts = resolve_graph_node_options(t, d.points_db, is_start=False, airport_index=d.airport_index)
+            target_options[t] = list(dict.fromkeys(name_to_id[o] for o in opts if o in name_to_id))
+        all_target_ids = {v for opts in target_options.values() for v in opts}
+
+        adjacency = self.adjacency(fl, direction)
+        g, parent, parent_edge = dijkstra_ids(adjacency, start_ids, all_target_ids, max_km)
+        return RouteTree(origin, d.points_db, adjacency, g, parent, parent_edge, target_options,
+                         route_builder=functools.partial(_build_route_details, d, annex_2b=self.annex_2b))
+
+    def distance_matrix(self, origins, destinations=None, max_km=None, fl=None, direction=None):
+        """Airport-by-airport shortest FRA distance matrix; see route_engine.distance_matrix()."""
+        matrix = {}
+        for origin in origins:
+            tree = self.route_tree(origin, destinations, max_km=max_km, fl=fl, direction=direction)
+            dests = destinations if destinations is not None else sorted(tree.distances)
+            matrix[origin] = {dst: tree.distance(dst) for dst in dests}
+        return matrix
+
+    def route_cache_stats(self):
+        """Hit / miss / eviction / expiration counters and size of the route result cache."""
+        return self.route_cache.stats()
+
+    def search_tree_cache_stats(self):
+        """Hit / miss / eviction counters and memory footprint of the A* search tree cache."""
+        return self.tree_cache.stats()
+
+    def clear_route_cache(self):
+        """Empties the route result cache and the search tree cache (counters are kept)."""
+        self.route_cache.clear()
+        self.tree_cache.clear()
+
+def _cached_result(entry, output_format):
+    """Caller-owned copy of a cached result; the table is rendered once per entry, on demand."""
+    if entry.result is None:
+        return None
+    result = dict(entry.result)
+    # Lists of row dicts ('route', 'annex_2b') are per caller; the rest is immutable
+    for name, value in entry.result.items():
+        if isinstance(value, list):
+            result[name] = [dict(row) for row in value]
+    if output_format == 'table':
+        if entry.table is None:
+            entry.table = _generate_table(entry.result)
+        result['table'] = entry.table
+    return result
+
+def _build_route_details(dataset, start_id, end_id, path, edge_info, annex_2b=None, departure=None):
+    """
+    Build detailed route information with all FRA checks (plus Annex 2B
+    post-validation if given; with a timedep.Departure, estimated times over
+    each point, and Annex 2B rules are checked at those times)
+    """
+
+    # Fetch airport requirements
+    start_reqs = _get_departure_requirements(dataset.airport_index, start_id, path[0] if path else None)
+    end_reqs = _get_arrival_requirements(dataset.airport_index, end_id, path[-1] if path else None, annex_2b)
+
+    # Build full route (include airports if different from waypoints)
+    full_route = []
+    total_dist = 0.0
+
+    # Add start (if airport)
+    if start_id not in path:
+        full_route.append({
+            'seq': 1,
+            'name': start_id,
+            'type': 'Airport',
+            'airspace': _guess_airspace(start_id),
+            'cross_border': '-',
+            'flos': '-',
+            'levels': '-',
+            'status_enr': '-',
+            'status_ad': '-',
+            'dist': 'Transition',
+            'connectivity_rule': 'Departure Logic',
+            'remarks': start_reqs or 'See Annex 3A'
+        })
+
+    # Add waypoints
+    flown = []  # distance flown before each waypoint
+    for i, p_name in enumerate(path):
+        p_data = dataset.points_db.get(p_name, {})
+        flown.append(total_dist)
+
+        dist_val = '-'
+        conn_rule = '-'
+
+        if i < len(path) - 1:
+            nxt = path[i+1]
+            info = edge_info.get(p_name, {}).get(nxt, {})
+            if info:
+                d = info.get('Dist', 0)
+                total_dist += d
+                dist_val = f"{d:.1f}"
+                r = info.get('Remarks', '')
+                if "Simulated:" in r:
+                    conn_rule = r.replace("Simulated: ", "")
+                else:
+                    conn_rule = r
+
+        full_route.append({
+            'seq': len(full_route) + 1,
+            'name': p_name,
+            'type': 'Waypoint',
+            'airspace': p_data.get('Airspace Location Indicators', '-'),
+            'cross_border': p_data.get('Cross-Border FRA States', '-'),
+            'flos': p_data.get('FLOS', '-'),
+            'levels': p_data.get('Level Availability', '-'),
+            'status_enr': p_data.get('FRA Status En-Route', '-'),
+            'status_ad': p_data.get('FRA Status ARR/DEP', '-'),
+            'dist': dist_val,
+            'connectivity_rule': conn_rule,
+            'remarks': '-'
+        })
+
+    # Add end (if airport)
+    if end_id not in path:
+        full_route.append({
+            'seq': len(full_route) + 1,
+            'name': end_id,
+            'type': 'Airport',
+            'airspace': _guess_airspace(end_id),
+            'cross_border': '-',
+            'flos': '-',
+            'levels': '-',
+            'status_enr': '-',
+            'status_ad': '-',
+            'dist': '-',
+            'connectivity_rule': 'Arrival Logic',
+            'remarks': end_reqs or 'See Annex 3A'
+        })
+
+    result = {
+        'success': True,
+        'route': full_route,
+        'total_distance': total_dist,
+        'start': start_id,
+        'end': end_id,
+        'waypoint_count': len(path)
+    }
+    minutes = None
+    if departure is not None:
+        # Airports: EOBT / time over the last waypoint (transitions are not timed)
+        along = iter(flown)
+        for wp in full_route:
+            dist = next(along) if wp['type'] == 'Waypoint' else (0.0 if wp['seq'] == 1 else total_dist)
+            wp['eto'] = _format_time(departure.time_at(dist))
+        result['eobt'] = _format_time(departure.eobt)
+        result['eta'] = _format_time(departure.time_at(total_dist))
+        minutes = [departure.minute_at(dist) for dist in flown]
+    if annex_2b is not None:
+        result['annex_2b'] = _check_annex_2b(dataset, annex_2b, start_id, end_id, path, minutes,
+                                             departure.summer if departure is not None else False)
+    return result
+
+def _get_departure_requirements(airport_index, airport, first_waypoint):
+    """Get departure requirements from Annex 3A"""
+    if not first_waypoint:
+        return None
+
+    entry = airport_index.get(airport) if airport_index else None
+    if not entry:
+        return None
+    for rule in entry['dep']:
+        if first_waypoint in rule['pt_str']:
+            details = []
+            if rule['sid']: details.append(f"SID: {rule['sid']}")
+            if rule['fpl']: details.append(f"FPL: {rule['fpl']}")
+            return "; ".join(details) if details else None
+    return None
+
+def _get_arrival_requirements(airport_index, airport, last_waypoint, annex_2b=None):
+    """Get arrival requirements from Annex 2B"""
+    if not last_waypoint:
+        return None
+
+    rules = annex_2b.arrival_rules(airport, last_waypoint) if annex_2b is not None else []
+    if rules:
+        return "(Annex 2B) " + "; ".join(f"{r.id}: {r.kind}" for r in rules)
+    entry = airport_index.get(airport) if airport_index else None
+    if entry and last_waypoint in entry['arr_points']:
+        return "(Annex 2B) Verified"
+    return None
+
+def _check_annex_2b(dataset, annex_2b, start_id, end_id, path, minutes=None, summer=False):
+    """
+    Annex 2B rules on the route's points, segments and airspaces that forbid
+    this flight (in force at `minutes`, the week minute over each point, if given).
+    """
+    points_db = dataset.points_db
+    adep = start_id if start_id not in points_db else None
+    ades = end_id if end_id not in points_db else None
+    airspaces = [points_db.airspaces[a] if a >= 0 else None
+                 for a in points_db.airspace_id[[points_db.name_to_id[p] for p in path]]] if path else ()
+    return [{'id': r.id, 'location': r.location or f"{r.airway} {r.from_point}-{r.to_point}",
+             'utilization': r.text}
+            for r in annex_2b.check_route(adep, ades, path, airspaces, minutes, summer)]
+
+def _format_time(when):
+    """UTC time as ISO 8601 to the minute ('2026-03-02T06:15Z')."""
+    return f"{when:%Y-%m-%dT%H:%MZ}"
+
+def _guess_airspace(airport_code):
+    """Guess airspace from airport ICAO code (first 2 letters)"""
+    if len(airport_code) >= 2:
+        return airport_code[:2].upper()
+    return '-'
+
+def _generate_table(result):
+    """Generate markdown table from route details"""
+    lines = []
+    lines.append("\n### Route Details Table")
+    lines.append("| Seq | Point | Type | Airspace | Cross-Border | FLOS | Levels | Status (Enr) | Status (A/D) | Dist (km) | Connectivity Rule | Remarks |")
+    lines.append("|-----|-------|------|----------|--------------|------|--------|--------------|--------------|-----------|-------------------|---------|")
+
+    for wp in result['route']:
+        # Truncate long fields
+        levels = wp['levels']
+        if len(levels) > 15:
+            levels = levels.replace('FL', '')
+
+        remarks = wp['remarks']
+        if len(remarks) > 30:
+            remarks = remarks[:27] + "..."
+
+        line = f"| {wp['seq']} | {wp['name']} | {wp['type']} | {wp['airspace']} | {wp['cross_border']} | {wp['flos']} | {levels} | {wp['status_enr']} | {wp['status_ad']} | {wp['dist']} | {wp['connectivity_rule']} | {remarks} |"
+        lines.append(line)
+
+    lines.append(f"\n**Total Distance (Waypoints):** {result['total_distance']:.1f} km")
+    if 'eobt' in result:
+        lines.append(f"\n**EOBT:** {result['eobt']} | **ETA:** {result['eta']}")
+    if result.get('bound', 1.0) > 1.0:
+        lines.append(f"\n**Bound:** at most {result['bound']} x the shortest route")
+    lines.append("\n### Compliance Verification")
+    lines.append("- **Connectivity**: ✅ All segments validated (see Connectivity Rule column)")
+    lines.append("- **FLOS Compliance**: ✅ All points checked for directional compatibility")
+    lines.append("- **Status Compliance**: ✅ En-route/Arr/Dep status verified")
+    if 'annex_2b' in result:
+        findings = result['annex_2b']
+        if findings:
+            lines.append(f"- **Annex 2B**: ⚠️ {len(findings)} restriction(s) apply: "
+                         + ", ".join(f"{f['id']} ({f['location']})" for f in findings))
+        else:
+            lines.append("- **Annex 2B**: ✅ No restriction on the route's points, segments or airspaces applies")
+
+    return "\n".join(lines)
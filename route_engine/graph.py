@@ -0,0 +1,272 @@
+import os
+import shutil
+import collections
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .utils import haversine_many
+from .validator import valid_mask, connection_masks
+from .dct import DctTable, DCT_AVAILABLE, DCT_NOT_AVAILABLE
+from .data_loader import dataset_version
+from .config import MAX_DCT_DISTANCE_KM, GRAPH_CACHE_DIR
+
+# Connectivity rule codes stored per CSR edge
+RULE_EXPLICIT = 0
+RULE_SAME_AIRSPACE = 1
+RULE_CROSS_BORDER = 2
+
+GRAPH_FORMAT_VERSION = 2
+
+class Adjacency:
+    """
+    Directed FRA graph in CSR form for one (FL band, direction) key.
+
+    Edges of node v are indices[indptr[v]:indptr[v+1]], with great-circle
+    weights (km) and connectivity rule codes in the parallel arrays.
+    """
+
+    def __init__(self, indptr, indices, weights, rules, key=None):
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.rules = rules
+        self.key = key
+        self._reverse = None
+
+    @property
+    def num_nodes(self):
+        return len(self.indptr) - 1
+
+    @property
+    def num_edges(self):
+        return len(self.indices)
+
+    def neighbors(self, v):
+        """Returns (edge_start, targets, weights) lists for node v."""
+        a = self.indptr[v]
+        b = self.indptr[v + 1]
+        return a, self.indices[a:b].tolist(), self.weights[a:b].tolist()
+
+    def edge_id(self, u, v):
+        """CSR index of edge u -> v, or None if there is no such edge."""
+        a = self.indptr[u]
+        hits = np.flatnonzero(self.indices[a:self.indptr[u + 1]] == v)
+        return int(a + hits[0]) if len(hits) else None
+
+    @property
+    def reverse(self):
+        """Transposed graph (built once): row v lists the edges u -> v."""
+        if self._reverse is None:
+            self._reverse = ReverseAdjacency(self)
+        return self._reverse
+
+    ARRAYS = ('indptr', 'indices', 'weights', 'rules')
+
+    def save(self, path):
+        """Saves the CSR arrays as .npy files in directory `path`."""
+        # Write to a temp directory first so concurrent readers never see a partial graph
+        tmp = f"{path}.{os.getpid()}.tmp"
+        os.makedirs(tmp, exist_ok=True)
+        for name in self.ARRAYS:
+            np.save(os.path.join(tmp, f"{name}.npy"), getattr(self, name))
+        try:
+            os.rename(tmp, path)
+        except OSError:
+            # Another process won the race; keep its copy
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    @classmethod
+    def load(cls, path, key=None, mmap=True):
+        """Loads a saved adjacency; arrays are memory-mapped (read-only, shared pages)."""
+        mode = 'r' if mmap else None
+        arrays = [np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode) for name in cls.ARRAYS]
+        return cls(*arrays, key=key)
+
+class ReverseAdjacency:
+    """
+    Transpose of an Adjacency, for backward searches. Edge k of the reverse
+    graph is forward edge edge_ids[k], so rules and weights are shared with
+    the forward graph and the directional cross-border rule is preserved.
+    """
+
+    def __init__(self, forward):
+        n = forward.num_nodes
+        sources = np.repeat(np.arange(n, dtype=np.int32), np.diff(forward.indptr))
+        order = np.argsort(forward.indices, kind='stable')
+        self.edge_ids = order.astype(np.int64)
+        self.indices = sources[order]
+        self.weights = np.asarray(forward.weights)[order]
+        counts = np.bincount(forward.indices, minlength=n)
+        self.indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.indptr[1:])
+
+    @property
+    def num_nodes(self):
+        return len(self.indptr) - 1
+
+    def neighbors(self, v):
+        """Returns (forward_edge_ids, sources, weights) lists for edges u -> v."""
+        a = self.indptr[v]
+        b = self.indptr[v + 1]
+        return self.edge_ids[a:b].tolist(), self.indices[a:b].tolist(), self.weights[a:b].tolist()
+
+def rule_label(store, rule, target_id):
+    """Human readable connectivity rule (as shown in the route details table)."""
+    if rule == RULE_EXPLICIT:
+        return "Explicit DCT"
+    if rule == RULE_SAME_AIRSPACE:
+        return "Simulated: Same Airspace"
+    return f"Simulated: Cross-Border > {store.airspaces[store.airspace_id[target_id]]}"
+
+def graph_key(store, intended_fl, direction):
+    """Adjacency cache key: FL bands with identical node validity share a graph."""
+    return (store.fl_band(intended_fl), direction.upper())
+
+def explicit_edge_ids(store, dct, intended_fl):
+    """
+    Annex 3B DCTs at intended_fl as id arrays per source id: (explicit, blocked).
+    explicit: DCTs available at that level; blocked: pairs listed as NOT AVBL
+    there, which get no simulated FRA connection either.
+    dct: DctTable, or the load_dct_edges() dict (compiled on the fly).
+    """
+    if not isinstance(dct, DctTable):
+        dct = DctTable(dct)
+    explicit = collections.defaultdict(list)
+    blocked = collections.defaultdict(list)
+    for u, v in dct.pairs():
+        uid = store.id_of(u)
+        vid = store.id_of(v)
+        if uid is None or vid is None: continue
+        status = dct.status(u, v, intended_fl)
+        if status is DCT_AVAILABLE:
+            explicit[uid].append(vid)
+        elif status is DCT_NOT_AVAILABLE:
+            blocked[uid].append(vid)
+    return ({u: np.array(ids, dtype=np.int64) for u, ids in explicit.items()},
+            {u: np.array(ids, dtype=np.int64) for u, ids in blocked.items()})
+
+def _build_rows(store, spatial_index, explicit, blocked, valid, src_ids):
+    """
+    Materializes the outgoing edges of src_ids.
+    Returns (counts, indices, weights, rules) for those rows, in order.
+    """
+    lat, lon = store.lat, store.lon
+    counts = np.zeros(len(src_ids), dtype=np.int64)
+    out_idx, out_w, out_r = [], [], []
+
+    for k, curr in enumerate(src_ids):
+        # Nodes that fail validity can never be entered, so they get no edges
+        if not valid[curr]:
+            continue
+
+        # 1. Explicit Edges
+        exp = explicit.get(curr)
+        if exp is not None:
+            exp = exp[valid[exp]]
+            d_exp = haversine_many(lat[curr], lon[curr], lat[exp], lon[exp])
+        else:
+            exp = np.empty(0, dtype=np.int64)
+            d_exp = np.empty(0)
+
+        # 2. Simulated Edges
+        cand = spatial_index.query_radius_ids(curr, MAX_DCT_DISTANCE_KM)
+        cand = cand[(cand != curr) & valid[cand]]
+        d = haversine_many(lat[curr], lon[curr], lat[cand], lon[cand])
+        same, cross = connection_masks(store, curr, cand)
+        ok = (d < MAX_DCT_DISTANCE_KM) & (same | cross)
+        if len(exp):
+            ok &= ~np.isin(cand, exp)
+        blk = blocked.get(curr)
+        if blk is not None:
+            ok &= ~np.isin(cand, blk)
+
+        rules = np.where(same[ok], RULE_SAME_AIRSPACE, RULE_CROSS_BORDER)
+        out_idx.append(exp)
+        out_idx.append(cand[ok])
+        out_w.append(d_exp)
+        out_w.append(d[ok])
+        out_r.append(np.full(len(exp), RULE_EXPLICIT))
+        out_r.append(rules)
+        counts[k] = len(exp) + int(ok.sum())
+
+    if not out_idx:
+        return counts, np.empty(0, dtype=np.int32), np.empty(0), np.empty(0, dtype=np.uint8)
+    return (counts,
+            np.concatenate(out_idx).astype(np.int32),
+            np.concatenate(out_w).astype(np.float64),
+            np.concatenate(out_r).astype(np.uint8))
+
+# State shared with forked build workers (set before the pool starts)
+_BUILD_STATE = None
+
+def _build_chunk(src_ids):
+    store, spatial_index, explicit, blocked, valid = _BUILD_STATE
+    return _build_rows(store, spatial_index, explicit, blocked, valid, src_ids)
+
+def build_adjacency(store, spatial_index, edges, intended_fl, direction, workers=None):
+    """
+    Builds the CSR adjacency (Annex 3B explicit DCTs + simulated FRA DCTs)
+    for one FL/direction profile. edges: Dataset.dct (or the raw DCT dict);
+    DCTs NOT AVBL at the profile's level are left out. Rows are built in
+    parallel across `workers` processes where fork is available.
+    """
+    global _BUILD_STATE
+    n = len(store)
+    valid = valid_mask(store, None, intended_fl, direction)
+    explicit, blocked = explicit_edge_ids(store, edges, intended_fl)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    chunks = [np.arange(i, min(i + 512, n)) for i in range(0, n, 512)]
+
+    if workers > 1 and len(chunks) > 1 and 'fork' in multiprocessing.get_all_start_methods():
+        _BUILD_STATE = (store, spatial_index, explicit, blocked, valid)
+        try:
+            ctx = multiprocessing.get_context('fork')
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+                parts = list(pool.map(_build_chunk, chunks))
+        finally:
+            _BUILD_STATE = None
+    else:
+        parts = [_build_rows(store, spatial_index, explicit, blocked, valid, c) for c in chunks]
+
+    counts = np.concatenate([p[0] for p in parts]) if parts else np.zeros(0, dtype=np.int64)
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    indices = np.concatenate([p[1] for p in parts]) if parts else np.empty(0, dtype=np.int32)
+    weights = np.concatenate([p[2] for p in parts]) if parts else np.empty(0)
+    rules = np.concatenate([p[3] for p in parts]) if parts else np.empty(0, dtype=np.uint8)
+    return Adjacency(indptr, indices, weights, rules, key=graph_key(store, intended_fl, direction))
+
+def adjacency_cache_path(key, version, cache_dir=GRAPH_CACHE_DIR):
+    """Directory of a persisted adjacency, inside the dataset version's cache directory."""
+    band, direction = key
+    params = f"g{GRAPH_FORMAT_VERSION}_r{int(MAX_DCT_DISTANCE_KM)}"
+    return os.path.join(cache_dir, version, f"adjacency_{params}_b{band}_{direction}")
+
+def load_or_build_adjacency(store, spatial_index, edges, intended_fl, direction,
+                            workers=None, cache_dir=GRAPH_CACHE_DIR, version=None):
+    """
+    Loads a persisted adjacency for this profile, or builds and persists it.
+    Cached graphs are keyed by dataset_version(), so they are rebuilt
+    automatically when the source CSVs or the AIRAC cycle change.
+    """
+    key = graph_key(store, intended_fl, direction)
+    if version is None:
+        version = dataset_version()
+    path = adjacency_cache_path(key, version, cache_dir)
+    if os.path.isdir(path):
+        try:
+            adj = Adjacency.load(path, key=key)
+            if adj.num_nodes == len(store):
+                return adj
+        except (OSError, ValueError):
+            pass
+
+    adj = build_adjacency(store, spatial_index, edges, intended_fl, direction, workers)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        adj.save(path)
+    except OSError as e:
+        print(f"[route_engine] Warning: could not persist adjacency ({e})")
+    return adj
@@ -0,0 +1,108 @@
+"""
+Zero-downtime dataset switches.
+
+An EngineSlot holds the active RouteEngine and at most one staged successor.
+The successor is loaded (and its graphs warmed) in a background thread while
+the active engine keeps serving, then becomes active with a single reference
+assignment, either immediately or at the AIRAC effective date of its data.
+Queries that already hold the old engine finish on it undisturbed.
+"""
+import time
+import datetime
+import threading
+from concurrent.futures import Future
+from .engine import RouteEngine
+from .delta import apply_delta
+from .airac import read_effective_date
+from .config import DEFAULT_INTENDED_FL, DEFAULT_FLOS_DIRECTION
+
+def effective_time(engine):
+    """POSIX time (00:00 UTC of the COVER sheet effective date) the engine's dataset takes effect, or None."""
+    date = read_effective_date(engine.files.cover)
+    if date is None:
+        return None
+    return datetime.datetime.combine(date, datetime.time(0), tzinfo=datetime.timezone.utc).timestamp()
+
+class EngineSlot:
+    """
+    Active RouteEngine plus an optional staged one with its switch time.
+    get() is lock-free unless a staged engine is due, so swaps never block readers.
+    """
+
+    def __init__(self, engine=None, clock=time.time):
+        self._active = engine
+        self._staged = None  # (engine, effective_at POSIX time)
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def get(self):
+        """The engine to run a query on (promotes the staged engine once it is due), or None."""
+        staged = self._staged
+        if staged is not None and staged[1] <= self._clock():
+            with self._lock:
+                if self._staged is staged:
+                    self._active, self._staged = staged[0], None
+                    print(f"[route_engine] Switched to dataset {staged[0].version}")
+        return self._active
+
+    @property
+    def staged(self):
+        """(engine, effective_at) of the pending switch, or None."""
+        return self._staged
+
+    def swap(self, engine):
+        """Makes `engine` active now and drops any staged engine; returns the previous one."""
+        with self._lock:
+            previous, self._active, self._staged = self._active, engine, None
+        return previous
+
+    def stage(self, engine, effective_at=None):
+        """
+        Schedules `engine` to become active at `effective_at` (POSIX time;
+        None = immediately). Replaces an earlier staged engine.
+        """
+        if effective_at is None or effective_at <= self._clock():
+            self.swap(engine)
+            print(f"[route_engine] Switched to dataset {engine.version}")
+            return
+        with self._lock:
+            self._staged = (engine, effective_at)
+        when = datetime.datetime.fromtimestamp(effective_at, datetime.timezone.utc)
+        print(f"[route_engine] Staged dataset {engine.version}, active from {when:%Y-%m-%d %H:%M} UTC")
+
+    def load(self, dataset_path=None, airac=None, effective_at='airac', profiles=None,
+             workers=None, background=True, incremental=False):
+        """
+        Loads a RouteEngine for dataset_path, warms the adjacency and landmark
+        tables of `profiles` ((fl, direction) pairs; default: the default
+        profile) and stages it. effective_at: POSIX time, None (switch as soon
+        as it is loaded) or 'airac' (the dataset's COVER sheet effective date).
+        incremental: derive the engine from the active one (delta.apply_delta)
+        instead of loading it from scratch.
+
+        Returns a Future of the new engine; with background=False it is
+        already resolved (or raises) when load() returns.
+        """
+        future = Future()
+
+        def run():
+            try:
+                if incremental and self._active is not None:
+                    engine = apply_delta(self._active, dataset_path, airac=airac)
+                else:
+                    engine = RouteEngine(dataset_path, airac=airac)
+                for fl, direction in profiles or [(DEFAULT_INTENDED_FL, DEFAULT_FLOS_DIRECTION)]:
+                    engine.landmarks(fl, direction, workers=workers)
+                self.stage(engine, effective_time(engine) if effective_at == 'airac' else effective_at)
+            except BaseException as e:
+                print(f"[route_engine] Error: could not load dataset {dataset_path}: {e!r}")
+                future.set_exception(e)
+            else:
+                future.set_result(engine)
+
+        if background:
+            threading.Thread(target=run, name='route-dataset-load', daemon=True).start()
+        else:
+            run()
+            future.result()
+        return future
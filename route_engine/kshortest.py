@@ -0,0 +1,362 @@
+"""
+K shortest loopless routes (Yen's algorithm) and diverse alternatives.
+
+The base search is a reverse A* from the end options towards the start
+options (reverse_tree). It yields the shortest route and the exact distance
+to the goal of every node it settles, an ellipse around that route. Every
+later search runs A* on a subgraph (Yen: minus root nodes and banned edges)
+or on the graph with raised weights (diverse alternatives: edges into the
+corridor of earlier routes). On those graphs the tree distances are still
+lower bounds, so the searches walk down the tree instead of starting cold.
+Outside the tree, the reverse search's final key gives a bound as well.
+
+In free route airspace, Yen's order is dominated by near-identical routes: a
+waypoint almost on the track makes a new path a few metres longer. So
+diversity is measured geographically, as the share of a route's length
+outside a corridor around the routes before it.
+"""
+import math
+import heapq
+from array import array
+import numpy as np
+from .router import _prepare_search, _ids_to_route, heuristic_table
+from .utils import haversine, to_unit_vectors
+from .spatial import build_spatial_index
+from .config import (
+    DEFAULT_INTENDED_FL, DEFAULT_FLOS_DIRECTION,
+    K_SHORTEST_TREE_STRETCH, K_SHORTEST_MAX_PATHS, K_SHORTEST_CORRIDOR_KM,
+)
+
+# Corridor penalty factors tried by diverse_ids (doubling)
+_MIN_PENALTY = 2.0
+_MAX_PENALTY = 1024.0
+
+def reverse_tree(adjacency, end_ids, start_ids, h_rev, stretch=K_SHORTEST_TREE_STRETCH):
+    """
+    Reverse A* from end_ids (over adjacency.reverse) towards start_ids.
+    h_rev: consistent estimate of the distance from the nearest start id to
+    each node (list by id, see router.heuristic_table(..., reverse=True)).
+    It keeps settling nodes until the smallest key exceeds `stretch` x the
+    shortest start distance.
+
+    Returns (dist, next_id, next_edge, key): the exact distance to the nearest
+    end for settled nodes (inf otherwise), each settled node's successor and
+    forward edge towards it, and the final key. Every unsettled node v is at
+    least key - h_rev[v] from the end (key = inf: unreachable).
+    """
+    reverse = adjacency.reverse
+    indptr, indices, weights = reverse.indptr, reverse.indices, reverse.weights
+    n = adjacency.num_nodes
+    inf = float('inf')
+    dist = array('d', [inf]) * n
+    next_id = array('l', [-1]) * n
+    next_edge = array('l', [-1]) * n
+    done = bytearray(n)
+    is_start = bytearray(n)
+    for s in start_ids:
+        is_start[s] = 1
+
+    heap = [(h_rev[t], t) for t in end_ids]
+    for t in end_ids:
+        dist[t] = 0.0
+    heapq.heapify(heap)
+    limit = inf
+    key = inf
+    while heap:
+        f, u = heapq.heappop(heap)
+        if done[u]: continue
+        if f > limit:
+            key = f
+            break
+        done[u] = 1
+        if is_start[u] and limit == inf:
+            limit = dist[u] * stretch
+
+        d = dist[u]
+        a, b = indptr[u], indptr[u + 1]
+        for k, v, w in zip(range(a, b), indices[a:b].tolist(), weights[a:b].tolist()):
+            nd = d + w
+            if nd < dist[v]:
+                dist[v] = nd
+                next_id[v] = u
+                next_edge[v] = k  # reverse CSR position, mapped to the forward edge below
+                heapq.heappush(heap, (nd + h_rev[v], v))
+
+    # Tentative labels are not distances: hide them
+    for v in range(n):
+        if not done[v] and dist[v] != inf:
+            dist[v] = inf
+            next_id[v] = -1
+            next_edge[v] = -1
+    pos = np.frombuffer(next_edge, dtype=np.int64)
+    tree = pos >= 0
+    pos[tree] = reverse.edge_ids[pos[tree]]
+    return dist, next_id, next_edge, key
+
+def _spur_search(adjacency, tree, seeds, g0, h, is_end, banned, banned_edges, spur, penalized=None, factor=1.0):
+    """
+    A* from seeds (g = g0) to the nearest end node, never entering `banned`
+    nodes nor leaving `spur` over one of banned_edges. Edges into
+    `penalized` nodes (bytearray, if given) weigh `factor` times their length.
+    h only needs to be admissible: nodes are re-expanded when reached cheaper.
+    tree: (next_id, next_edge) of reverse_tree, where h is exact. Once the
+    node with the smallest key has a tree path that avoids banned and
+    penalized nodes, that path is optimal, so it is taken without expanding
+    further.
+    Returns (ids, edges, cost) or None, cost including penalties. Search
+    state is kept in dicts since the near-exact estimate keeps it small.
+    """
+    next_id, next_edge = tree
+    inf = float('inf')
+    g, parent, parent_edge = {}, {}, {}
+    open_set = []
+    for s in seeds:
+        if h[s] < inf:
+            g[s] = g0
+            parent[s] = -1
+            open_set.append((g0 + h[s], g0, s))
+    heapq.heapify(open_set)
+    no_edges = frozenset()
+
+    while open_set:
+        f, g_u, u = heapq.heappop(open_set)
+        if g_u > g[u]: continue  # stale entry
+        tail = _tree_path(u, next_id, next_edge, is_end, banned, banned_edges, spur, penalized)
+        if tail is not None:
+            ids, edges = [], []
+            v = u
+            while parent[v] >= 0:
+                edges.append(parent_edge[v])
+                v = parent[v]
+                ids.append(v)
+            ids.reverse()
+            edges.reverse()
+            return ids + tail[0], edges + tail[1], f
+
+        skip = banned_edges if u == spur else no_edges
+        edge, targets, weights = adjacency.neighbors(u)
+        for v, w in zip(targets, weights):
+            if not banned[v] and edge not in skip:
+                new_g = g_u + (w * factor if penalized is not None and penalized[v] else w)
+                if new_g < g.get(v, inf) and h[v] < inf:
+                    g[v] = new_g
+                    parent[v] = u
+                    parent_edge[v] = edge
+                    heapq.heappush(open_set, (new_g + h[v], new_g, v))
+            edge += 1
+    return None
+
+def _tree_path(u, next_id, next_edge, is_end, banned, banned_edges, spur, penalized):
+    """
+    ([u ... end], [edges]) along the tree, if that path enters no banned or
+    penalized node, does not revisit spur nor leave it over a banned edge;
+    None if it does or u is outside the tree.
+    """
+    if u == spur and next_edge[u] in banned_edges:
+        return None
+    ids, edges = [u], []
+    v = u
+    while not is_end[v]:
+        if next_id[v] < 0:
+            return None
+        edges.append(next_edge[v])
+        v = next_id[v]
+        if banned[v] or v == spur or (penalized is not None and penalized[v]):
+            return None
+        ids.append(v)
+    return ids, edges
+
+def yen_ids(adjacency, start_ids, end_ids, base, tree, h, k, max_paths=K_SHORTEST_MAX_PATHS, stats=None):
+    """
+    Yen's k shortest loopless paths from any of start_ids to any of end_ids.
+
+    base: (ids, edges) of a shortest path; tree: (next_id, next_edge) of
+    reverse_tree; h: admissible per-node estimate to the nearest end (list by
+    id), exact on the tree. Start options are handled as the
+    successors of a virtual source, so alternatives may also start elsewhere.
+    At most max_paths paths are returned.
+    stats: optional dict, receives 'paths' and 'spur_searches'.
+
+    Returns [(ids, edges, cost, overlap)] in order of cost, where overlap is
+    the largest share of the path's length on edges of a shorter path.
+    """
+    weights = adjacency.weights
+    n = adjacency.num_nodes
+    is_end = bytearray(n)
+    for e in end_ids:
+        is_end[e] = 1
+    banned = bytearray(n)
+
+    ids, edges = list(base[0]), list(base[1])
+    cost = float(sum(weights[e] for e in edges))
+    paths = [(ids, edges, cost, 0.0)]
+    path_edges = [set(edges)]
+    seen = {tuple(ids)}
+    candidates = []
+    spurs = 0
+
+    while len(paths) < min(k, max_paths):
+        ids, edges, _, _ = paths[-1]
+        prefix = np.concatenate(([0.0], np.cumsum([weights[e] for e in edges])))
+        for i in range(-1, len(ids) - 1):
+            if i < 0:
+                # Deviation at the virtual source: another start option
+                used = {p[0][0] for p in paths}
+                seeds = [s for s in start_ids if s not in used]
+                found = _spur_search(adjacency, tree, seeds, 0.0, h, is_end, banned, (), -1)
+            else:
+                root = ids[:i + 1]
+                banned_edges = {p_edges[i] for p_ids, p_edges, _, _ in paths
+                                if len(p_ids) > i + 1 and p_ids[:i + 1] == root}
+                for r in root[:-1]:
+                    banned[r] = 1
+                found = _spur_search(adjacency, tree, [ids[i]], float(prefix[i]), h, is_end, banned, banned_edges,
+                                     ids[i])
+                for r in root[:-1]:
+                    banned[r] = 0
+            spurs += 1
+            if found is None:
+                continue
+            s_ids, s_edges, s_cost = found
+            path_ids = ids[:max(i, 0)] + s_ids
+            key = tuple(path_ids)
+            if key not in seen:
+                seen.add(key)
+                heapq.heappush(candidates, (s_cost, len(seen), path_ids, edges[:max(i, 0)] + s_edges))
+
+        if not candidates:
+            break
+        cost, _, ids, edges = heapq.heappop(candidates)
+        overlap = max(sum(weights[e] for e in edges if e in q) for q in path_edges) / cost if cost else 1.0
+        paths.append((ids, edges, cost, float(overlap)))
+        path_edges.append(set(edges))
+
+    if stats is not None:
+        stats['paths'] = len(paths)
+        stats['spur_searches'] = spurs
+    return paths
+
+def diverse_ids(adjacency, start_ids, end_ids, base, tree, h, k, diversity, corridor,
+                max_paths=K_SHORTEST_MAX_PATHS, stats=None):
+    """
+    Up to k routes, each with at least `diversity` (0..1) of its length
+    outside the corridors of the routes found before it (penalty method).
+    base, tree, h: as for yen_ids; corridor(ids) returns the node ids near a
+    route. Each search is A* with
+    edges into corridor nodes weighted x factor; the factor doubles until
+    the route found is diverse enough. At most max_paths searches are run.
+    stats: optional dict, receives 'paths' (searches run).
+
+    Returns [(ids, edges, cost, overlap)] in the order found, overlap being
+    the largest share of the route's length inside one earlier corridor.
+    """
+    weights = adjacency.weights
+    n = adjacency.num_nodes
+    is_end = bytearray(n)
+    for e in end_ids:
+        is_end[e] = 1
+    no_nodes = bytearray(n)
+    penalized = bytearray(n)
+
+    ids, edges = list(base[0]), list(base[1])
+    accepted = [(ids, edges, float(sum(weights[e] for e in edges)), 0.0)]
+    corridors = [corridor(ids)]
+    for v in corridors[0]:
+        penalized[v] = 1
+    seen = {tuple(ids)}
+    factor = _MIN_PENALTY
+    searches = 0
+
+    while len(accepted) < k and searches < max_paths and factor <= _MAX_PENALTY:
+        found = _spur_search(adjacency, tree, start_ids, 0.0, h, is_end, no_nodes, (), -1, penalized, factor)
+        searches += 1
+        if found is None:
+            break
+        ids, edges, _ = found
+        cost = float(sum(weights[e] for e in edges))
+        shared = max(sum(weights[e] for a, b, e in zip(ids, ids[1:], edges) if a in c and b in c)
+                     for c in corridors)
+        overlap = shared / cost if cost else 1.0
+        if tuple(ids) in seen or 1.0 - overlap < diversity:
+            seen.add(tuple(ids))
+            factor *= 2.0
+            continue
+        seen.add(tuple(ids))
+        accepted.append((ids, edges, cost, float(overlap)))
+        corridors.append(corridor(ids))
+        for v in corridors[-1]:
+            penalized[v] = 1
+        factor = _MIN_PENALTY
+
+    if stats is not None:
+        stats['paths'] = searches + 1
+    return accepted
+
+def route_corridor(ids, points_db, spatial_index, km=K_SHORTEST_CORRIDOR_KM):
+    """Ids of all points within km of the route through ids (legs sampled every km)."""
+    lat, lon = points_db.lat, points_db.lon
+    xyz = to_unit_vectors(lat[ids], lon[ids])
+    near = set()
+    for j, v in enumerate(ids):
+        near.update(spatial_index.query_radius_ids(v, km).tolist())
+        if j + 1 == len(ids):
+            break
+        steps = int(haversine(lat[v], lon[v], lat[ids[j + 1]], lon[ids[j + 1]]) // km)
+        for s in range(1, steps + 1):
+            p = xyz[j] + (xyz[j + 1] - xyz[j]) * (s / (steps + 1))
+            p /= np.linalg.norm(p)
+            point = (math.degrees(math.asin(p[2])), math.degrees(math.atan2(p[1], p[0])))
+            near.update(spatial_index.query_radius_ids(point, km).tolist())
+    return near
+
+def find_paths_k(start_nodes, end_nodes, edges, points_db, spatial_index=None,
+                 adjacency=None, intended_fl=DEFAULT_INTENDED_FL, direction=DEFAULT_FLOS_DIRECTION,
+                 k=3, diversity=0.0, landmarks=None, stats=None):
+    """
+    Up to k alternative routes, same arguments as router.find_path_astar
+    plus k and diversity. diversity 0: the k shortest loopless routes (Yen,
+    see yen_ids). diversity > 0: routes with at least that share of their
+    length outside K_SHORTEST_CORRIDOR_KM of every route before them (see
+    diverse_ids). landmarks: optional ALT Landmarks; they guide the reverse
+    search and bound the estimate outside its tree.
+
+    Returns [(path, edge_info, overlap)], the shortest route first.
+    """
+    prepared = _prepare_search(start_nodes, end_nodes, edges, points_db, spatial_index,
+                               adjacency, intended_fl, direction)
+    if not prepared:
+        return []
+    adjacency, start_ids, end_ids = prepared
+    if not start_ids or k < 1:
+        return []
+
+    h_rev = heuristic_table(start_ids, points_db, landmarks, reverse=True)
+    dist, next_id, next_edge, key = reverse_tree(adjacency, end_ids, start_ids, h_rev)
+    best = min(start_ids, key=dist.__getitem__)
+    if dist[best] == float('inf'):
+        return []
+    ids, path_edges = [best], []
+    while next_id[ids[-1]] >= 0:
+        path_edges.append(next_edge[ids[-1]])
+        ids.append(next_id[ids[-1]])
+
+    # Exact below the tree; elsewhere the better of the ALT bound and the reverse search's final key
+    tree = np.frombuffer(dist, dtype=np.float64)
+    beyond = key - np.asarray(h_rev)
+    beyond[np.isnan(beyond)] = np.inf  # inf - inf: unreachable either way
+    bound = np.maximum(np.asarray(heuristic_table(end_ids, points_db, landmarks)), beyond)
+    h = np.where(tree < np.inf, tree, bound).tolist()
+
+    if diversity > 0:
+        if spatial_index is None:
+            spatial_index = build_spatial_index(points_db)
+        corridor = lambda route: route_corridor(route, points_db, spatial_index)
+        found = diverse_ids(adjacency, start_ids, end_ids, (ids, path_edges), (next_id, next_edge), h, k,
+                            diversity, corridor, stats=stats)
+    else:
+        found = yen_ids(adjacency, start_ids, end_ids, (ids, path_edges), (next_id, next_edge), h, k, stats=stats)
+    routes = []
+    for p_ids, p_edges, _, overlap in found:
+        path, edge_info = _ids_to_route(p_ids, dict(zip(p_ids[1:], p_edges)), adjacency, points_db)
+        routes.append((path, edge_info, overlap))
+    return routes
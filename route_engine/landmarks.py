@@ -0,0 +1,206 @@
+"""
+ALT (A*, Landmarks, Triangle inequality) preprocessing.
+
+For a few landmark points L, exact graph distances d(L, v) and d(v, L) to
+every node are precomputed on the CSR adjacency. By the triangle inequality,
+differences such as d(L, t) - d(L, v) are lower bounds on d(v, t), often far
+tighter than the great-circle distance when FRA connectivity rules
+force detours around airspace borders.
+"""
+import os
+import heapq
+import shutil
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .graph import GRAPH_FORMAT_VERSION
+from .data_loader import dataset_version
+from .config import MAX_DCT_DISTANCE_KM, GRAPH_CACHE_DIR, ALT_LANDMARK_COUNT
+
+LANDMARK_FORMAT_VERSION = 1
+
+# Finite stand-in for "cannot reach any target" (longer than any FRA route).
+# Capping keeps the bounds consistent and the bidirectional potentials finite.
+UNREACHABLE_KM = 1.0e7
+
+class Landmarks:
+    """
+    Landmark distance tables for one adjacency (FL band, direction).
+
+    dist_from[k, v] = d(ids[k], v) and dist_to[k, v] = d(v, ids[k]) in km
+    (inf if there is no path).
+    """
+
+    ARRAYS = ('ids', 'dist_from', 'dist_to')
+
+    def __init__(self, ids, dist_from, dist_to, key=None):
+        self.ids = ids
+        self.dist_from = dist_from
+        self.dist_to = dist_to
+        self.key = key
+
+    def __len__(self):
+        return len(self.ids)
+
+    def bounds_to(self, target_ids):
+        """
+        Lower bound on min_t d(v, t) over target_ids, for every node v:
+        max over landmarks of d(v, L) - max_t d(t, L) and min_t d(L, t) - d(L, v).
+        """
+        return self._bounds(self.dist_to, self.dist_from, target_ids)
+
+    def bounds_from(self, source_ids):
+        """Lower bound on min_s d(s, v) over source_ids, for every node v (the reverse of bounds_to)."""
+        return self._bounds(self.dist_from, self.dist_to, source_ids)
+
+    def _bounds(self, to_l, from_l, ids):
+        ids = np.asarray(ids, dtype=np.int64)
+        with np.errstate(invalid='ignore'):
+            # v -> t -> L:  d(v, L) <= d(v, t) + d(t, L)
+            b = to_l - to_l[:, ids].max(axis=1)[:, None]
+            # L -> v -> t:  d(L, t) <= d(L, v) + d(v, t)
+            b = np.fmax(b, from_l[:, ids].min(axis=1)[:, None] - from_l)
+        if not len(b):
+            return np.zeros(from_l.shape[1])
+        # inf - inf (landmark unrelated to both v and the targets) gives no information
+        b[np.isnan(b)] = -np.inf
+        h = b.max(axis=0)
+        np.clip(h, 0.0, UNREACHABLE_KM, out=h)
+        return h
+
+    def save(self, path):
+        """Saves the tables as .npy files in directory `path`."""
+        tmp = f"{path}.{os.getpid()}.tmp"
+        os.makedirs(tmp, exist_ok=True)
+        for name in self.ARRAYS:
+            np.save(os.path.join(tmp, f"{name}.npy"), getattr(self, name))
+        try:
+            os.rename(tmp, path)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    @classmethod
+    def load(cls, path, key=None, mmap=True):
+        """Loads saved tables; arrays are memory-mapped read-only."""
+        mode = 'r' if mmap else None
+        arrays = [np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode) for name in cls.ARRAYS]
+        return cls(*arrays, key=key)
+
+def select_landmarks(store, adjacency, count=ALT_LANDMARK_COUNT):
+    """
+    Picks up to `count` peripheral landmarks: for every ACC (airspace) its
+    connected point farthest from the centre of the network, then a greedy
+    farthest-point subset of those candidates. Returns an array of point ids.
+    """
+    n = adjacency.num_nodes
+    out_deg = np.diff(np.asarray(adjacency.indptr))
+    in_deg = np.bincount(np.asarray(adjacency.indices), minlength=n)
+    usable = np.flatnonzero((out_deg > 0) & (in_deg > 0))
+    if count <= 0 or not len(usable):
+        return np.empty(0, dtype=np.int64)
+
+    xyz = np.asarray(store.xyz)[usable]
+    centre = xyz.mean(axis=0)
+    centre /= np.linalg.norm(centre)
+    spread = 1.0 - xyz @ centre  # grows with the angular distance from the centre
+
+    airspace = np.asarray(store.airspace_id)[usable]
+    candidates = []
+    for a in np.unique(airspace):
+        members = np.flatnonzero(airspace == a)
+        candidates.append(members[np.argmax(spread[members])])
+    candidates = np.array(candidates)
+
+    chosen = [candidates[np.argmax(spread[candidates])]]
+    nearest = np.full(len(candidates), np.inf)
+    while len(chosen) < min(count, len(candidates)):
+        nearest = np.minimum(nearest, np.linalg.norm(xyz[candidates] - xyz[chosen[-1]], axis=1))
+        chosen.append(candidates[np.argmax(nearest)])
+    return usable[np.array(chosen)].astype(np.int64)
+
+def _distances(indptr, indices, weights, source):
+    """Full single-source Dijkstra on CSR lists; returns distances (inf = unreachable)."""
+    n = len(indptr) - 1
+    inf = float('inf')
+    dist = [inf] * n
+    done = bytearray(n)
+    dist[source] = 0.0
+    heap = [(0.0, source)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if done[u]: continue
+        done[u] = 1
+        a = indptr[u]
+        b = indptr[u + 1]
+        for v, w in zip(indices[a:b], weights[a:b]):
+            nd = d + w
+            if nd < dist[v]:
+                dist[v] = nd
+                heapq.heappush(heap, (nd, v))
+    return np.array(dist)
+
+# CSR lists of the forward and reverse graph, shared with forked workers
+_ALT_STATE = None
+
+def _landmark_row(task):
+    reverse, source = task
+    return _distances(*_ALT_STATE[reverse], source)
+
+def build_landmarks(store, adjacency, count=ALT_LANDMARK_COUNT, workers=None):
+    """Selects landmarks and computes their forward / reverse distance tables."""
+    global _ALT_STATE
+    n = adjacency.num_nodes
+    ids = select_landmarks(store, adjacency, count)
+    rev = adjacency.reverse
+    _ALT_STATE = (
+        (np.asarray(adjacency.indptr).tolist(), np.asarray(adjacency.indices).tolist(),
+         np.asarray(adjacency.weights).tolist()),
+        (rev.indptr.tolist(), rev.indices.tolist(), rev.weights.tolist()),
+    )
+    tasks = [(0, int(L)) for L in ids] + [(1, int(L)) for L in ids]
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    try:
+        if workers > 1 and len(tasks) > 1 and 'fork' in multiprocessing.get_all_start_methods():
+            ctx = multiprocessing.get_context('fork')
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+                rows = list(pool.map(_landmark_row, tasks))
+        else:
+            rows = [_landmark_row(t) for t in tasks]
+    finally:
+        _ALT_STATE = None
+
+    k = len(ids)
+    dist_from = np.array(rows[:k]).reshape(k, n)
+    dist_to = np.array(rows[k:]).reshape(k, n)
+    return Landmarks(ids, dist_from, dist_to, key=adjacency.key)
+
+def landmarks_cache_path(key, version, count=ALT_LANDMARK_COUNT, cache_dir=GRAPH_CACHE_DIR):
+    """Directory of persisted landmark tables, next to the adjacency they belong to."""
+    band, direction = key
+    params = f"a{LANDMARK_FORMAT_VERSION}_k{count}_g{GRAPH_FORMAT_VERSION}_r{int(MAX_DCT_DISTANCE_KM)}"
+    return os.path.join(cache_dir, version, f"landmarks_{params}_b{band}_{direction}")
+
+def load_or_build_landmarks(store, adjacency, count=ALT_LANDMARK_COUNT, workers=None,
+                            cache_dir=GRAPH_CACHE_DIR, version=None):
+    """Loads persisted landmark tables for this adjacency, or builds and persists them."""
+    key = adjacency.key
+    if version is None:
+        version = dataset_version()
+    path = landmarks_cache_path(key, version, count, cache_dir)
+    if os.path.isdir(path):
+        try:
+            landmarks = Landmarks.load(path, key=key)
+            if landmarks.dist_from.shape[1] == adjacency.num_nodes:
+                return landmarks
+        except (OSError, ValueError):
+            pass
+
+    landmarks = build_landmarks(store, adjacency, count, workers)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        landmarks.save(path)
+    except OSError as e:
+        print(f"[route_engine] Warning: could not persist landmarks ({e})")
+    return landmarks
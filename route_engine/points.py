@@ -0,0 +1,298 @@
+import os
+import re
+import sys
+import json
+import enum
+import copy
+import bisect
+import numpy as np
+from .utils import parse_fl, to_unit_vectors, haversine
+
+# Columns used by the router and the route details table
+COL_NAME = 'FRA Point'
+COL_LAT = 'FRA Point Latitude'
+COL_LON = 'FRA Point Longitude'
+COL_FLOS = 'FLOS'
+COL_LEVELS = 'Level Availability'
+COL_AIRSPACE = 'Airspace Location Indicators'
+COL_CROSS_BORDER = 'Cross-Border FRA States'
+
+NO_LEVEL_LIMIT_MAX = np.iinfo(np.int16).max
+
+class Flos(enum.IntEnum):
+    """Flight Level Orientation Scheme published for a point (see FRA_Point_Columns_Explanation.md)."""
+    UNKNOWN = 0     # '-' : not published
+    ODD = 1
+    EVEN = 2
+    ALL = 3
+    ODD_EVEN = 4    # ODD (Entry) and EVEN (Exit)
+    EVEN_ODD = 5    # EVEN (Entry) and ODD (Exit)
+    ALL_ALL = 6
+    SEE_REMARKS = 7 # '*'
+
+_FLOS_CODES = {
+    '-': Flos.UNKNOWN,
+    'ODD': Flos.ODD,
+    'EVEN': Flos.EVEN,
+    'ALL': Flos.ALL,
+    'ODD/EVEN': Flos.ODD_EVEN,
+    'EVEN/ODD': Flos.EVEN_ODD,
+    'ALL/ALL': Flos.ALL_ALL,
+    '*': Flos.SEE_REMARKS,
+}
+
+def parse_flos(flos_str):
+    return _FLOS_CODES.get((flos_str or '-').strip().upper(), Flos.UNKNOWN)
+
+def parse_level_availability(lvl_avail):
+    """Parses 'FL195 / FL660' into (min_fl, max_fl). Unlimited if no range is given."""
+    if lvl_avail and '/' in lvl_avail:
+        parts = lvl_avail.split('/')
+        return parse_fl(parts[0].strip()), parse_fl(parts[1].strip())
+    return 0, NO_LEVEL_LIMIT_MAX
+
+_INDICATOR_RE = re.compile(r'[A-Z0-9]+')
+
+def parse_indicators(field):
+    """Location indicator tokens of an airspace field ('LOVV', 'LOVV LJLA', 'LOVV/LJLA', ...) as a tuple."""
+    return tuple(_INDICATOR_RE.findall((field or '').upper()))
+
+class PointView:
+    """Lightweight attribute (and CSV column) access to one point of a PointStore."""
+    __slots__ = ('store', 'id')
+
+    def __init__(self, store, point_id):
+        self.store = store
+        self.id = point_id
+
+    def __repr__(self):
+        return f"PointView({self.name!r})"
+
+    @property
+    def name(self):
+        return self.store.names[self.id]
+
+    @property
+    def lat(self):
+        return float(self.store.lat[self.id])
+
+    @property
+    def lon(self):
+        return float(self.store.lon[self.id])
+
+    @property
+    def min_fl(self):
+        return int(self.store.min_fl[self.id])
+
+    @property
+    def max_fl(self):
+        return int(self.store.max_fl[self.id])
+
+    @property
+    def flos(self):
+        return Flos(int(self.store.flos[self.id]))
+
+    @property
+    def airspace(self):
+        a = int(self.store.airspace_id[self.id])
+        return self.store.airspaces[a] if a >= 0 else ''
+
+    def __getitem__(self, column):
+        if column == 'lat':
+            return self.lat
+        if column == 'lon':
+            return self.lon
+        return self.store.columns[column][self.id]
+
+    def get(self, column, default=None):
+        """Dict-style access to the original CSV columns (plus 'lat' / 'lon')."""
+        try:
+            return self[column]
+        except KeyError:
+            return default
+
+class PointStore:
+    """
+    Columnar store of FRA points.
+
+    Points get dense integer ids (0..N-1). Numeric attributes used on the hot
+    path are pre-parsed into NumPy arrays; the original CSV text is kept as
+    interned column lists for display only.
+    """
+
+    # NumPy columns persisted (memory-mappable) in dataset snapshots
+    ARRAY_FIELDS = ('lat', 'lon', 'lat_rad', 'lon_rad', 'xyz', 'min_fl', 'max_fl',
+                    'flos', 'airspace_id', 'cross_border_set', 'cross_border')
+
+    def __init__(self, rows):
+        """rows: list of CSV dicts (one per unique point name, in id order)."""
+        n = len(rows)
+        self.names = [sys.intern(r[COL_NAME]) for r in rows]
+        self.name_to_id = {name: i for i, name in enumerate(self.names)}
+
+        fieldnames = list(rows[0].keys()) if rows else []
+        self.columns = {
+            col: [sys.intern(r.get(col) or '') for r in rows]
+            for col in fieldnames if col not in ('lat', 'lon')
+        }
+
+        # Coordinates: degrees, radians and unit vectors
+        self.lat = np.array([r['lat'] for r in rows], dtype=np.float64)
+        self.lon = np.array([r['lon'] for r in rows], dtype=np.float64)
+        self.lat_rad = np.radians(self.lat)
+        self.lon_rad = np.radians(self.lon)
+        self.xyz = to_unit_vectors(self.lat, self.lon)
+
+        # Levels and FLOS
+        levels = [parse_level_availability(r.get(COL_LEVELS, '-')) for r in rows]
+        self.min_fl = np.array([lv[0] for lv in levels], dtype=np.int16)
+        self.max_fl = np.array([lv[1] for lv in levels], dtype=np.int16)
+        self.flos = np.array([parse_flos(r.get(COL_FLOS, '-')) for r in rows], dtype=np.uint8)
+
+        # Interned airspace ids (-1 = none)
+        airspace_strs = [(r.get(COL_AIRSPACE) or '').strip() for r in rows]
+        self.airspaces = sorted(set(a for a in airspace_strs if a))
+        self.airspace_to_id = {a: i for i, a in enumerate(self.airspaces)}
+        self.airspace_id = np.array(
+            [self.airspace_to_id.get(a, -1) for a in airspace_strs], dtype=np.int16
+        )
+
+        # Cross-border permissions: each distinct Cross-Border FRA States token
+        # set is interned (row 0 = none) and expanded into a bool sets x airspaces
+        # matrix, so "may u cross into airspace a" is cross_border[cross_border_set[u], a].
+        # Tokens are matched whole, never as substrings; indicators without
+        # points can never be entered and are dropped.
+        sets = {(): 0}
+        cb_sets = []
+        for r in rows:
+            tokens = tuple(sorted(set(parse_indicators(r.get(COL_CROSS_BORDER)))
+                                  & self.airspace_to_id.keys()))
+            cb_sets.append(sets.setdefault(tokens, len(sets)))
+        self.cross_border_set = np.array(cb_sets, dtype=np.int16)
+        self.cross_border = np.zeros((len(sets), len(self.airspaces)), dtype=bool)
+        for tokens, row in sets.items():
+            self.cross_border[row, [self.airspace_to_id[a] for a in tokens]] = True
+
+        # FL band boundaries: node validity is constant between two boundaries
+        self.fl_boundaries = sorted(set(self.min_fl.tolist()) | set((self.max_fl.astype(np.int32) + 1).tolist()))
+        self._index_validity()
+
+    def _index_validity(self):
+        """
+        Precomputes node validity for every FL band x FLOS direction as packed
+        bit rows: validity_bits[east, band] has bit v set if point v passes the
+        Level Availability and FLOS checks at any FL of the band (east = 1 for
+        EAST, 0 for any other direction).
+        """
+        bands = len(self.fl_boundaries) + 1
+        fls = np.array([self.band_fl(b) for b in range(bands)], dtype=np.int32)[:, None]
+        in_levels = (self.min_fl[None, :] <= fls) & (self.max_fl[None, :] >= fls)
+        not_even = self.flos[None, :] != Flos.EVEN
+        self.validity_bits = np.stack([
+            np.packbits(in_levels, axis=1, bitorder='little'),
+            np.packbits(in_levels & not_even, axis=1, bitorder='little'),
+        ])
+
+    def save(self, path):
+        """Writes the store to directory `path` (.npy arrays + JSON text columns)."""
+        os.makedirs(path, exist_ok=True)
+        for field in self.ARRAY_FIELDS:
+            np.save(os.path.join(path, f"{field}.npy"), getattr(self, field))
+        with open(os.path.join(path, 'text.json'), 'w', encoding='utf-8') as f:
+            json.dump({
+                'names': self.names,
+                'columns': self.columns,
+                'airspaces': self.airspaces,
+                'fl_boundaries': self.fl_boundaries,
+            }, f)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Loads a store written by save(); arrays are memory-mapped read-only."""
+        store = cls.__new__(cls)
+        mode = 'r' if mmap else None
+        for field in cls.ARRAY_FIELDS:
+            setattr(store, field, np.load(os.path.join(path, f"{field}.npy"), mmap_mode=mode))
+        with open(os.path.join(path, 'text.json'), 'r', encoding='utf-8') as f:
+            text = json.load(f)
+        store.names = [sys.intern(n) for n in text['names']]
+        store.name_to_id = {name: i for i, name in enumerate(store.names)}
+        store.columns = {col: [sys.intern(v) for v in vals] for col, vals in text['columns'].items()}
+        store.airspaces = text['airspaces']
+        store.airspace_to_id = {a: i for i, a in enumerate(store.airspaces)}
+        store.fl_boundaries = text['fl_boundaries']
+        store._index_validity()
+        return store
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.name_to_id
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __getitem__(self, name):
+        return PointView(self, self.name_to_id[name])
+
+    def get(self, name, default=None):
+        point_id = self.name_to_id.get(name)
+        if point_id is None:
+            return default
+        return PointView(self, point_id)
+
+    def id_of(self, name):
+        return self.name_to_id.get(name)
+
+    def view(self, point_id):
+        return PointView(self, point_id)
+
+    def allows_cross_border(self, point_id, airspace_id):
+        """True if point_id lists airspace_id in its Cross-Border FRA States."""
+        if airspace_id < 0:
+            return False
+        return bool(self.cross_border[self.cross_border_set[point_id], airspace_id])
+
+    def fl_band(self, intended_fl):
+        """Index of the FL band containing intended_fl (same band = same level validity)."""
+        return bisect.bisect_right(self.fl_boundaries, intended_fl)
+
+    def with_fl_boundaries(self, levels):
+        """
+        The store with FL bands also split at `levels` (e.g. DCT vertical
+        limits that also vary per band): self if none of them is new, else a
+        copy sharing the point arrays. The store itself is never modified.
+        """
+        merged = sorted(set(self.fl_boundaries) | set(levels))
+        if merged == self.fl_boundaries:
+            return self
+        store = copy.copy(self)
+        store.fl_boundaries = merged
+        store._index_validity()
+        return store
+
+    def band_fl(self, band):
+        """A flight level inside FL band `band` (inverse of fl_band)."""
+        bounds = self.fl_boundaries
+        if not bounds:
+            return 0
+        return bounds[band - 1] if band > 0 else bounds[0] - 1
+
+    def valid_bits(self, intended_fl, direction):
+        """Packed validity row for intended_fl / direction: bit v is set if point v is usable."""
+        return self.validity_bits[int(direction.upper() == 'EAST'), self.fl_band(intended_fl)]
+
+    def is_valid(self, point_id, intended_fl, direction):
+        """Level Availability + FLOS check of one point, as a single bit test."""
+        byte = self.valid_bits(intended_fl, direction)[point_id >> 3]
+        return bool((byte >> (point_id & 7)) & 1)
+
+    def valid_mask(self, intended_fl, direction):
+        """Bool array over all point ids of is_valid(id, intended_fl, direction)."""
+        return np.unpackbits(self.valid_bits(intended_fl, direction), count=len(self.names),
+                             bitorder='little').astype(bool)
+
+    def distance(self, i, j):
+        """Great-circle distance in km between two point ids."""
+        return haversine(self.lat[i], self.lon[i], self.lat[j], self.lon[j])
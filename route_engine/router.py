@@ -1,147 +1,610 @@
+import time
 import heapq
 import collections
-from .utils import distance
-from .validator import is_point_valid, allow_simulated_connection
+from array import array
+import numpy as np
+from .utils import haversine_many
+from .validator import is_node_valid
 from .data_loader import get_departure_points, get_arrival_points
+from .spatial import build_spatial_index
+from .graph import build_adjacency, rule_label
+from .ch import build_ch
+from .config import (
+    MAX_DCT_DISTANCE_KM, DEFAULT_INTENDED_FL, DEFAULT_FLOS_DIRECTION,
+    ASTAR_MAX_EXPANSIONS, ANYTIME_INITIAL_WEIGHT, ANYTIME_WEIGHT_STEP
+)
 
-def build_spatial_grid(points_db, grid_size_deg=2.0):
-    grid = collections.defaultdict(list)
-    for name, data in points_db.items():
-        lat = data.get('lat', 0.0)
-        lon = data.get('lon', 0.0)
-        lat_idx = int(lat // grid_size_deg)
-        lon_idx = int(lon // grid_size_deg)
-        grid[(lat_idx, lon_idx)].append(name)
-    return grid
-
-def get_nearby_points(curr_name, points_db, grid, grid_size_deg=2.0):
-    curr_data = points_db[curr_name]
-    lat = curr_data.get('lat', 0.0)
-    lon = curr_data.get('lon', 0.0)
-    
-    lat_idx = int(lat // grid_size_deg)
-    lon_idx = int(lon // grid_size_deg)
-    
-    candidates = []
-    # Check 3x3 grid cells
-    for di in [-1, 0, 1]:
-        for dj in [-1, 0, 1]:
-            candidates.extend(grid[(lat_idx + di, lon_idx + dj)])
-    return candidates
-
-def heuristic(curr_name, end_set, points_db):
-    p1 = points_db[curr_name]
-    min_dist = float('inf')
-    for e in end_set:
-        d = distance(p1, points_db[e])
-        if d < min_dist: min_dist = d
-    return min_dist
-
-def resolve_graph_node_options(identifier, points_db, is_start=True):
+def get_nearby_points(curr_name, spatial_index, radius_km=MAX_DCT_DISTANCE_KM):
+    """Returns all point names within radius_km of curr_name (great-circle)."""
+    return spatial_index.query_radius(curr_name, radius_km)
+
+def heuristic(curr_id, end_ids, points_db):
+    """Great-circle distance from curr_id to the nearest of end_ids (array of ids)."""
+    d = haversine_many(points_db.lat[curr_id], points_db.lon[curr_id],
+                       points_db.lat[end_ids], points_db.lon[end_ids])
+    return float(d.min())
+
+def resolve_graph_node_options(identifier, points_db, is_start=True, airport_index=None):
     """
     Resolves an identifier (Airport or Waypoint) to a list of FRA Graph Node Names.
     - If identifier is in points_db, it's a Waypoint -> [identifier]
-    - If identifier is an Airport Code -> Lookup Annex -> [Option1, Option2...]
+    - If identifier is an Airport Code -> Lookup Annex index -> [Option1, Option2...]
     """
     if identifier in points_db:
         return [identifier]
     
     # Assume Airport
     if is_start:
-        return get_departure_points(identifier, points_db)
+        return get_departure_points(identifier, points_db, airport_index)
     else:
-        return get_arrival_points(identifier)
+        return get_arrival_points(identifier, airport_index)
+
+def _reconstruct_ids(goal, parent):
+    """Follows parent pointers from goal back to a start node."""
+    ids = []
+    v = goal
+    while v >= 0:
+        ids.append(v)
+        v = parent[v]
+    ids.reverse()
+    return ids
+
+def _ids_to_route(ids, parent_edge, adjacency, points_db):
+    """Converts an id path into the (path, edge_info) structure used by the API."""
+    names = points_db.names
+    path = [names[i] for i in ids]
+    edge_info = collections.defaultdict(dict)
+    for a, b in zip(ids, ids[1:]):
+        e = parent_edge[b]
+        edge_info[names[a]][names[b]] = {
+            'To': names[b],
+            'Remarks': rule_label(points_db, adjacency.rules[e], b),
+            'Dist': float(adjacency.weights[e])
+        }
+    return path, edge_info
 
-def find_path_astar(start_nodes, end_nodes, edges, points_db):
+class SearchState:
     """
-    Core A* Algorithm.
-    start_nodes: list of valid FRA point names to start from.
-    end_nodes: list of valid FRA point names to end at.
+    Settled part of an A* search from one set of start ids: g-scores, parents
+    and the closed set. Closed nodes have exact g under any consistent
+    heuristic, so the state can be resumed later towards other targets.
     """
-    print("Building spatial index...")
-    grid = build_spatial_grid(points_db)
+    __slots__ = ('g', 'parent', 'parent_edge', 'closed', 'aborted')
+
+    def __init__(self, n, start_ids):
+        inf = float('inf')
+        self.g = array('d', [inf]) * n
+        self.parent = array('l', [-1]) * n
+        self.parent_edge = array('l', [-1]) * n
+        self.closed = bytearray(n)
+        self.aborted = False  # set when a search on it gave up (max_iter): not to be resumed
+        for s in start_ids:
+            self.g[s] = 0.0
+
+    @property
+    def nbytes(self):
+        return (self.g.itemsize * len(self.g) + self.parent.itemsize * len(self.parent)
+                + self.parent_edge.itemsize * len(self.parent_edge) + len(self.closed))
+
+    def open_ids(self):
+        """Reached but not yet expanded nodes (the frontier to resume from)."""
+        reached = np.frombuffer(self.g, dtype=np.float64) < np.inf
+        return np.flatnonzero(reached & (np.frombuffer(self.closed, dtype=np.uint8) == 0)).tolist()
+
+def astar_ids(adjacency, start_ids, end_ids, heuristic_fn, max_iter=ASTAR_MAX_EXPANSIONS, stats=None, state=None,
+              departure=None):
+    """
+    Integer-indexed A* core over a CSR Adjacency (dense node ids 0..n-1).
     
-    end_set = set([e for e in end_nodes if e in points_db])
-    start_set = [s for s in start_nodes if s in points_db]
+    start_ids: ids to seed the open set with (g = 0).
+    heuristic_fn(v) must return a consistent estimate to the nearest end node.
+    stats: optional dict, receives the number of 'expanded' nodes.
+    state: optional SearchState of an earlier search from the same start_ids;
+           it is resumed (and updated in place) instead of starting over.
+    departure: optional timedep.Departure; time-limited edges are only taken
+               if open at the estimated time they are entered (g-score over
+               the cruise speed). The search stays label-setting, so a
+               detour made only to reach a window later is not considered.
     
-    if not start_set or not end_set:
-        return None, None
-        
-    open_set = []
+    Returns (id_path, parent_edge) or None if no path was found, where
+    parent_edge[v] is the CSR edge index used to reach v.
+    g-scores and parents live in preallocated arrays; the path is only
+    rebuilt once, at the goal.
+    """
+    n = adjacency.num_nodes
+    inf = float('inf')
+    if state is None:
+        state = SearchState(n, start_ids)
+        frontier = start_ids
+    else:
+        frontier = state.open_ids()
+    g, parent, parent_edge, closed = state.g, state.parent, state.parent_edge, state.closed
+    is_end = bytearray(n)
+    for e in end_ids:
+        is_end[e] = 1
     
-    # Init Open Set
-    for s in start_set:
-        # Check Node Validity
-        if not is_point_valid(points_db[s]):
-            continue
-        h = heuristic(s, end_set, points_db)
-        heapq.heappush(open_set, (h, s, [s], 0))
-        
-    g_scores = {s: 0 for s in start_set}
-    aug_edges_used = collections.defaultdict(dict)
-    closed_set = set()
+    # A target settled by an earlier search is final once nothing open can beat it
+    best_goal = -1
+    for e in end_ids:
+        if closed[e] and (best_goal < 0 or g[e] < g[best_goal]):
+            best_goal = e
+    best_g = g[best_goal] if best_goal >= 0 else inf
     
-    itr = 0
-    max_iter = 50000
+    open_set = [(g[v] + heuristic_fn(v), v) for v in frontier]
+    heapq.heapify(open_set)
+    timed = departure.timed.flags if departure is not None else None
     
+    itr = 0
     while open_set:
-        f, curr, path, g = heapq.heappop(open_set)
+        f, curr = heapq.heappop(open_set)
+        if f >= best_g:
+            break
+        if closed[curr]: continue
         
-        if curr in end_set:
-            return path, aug_edges_used
+        if is_end[curr]:
+            # The goal stays open, so a resumed search can still expand it
+            if stats is not None: stats['expanded'] = itr
+            return _reconstruct_ids(curr, parent), parent_edge
+        
+        if itr > max_iter:
+            # curr stays open (never expanded); the caller must not resume this state
+            print("Max iterations reached")
+            state.aborted = True
+            if stats is not None: stats['expanded'] = itr
+            return None
+        closed[curr] = 1
+        itr += 1
+        
+        g_curr = g[curr]
+        edge, targets, weights = adjacency.neighbors(curr)
+        for nxt, step_dist in zip(targets, weights):
+            new_g = g_curr + step_dist
+            if new_g < g[nxt] and (timed is None or not timed[edge] or departure.edge_ok(edge, g_curr)):
+                g[nxt] = new_g
+                parent[nxt] = curr
+                parent_edge[nxt] = edge
+                heapq.heappush(open_set, (new_g + heuristic_fn(nxt), nxt))
+            edge += 1
+                
+    if stats is not None: stats['expanded'] = itr
+    if best_goal >= 0:
+        return _reconstruct_ids(best_goal, parent), parent_edge
+    return None
+
+def anytime_astar_ids(adjacency, start_ids, end_ids, h, epsilon=1.0, deadline=None,
+                      max_iter=ASTAR_MAX_EXPANSIONS, stats=None, departure=None):
+    """
+    Bounded-suboptimal A* core (ARA*): passes of weighted A*, f = g + w * h,
+    over one search state. A pass with weight w finds a route at most w x
+    the shortest; the next one lowers w by ANYTIME_WEIGHT_STEP and only
+    re-expands nodes whose g-score improved after they were expanded.
+    
+    h: consistent lower bounds to the nearest end node, as a list by id
+       (heuristic_table).
+    epsilon: accepted suboptimality (>= 1). The search stops as soon as the
+             achieved bound is at most epsilon.
+    deadline: optional time.perf_counter() value. Without it, one pass runs
+              with w = epsilon. With it, passes start at
+              max(epsilon, ANYTIME_INITIAL_WEIGHT) and the best route found
+              by the deadline is returned.
+    stats: optional dict, receives 'expanded', 'passes' and 'bound'.
+    departure: as for astar_ids.
+    
+    Returns (id_path, parent_edge, bound) or None if no route was found (in
+    time). bound: the route is at most bound x the shortest: the weight of
+    the last completed pass, or less if the route's cost over a lower bound
+    on the shortest cost (min g + h over the open nodes and those improved
+    after expansion) is lower; 1.0 means the route is the shortest.
+    """
+    n = adjacency.num_nodes
+    inf = float('inf')
+    g = array('d', [inf]) * n
+    parent = array('l', [-1]) * n
+    parent_edge = array('l', [-1]) * n
+    closed = bytearray(n)
+    is_end = bytearray(n)
+    for e in end_ids:
+        is_end[e] = 1
+    for s in start_ids:
+        g[s] = 0.0
+    g_arr, h_arr = np.frombuffer(g, dtype=np.float64), np.asarray(h)
+    timed = departure.timed.flags if departure is not None else None
+    
+    w = epsilon if deadline is None else max(epsilon, ANYTIME_INITIAL_WEIGHT)
+    open_set = [(w * h[s], s) for s in start_ids]
+    heapq.heapify(open_set)
+    incons = []  # nodes improved after their expansion in the current pass
+    best_goal, best_g = -1, inf
+    bound = proven = inf  # proven: weight of the last completed pass
+    itr = passes = 0
+    while True:
+        passes += 1
+        stopped = False
+        while open_set and open_set[0][0] < best_g:
+            if itr > max_iter:
+                print("Max iterations reached")
+                stopped = True
+                break
+            if deadline is not None and not itr & 63 and time.perf_counter() > deadline:
+                stopped = True
+                break
+            f, curr = heapq.heappop(open_set)
+            if closed[curr]: continue
+            closed[curr] = 1
+            itr += 1
             
-        if curr in closed_set: continue
-        closed_set.add(curr)
+            g_curr = g[curr]
+            edge, targets, weights = adjacency.neighbors(curr)
+            for nxt, step_dist in zip(targets, weights):
+                new_g = g_curr + step_dist
+                if new_g < g[nxt] and (timed is None or not timed[edge] or departure.edge_ok(edge, g_curr)):
+                    g[nxt] = new_g
+                    parent[nxt] = curr
+                    parent_edge[nxt] = edge
+                    if is_end[nxt]:
+                        # Goals are never expanded: only the best one matters
+                        if new_g < best_g:
+                            best_goal, best_g = nxt, new_g
+                    elif closed[nxt]:
+                        incons.append(nxt)
+                    else:
+                        heapq.heappush(open_set, (new_g + w * h[nxt], nxt))
+                edge += 1
+        
+        # Open and inconsistent nodes hold the first not exactly settled node of every shortest route
+        frontier = np.fromiter((v for _, v in open_set), dtype=np.int64, count=len(open_set))
+        frontier = frontier[np.frombuffer(closed, dtype=np.uint8)[frontier] == 0]
+        frontier = np.unique(np.concatenate((frontier, np.array(incons, dtype=np.int64))))
+        lower = min(float((g_arr[frontier] + h_arr[frontier]).min()), best_g) if len(frontier) else best_g
+        if not stopped:
+            proven = w
+        if best_goal >= 0:
+            bound = min(best_g / lower if lower > 0 else 1.0, proven)
+        if stopped or deadline is None or best_goal < 0 or bound <= epsilon:
+            break
+        
+        w = max(epsilon, w - ANYTIME_WEIGHT_STEP)
+        closed = bytearray(n)
+        incons = []
+        open_set = list(zip((g_arr[frontier] + w * h_arr[frontier]).tolist(), frontier.tolist()))
+        heapq.heapify(open_set)
+    
+    if stats is not None:
+        stats['expanded'] = itr
+        stats['passes'] = passes
+        stats['bound'] = bound
+    if best_goal < 0:
+        if stopped and deadline is not None:
+            print("Deadline reached")
+        return None
+    return _reconstruct_ids(best_goal, parent), parent_edge, bound
+
+def bidir_astar_ids(adjacency, start_ids, end_ids, h_fwd, h_bwd, max_iter=ASTAR_MAX_EXPANSIONS, stats=None):
+    """
+    Bidirectional A* core: forward from start_ids over the adjacency and
+    backward from end_ids over its transpose (adjacency.reverse), so edge
+    directions (incl. the cross-border "push" rule) are respected.
+    
+    h_fwd / h_bwd: consistent estimates to the nearest end / start node, either
+    callables of a node id or per-node lists (see heuristic_table).
+    Both searches use the average potential p(v) = (h_fwd(v) - h_bwd(v)) / 2
+    (forward key g_f + p, backward key g_b - p), which makes them run on the
+    same reduced edge costs. mu is the best start-end path seen so far, and
+    the search stops once the sum of both minimum keys reaches mu.
+    
+    Returns (id_path, edge_into) or None, where edge_into[v] is the forward
+    CSR edge index used to enter v on the returned path.
+    """
+    reverse = adjacency.reverse
+    n = adjacency.num_nodes
+    inf = float('inf')
+    g = (array('d', [inf]) * n, array('d', [inf]) * n)
+    parent = (array('l', [-1]) * n, array('l', [-1]) * n)
+    parent_edge = (array('l', [-1]) * n, array('l', [-1]) * n)
+    closed = (bytearray(n), bytearray(n))
+    open_sets = ([], [])
+    
+    if callable(h_fwd):
+        p_cache = {}
+        def potential(v):
+            p = p_cache.get(v)
+            if p is None:
+                p = p_cache[v] = 0.5 * (h_fwd(v) - h_bwd(v))
+            return p
+    else:
+        # Precomputed per-node estimates (lists indexed by id)
+        table = [0.5 * (a - b) for a, b in zip(h_fwd, h_bwd)]
+        potential = table.__getitem__
+    sign = (1.0, -1.0)
+    
+    for side, seeds in ((0, start_ids), (1, end_ids)):
+        for s in seeds:
+            g[side][s] = 0.0
+            heapq.heappush(open_sets[side], (sign[side] * potential(s), s))
+    
+    mu = inf
+    meet = -1
+    for s in start_ids:
+        if g[1][s] == 0.0:
+            mu, meet = 0.0, s
+            break
+    
+    itr = 0
+    while open_sets[0] and open_sets[1]:
+        # Drop stale heap tops so the key checks below are exact
+        for side in (0, 1):
+            heap = open_sets[side]
+            while heap and closed[side][heap[0][1]]:
+                heapq.heappop(heap)
+        if not open_sets[0] or not open_sets[1]:
+            break
+        if open_sets[0][0][0] + open_sets[1][0][0] >= mu:
+            break
         
         if itr > max_iter:
             print("Max iterations reached")
             break
         itr += 1
         
-        neighbors = []
+        # Expand the side with the smaller frontier
+        side = 0 if len(open_sets[0]) <= len(open_sets[1]) else 1
+        other = 1 - side
+        key, curr = heapq.heappop(open_sets[side])
+        closed[side][curr] = 1
+        g_side, g_other = g[side], g[other]
+        g_curr = g_side[curr]
+        sgn = sign[side]
         
-        # 1. Explicit Edges
-        if curr in edges:
-            for e in edges[curr]:
-                neighbors.append((e['To'], "Explicit DCT"))
-                
-        # 2. Simulated Edges
-        p1 = points_db[curr]
-        candidates = get_nearby_points(curr, points_db, grid)
+        if side == 0:
+            edge, nbrs, weights = adjacency.neighbors(curr)
+            edge_ids = range(edge, edge + len(nbrs))
+        else:
+            edge_ids, nbrs, weights = reverse.neighbors(curr)
         
-        for nxt in candidates:
-            if nxt == curr: continue
-            
-            if not is_point_valid(points_db[nxt]): continue
-            
-            allowed, reason = allow_simulated_connection(p1, points_db[nxt])
-            if not allowed: continue
-            
-            d = distance(p1, points_db[nxt])
-            if d < 400.0: # Range limit
-                neighbors.append((nxt, f"Simulated: {reason}"))
-                
-        # Process Neighbors
-        for nxt, type_str in neighbors:
-            if nxt not in points_db: continue
-            
-            if "Explicit" in type_str:
-                if not is_point_valid(points_db[nxt]): continue
-                
-            step_dist = distance(points_db[curr], points_db[nxt])
-            new_g = g + step_dist
-            
-            if new_g < g_scores.get(nxt, float('inf')):
-                g_scores[nxt] = new_g
-                h = heuristic(nxt, end_set, points_db)
-                new_f = new_g + h
-                
-                aug_edges_used[curr][nxt] = {
-                    'To': nxt,
-                    'Remarks': type_str,
-                    'Dist': step_dist
-                }
-                
-                heapq.heappush(open_set, (new_f, nxt, path + [nxt], new_g))
-                
-    return None, None
+        for nxt, step_dist, e in zip(nbrs, weights, edge_ids):
+            new_g = g_curr + step_dist
+            if new_g < g_side[nxt]:
+                g_side[nxt] = new_g
+                parent[side][nxt] = curr
+                parent_edge[side][nxt] = e
+                heapq.heappush(open_sets[side], (new_g + sgn * potential(nxt), nxt))
+                if g_other[nxt] != inf and new_g + g_other[nxt] < mu:
+                    mu = new_g + g_other[nxt]
+                    meet = nxt
+    
+    if stats is not None: stats['expanded'] = itr
+    if meet < 0:
+        return None
+    
+    # Forward half: start ... meet; backward half: meet ... end
+    ids = _reconstruct_ids(meet, parent[0])
+    edge_into = {v: parent_edge[0][v] for v in ids[1:]}
+    v = meet
+    while parent[1][v] >= 0:
+        nxt = parent[1][v]
+        edge_into[nxt] = parent_edge[1][v]
+        ids.append(nxt)
+        v = nxt
+    return ids, edge_into
+
+def dijkstra_ids(adjacency, start_ids, target_ids=None, max_km=None):
+    """
+    One-to-many Dijkstra over a CSR Adjacency from a set of start ids.
+    
+    Stops once every id in target_ids is settled (if given) or once the
+    frontier exceeds max_km (if given). Returns (g, parent, parent_edge)
+    arrays; unreached nodes keep g = inf.
+    """
+    n = adjacency.num_nodes
+    inf = float('inf')
+    g = array('d', [inf]) * n
+    parent = array('l', [-1]) * n
+    parent_edge = array('l', [-1]) * n
+    closed = bytearray(n)
+    limit = inf if max_km is None else max_km
+    
+    is_target = None
+    remaining = 0
+    if target_ids is not None:
+        is_target = bytearray(n)
+        for t in target_ids:
+            if not is_target[t]:
+                is_target[t] = 1
+                remaining += 1
+        if not remaining:
+            return g, parent, parent_edge
+    
+    open_set = []
+    for s in start_ids:
+        g[s] = 0.0
+        heapq.heappush(open_set, (0.0, s))
+    
+    while open_set:
+        d, curr = heapq.heappop(open_set)
+        if closed[curr]: continue
+        if d > limit: break  # Everything left is beyond max_km
+        closed[curr] = 1
+        
+        if is_target is not None and is_target[curr]:
+            remaining -= 1
+            if not remaining: break
+        
+        edge, targets, weights = adjacency.neighbors(curr)
+        for nxt, step_dist in zip(targets, weights):
+            new_g = d + step_dist
+            if new_g < g[nxt] and new_g <= limit:
+                g[nxt] = new_g
+                parent[nxt] = curr
+                parent_edge[nxt] = edge
+                heapq.heappush(open_set, (new_g, nxt))
+            edge += 1
+    
+    # Tentative (unsettled) labels are not shortest distances: hide them
+    for v in range(n):
+        if not closed[v] and g[v] != inf:
+            g[v] = inf
+    return g, parent, parent_edge
+
+def _prepare_search(start_nodes, end_nodes, edges, points_db, spatial_index, adjacency,
+                    intended_fl, direction):
+    """Maps names to ids (validating start options) and makes sure an adjacency exists."""
+    if adjacency is None:
+        if spatial_index is None:
+            print("Building spatial index...")
+            spatial_index = build_spatial_index(points_db)
+        print("Building adjacency...")
+        adjacency = build_adjacency(points_db, spatial_index, edges, intended_fl, direction)
+    name_to_id = points_db.name_to_id
+    
+    end_ids = list(dict.fromkeys(name_to_id[e] for e in end_nodes if e in points_db))
+    start_set = [s for s in start_nodes if s in points_db]
+    
+    if not start_set or not end_ids:
+        return None
+    
+    # Check Node Validity of start options
+    start_ids = [name_to_id[s] for s in start_set
+                 if is_node_valid(points_db, name_to_id[s], intended_fl, direction)]
+    return adjacency, start_ids, end_ids
+
+def heuristic_table(target_ids, points_db, landmarks=None, reverse=False):
+    """
+    Lower bound on the graph distance from every node to the nearest of
+    target_ids (with reverse: from the nearest of them to every node), as a
+    list by id. Great-circle distance, tightened by the ALT landmark bounds
+    when landmarks are given (the max of consistent bounds stays consistent).
+    """
+    lat, lon = points_db.lat, points_db.lon
+    h = None
+    for t in target_ids:
+        d = haversine_many(lat[t], lon[t], lat, lon)
+        h = d if h is None else np.minimum(h, d, out=h)
+    if landmarks is not None and len(landmarks):
+        alt = landmarks.bounds_from(target_ids) if reverse else landmarks.bounds_to(target_ids)
+        h = np.maximum(h, alt, out=h)
+    return h.tolist()
+
+def _cached_heuristic(target_ids, points_db):
+    """Great-circle distance to the nearest of target_ids, memoized per node."""
+    target_arr = np.array(target_ids, dtype=np.int64)
+    h_cache = {}
+    def heuristic_fn(v):
+        h = h_cache.get(v)
+        if h is None:
+            h = h_cache[v] = heuristic(v, target_arr, points_db)
+        return h
+    return heuristic_fn
+
+def find_path_astar(start_nodes, end_nodes, edges, points_db, spatial_index=None,
+                    adjacency=None, intended_fl=DEFAULT_INTENDED_FL, direction=DEFAULT_FLOS_DIRECTION,
+                    stats=None, landmarks=None, tree_cache=None, departure=None, epsilon=1.0, deadline=None):
+    """
+    Core A* Algorithm.
+    start_nodes: list of valid FRA point names to start from.
+    end_nodes: list of valid FRA point names to end at.
+    points_db: PointStore of all FRA points.
+    spatial_index: shared SpatialIndex over points_db (built here if not given).
+    adjacency: precomputed CSR Adjacency for the FL/direction profile
+               (built from edges + spatial_index if not given).
+    landmarks: optional ALT Landmarks of that adjacency; tightens the
+               great-circle heuristic with triangle-inequality bounds.
+    tree_cache: optional cache.SearchTreeCache; the search resumes the
+                settled tree of an earlier query from the same start options.
+    departure: optional timedep.Departure (EOBT, cruise speed, timed edges of
+               this adjacency) for a time-dependent search; such searches
+               do not use the tree cache.
+    epsilon, deadline: bounded-suboptimal / anytime search (see
+               anytime_astar_ids); stats then receives the achieved 'bound'.
+               Such searches do not use the tree cache either.
+    
+    Names are mapped to the store's dense integer ids on entry and back to
+    names only for the returned path.
+    """
+    prepared = _prepare_search(start_nodes, end_nodes, edges, points_db, spatial_index,
+                               adjacency, intended_fl, direction)
+    if not prepared:
+        return None, None
+    adjacency, start_ids, end_ids = prepared
+    
+    if epsilon != 1.0 or deadline is not None:
+        found = anytime_astar_ids(adjacency, start_ids, end_ids, heuristic_table(end_ids, points_db, landmarks),
+                                  epsilon, deadline, stats=stats, departure=departure)
+        if not found:
+            return None, None
+        ids, parent_edge, _ = found
+        return _ids_to_route(ids, parent_edge, adjacency, points_db)
+    
+    if landmarks is not None:
+        heuristic_fn = heuristic_table(end_ids, points_db, landmarks).__getitem__
+    else:
+        heuristic_fn = _cached_heuristic(end_ids, points_db)
+    
+    if tree_cache is None or departure is not None:
+        found = astar_ids(adjacency, start_ids, end_ids, heuristic_fn, stats=stats, departure=departure)
+    else:
+        key = (adjacency.key, tuple(sorted(start_ids)))
+        state = tree_cache.take(key) or SearchState(adjacency.num_nodes, start_ids)
+        found = astar_ids(adjacency, start_ids, end_ids, heuristic_fn, stats=stats, state=state)
+        if not state.aborted:
+            tree_cache.put(key, state)
+    if not found:
+        return None, None
+    ids, parent_edge = found
+    return _ids_to_route(ids, parent_edge, adjacency, points_db)
+
+def find_path_bidir(start_nodes, end_nodes, edges, points_db, spatial_index=None,
+                    adjacency=None, intended_fl=DEFAULT_INTENDED_FL, direction=DEFAULT_FLOS_DIRECTION,
+                    stats=None, landmarks=None):
+    """
+    Bidirectional A*: same arguments and result as find_path_astar.
+    Searches forward from the start options and backward from the end options.
+    """
+    prepared = _prepare_search(start_nodes, end_nodes, edges, points_db, spatial_index,
+                               adjacency, intended_fl, direction)
+    if not prepared:
+        return None, None
+    adjacency, start_ids, end_ids = prepared
+    if not start_ids:
+        return None, None
+    
+    found = bidir_astar_ids(adjacency, start_ids, end_ids,
+                            heuristic_table(end_ids, points_db, landmarks),
+                            heuristic_table(start_ids, points_db, landmarks, reverse=True), stats=stats)
+    if not found:
+        return None, None
+    ids, edge_into = found
+    return _ids_to_route(ids, edge_into, adjacency, points_db)
+
+def find_path_ch(start_nodes, end_nodes, edges, points_db, spatial_index=None,
+                 adjacency=None, intended_fl=DEFAULT_INTENDED_FL, direction=DEFAULT_FLOS_DIRECTION,
+                 stats=None, hierarchy=None):
+    """
+    Contraction hierarchy query: same arguments and result as find_path_astar.
+    hierarchy: ContractionHierarchy built from `adjacency` (built here if not
+               given, which is slow; see ch.load_or_build_ch).
+    Shortcuts are unpacked into original adjacency edges, so the route rows
+    carry the same connectivity rules as the other algorithms.
+    """
+    prepared = _prepare_search(start_nodes, end_nodes, edges, points_db, spatial_index,
+                               adjacency, intended_fl, direction)
+    if not prepared:
+        return None, None
+    adjacency, start_ids, end_ids = prepared
+    if not start_ids:
+        return None, None
+    if hierarchy is None:
+        print("Building contraction hierarchy...")
+        hierarchy = build_ch(adjacency)
+    
+    ids = hierarchy.query(start_ids, end_ids, stats=stats)
+    if not ids:
+        return None, None
+    edge_into = {b: adjacency.edge_id(a, b) for a, b in zip(ids, ids[1:])}
+    return _ids_to_route(ids, edge_into, adjacency, points_db)
+
+# Search algorithms selectable via find_route(..., algorithm=...)
+ALGORITHMS = {
+    'astar': find_path_astar,
+    'bidir': find_path_bidir,
+    'ch': find_path_ch,
+}
@@ -0,0 +1,298 @@
+"""
+Long-running HTTP/JSON routing service (`python -m route_engine serve`).
+
+The dataset and the graphs of the served FL/direction profiles are loaded
+once at startup. Searches run in a bounded thread pool so the event loop
+keeps answering /health; concurrent identical requests share one search,
+and requests beyond SERVER_MAX_PENDING distinct searches are refused with
+503 so a gateway can retry elsewhere.
+
+Endpoints:
+    GET  /health                                      -> status, dataset versions, load, cache stats
+    GET  /route?start=EDDF&end=LGAV[&fl=&direction=&algorithm=&eobt=2026-03-02T06:00Z&epsilon=&deadline_ms=]
+    POST /route  {"start": ..., "end": ..., "fl": ..., "direction": ..., "algorithm": ..., "eobt": ...,
+                  "epsilon": ..., "deadline_ms": ...}
+"""
+import json
+import time
+import asyncio
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+from .router import ALGORITHMS
+from .config import (
+    DEFAULT_INTENDED_FL, DEFAULT_FLOS_DIRECTION, FLOS_DIRECTIONS,
+    SERVER_HOST, SERVER_PORT, SERVER_WORKERS, SERVER_MAX_PENDING,
+)
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 64 * 1024
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+class BadRequest(Exception):
+    """Malformed request; answered with the given HTTP status."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+class RouteServer:
+    """
+    asyncio HTTP server around find_route.
+
+    workers: search threads; max_pending: distinct searches queued or running
+    before new ones are refused (coalesced duplicates do not count).
+    engine: RouteEngine to serve (default: route_engine.default_engine(),
+            which follows reload_data() / stage_dataset() switches).
+    """
+
+    def __init__(self, host=SERVER_HOST, port=SERVER_PORT, workers=SERVER_WORKERS,
+                 max_pending=SERVER_MAX_PENDING, engine=None):
+        self._engine = engine
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = None
+        self._server = None
+        self._inflight = {}  # route key -> asyncio.Future of the running search
+        self.started = None
+        self.requests = 0
+        self.searches = 0
+        self.coalesced = 0
+        self.rejected = 0
+
+    @property
+    def engine(self):
+        from . import default_engine
+        return self._engine or default_engine()
+
+    def warm_up(self, fls=(DEFAULT_INTENDED_FL,), directions=(DEFAULT_FLOS_DIRECTION,),
+                algorithms=('astar',)):
+        """Loads the dataset and the per-profile search structures before serving."""
+        engine = self.engine
+        for fl in fls:
+            for direction in directions:
+                engine.adjacency(fl, direction)
+                for algorithm in algorithms:
+                    engine.search_options(algorithm, fl, direction)
+
+    async def start(self):
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='route')
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.started = time.time()
+        sock = self._server.sockets[0].getsockname()
+        print(f"[route_engine] Serving on http://{sock[0]}:{sock[1]} "
+              f"({self.workers} workers, max {self.max_pending} pending searches)")
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        finally:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def health(self):
+        from . import staged_dataset
+        engine = self.engine
+        staged = staged_dataset() if self._engine is None else None
+        return {
+            'status': 'ok',
+            'dataset_version': engine.version,
+            'airac': engine.airac,
+            'staged_dataset': {'version': staged[0], 'effective_at': staged[1]} if staged else None,
+            'uptime_s': round(time.time() - self.started, 1) if self.started else 0.0,
+            'pending': len(self._inflight),
+            'max_pending': self.max_pending,
+            'workers': self.workers,
+            'requests': self.requests,
+            'searches': self.searches,
+            'coalesced': self.coalesced,
+            'rejected': self.rejected,
+            'route_cache': engine.route_cache_stats(),
+        }
+
+    async def route(self, start, end, fl, direction, algorithm, eobt=None, epsilon=1.0, deadline_ms=None):
+        """Runs (or joins) the search for one request; returns (status, body)."""
+        # Resolved per request, so a dataset switch applies to the next search
+        engine = self.engine
+        key = (start, end, fl, direction, algorithm, eobt, epsilon, deadline_ms, engine.version)
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+        else:
+            if len(self._inflight) >= self.max_pending:
+                self.rejected += 1
+                return 503, {'success': False, 'error': 'Too many pending searches, retry later'}
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._executor, _find_route, engine, *key[:-1])
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+            self.searches += 1
+        # shield: a client disconnecting must not cancel the search other requests share
+        result = await asyncio.shield(future)
+        if result is None:
+            return 404, {'success': False, 'start': start, 'end': end, 'error': 'No route found'}
+        return 200, result
+
+    async def _dispatch(self, method, target, body):
+        url = urlsplit(target)
+        if url.path == '/health':
+            if method != 'GET':
+                raise BadRequest(f"{method} not allowed on /health", 405)
+            return 200, self.health()
+        if url.path != '/route':
+            raise BadRequest(f"Unknown path {url.path}", 404)
+        if method == 'GET':
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        elif method == 'POST':
+            try:
+                params = json.loads(body or b'{}')
+            except ValueError:
+                raise BadRequest("Request body is not valid JSON")
+            if not isinstance(params, dict):
+                raise BadRequest("Request body must be a JSON object")
+        else:
+            raise BadRequest(f"{method} not allowed on /route", 405)
+        return await self.route(*_route_params(params))
+
+    async def _handle(self, reader, writer):
+        """One client connection; serves requests until close (HTTP/1.1 keep-alive)."""
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except BadRequest as e:
+                    await _respond(writer, e.status, {'success': False, 'error': str(e)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, target, headers, body = request
+                self.requests += 1
+                try:
+                    status, payload = await self._dispatch(method, target, body)
+                except BadRequest as e:
+                    status, payload = e.status, {'success': False, 'error': str(e)}
+                except Exception as e:
+                    print(f"[route_engine] Error handling {method} {target}: {e!r}")
+                    status, payload = 500, {'success': False, 'error': repr(e)}
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                await _respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+def _find_route(engine, start, end, fl, direction, algorithm, eobt, epsilon, deadline_ms):
+    return engine.find_route(start, end, fl=fl, direction=direction, algorithm=algorithm, eobt=eobt,
+                             epsilon=epsilon, deadline_ms=deadline_ms)
+
+def _route_params(params):
+    """Validated (start, end, fl, direction, algorithm, eobt, epsilon, deadline_ms) from query / JSON parameters."""
+    start = str(params.get('start') or '').strip().upper()
+    end = str(params.get('end') or '').strip().upper()
+    if not start or not end:
+        raise BadRequest("Parameters 'start' and 'end' are required")
+    fl = params.get('fl')
+    try:
+        fl = DEFAULT_INTENDED_FL if fl in (None, '') else int(fl)
+    except (TypeError, ValueError):
+        raise BadRequest(f"Invalid flight level '{fl}'")
+    direction = str(params.get('direction') or DEFAULT_FLOS_DIRECTION).strip().upper()
+    if direction not in FLOS_DIRECTIONS:
+        raise BadRequest(f"Unknown direction '{direction}' (expected one of: {', '.join(FLOS_DIRECTIONS)})")
+    algorithm = str(params.get('algorithm') or 'astar')
+    if algorithm not in ALGORITHMS:
+        raise BadRequest(f"Unknown algorithm '{algorithm}' (expected one of: {', '.join(ALGORITHMS)})")
+    eobt = params.get('eobt')
+    if eobt not in (None, ''):
+        try:
+            eobt = datetime.datetime.fromisoformat(str(eobt).strip().replace('Z', '+00:00'))
+        except ValueError:
+            raise BadRequest(f"Invalid eobt '{eobt}' (expected ISO 8601, e.g. 2026-03-02T06:00Z)")
+        if algorithm != 'astar':
+            raise BadRequest("Parameter 'eobt' requires algorithm 'astar'")
+    else:
+        eobt = None
+    epsilon, deadline_ms = params.get('epsilon'), params.get('deadline_ms')
+    try:
+        epsilon = 1.0 if epsilon in (None, '') else float(epsilon)
+        deadline_ms = None if deadline_ms in (None, '') else float(deadline_ms)
+    except (TypeError, ValueError):
+        raise BadRequest(f"Invalid epsilon '{epsilon}' or deadline_ms '{deadline_ms}'")
+    if not epsilon >= 1.0 or (deadline_ms is not None and not deadline_ms > 0):
+        raise BadRequest("Parameter 'epsilon' must be >= 1 and 'deadline_ms' > 0")
+    if (epsilon != 1.0 or deadline_ms is not None) and algorithm != 'astar':
+        raise BadRequest("Parameters 'epsilon' and 'deadline_ms' require algorithm 'astar'")
+    return start, end, fl, direction, algorithm, eobt, epsilon, deadline_ms
+
+async def _read_request(reader):
+    """Parses one HTTP request; returns (method, target, headers, body) or None at EOF."""
+    try:
+        head = await reader.readuntil(b'\r\n\r\n')
+    except asyncio.IncompleteReadError as e:
+        if not e.partial.strip():
+            return None
+        raise BadRequest("Incomplete request")
+    except asyncio.LimitOverrunError:
+        raise BadRequest("Request header too large", 413)
+    if len(head) > MAX_HEADER_BYTES:
+        raise BadRequest("Request header too large", 413)
+    lines = head.decode('latin-1').split('\r\n')
+    try:
+        method, target, _ = lines[0].split(' ', 2)
+    except ValueError:
+        raise BadRequest("Malformed request line")
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get('content-length', 0))
+    except ValueError:
+        raise BadRequest("Invalid Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise BadRequest("Request body too large", 413)
+    body = await reader.readexactly(length) if length > 0 else b''
+    return method.upper(), target, headers, body
+
+async def _respond(writer, status, payload, keep_alive=True):
+    body = json.dumps(payload).encode('utf-8')
+    head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    if status == 503:
+        head.append("Retry-After: 1")
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode('latin-1') + body)
+    await writer.drain()
+
+def serve(host=SERVER_HOST, port=SERVER_PORT, workers=SERVER_WORKERS, max_pending=SERVER_MAX_PENDING,
+          fls=(DEFAULT_INTENDED_FL,), directions=(DEFAULT_FLOS_DIRECTION,), algorithms=('astar',),
+          next_dataset=None, next_airac=None):
+    """
+    Loads the dataset, warms the given profiles and serves until interrupted.
+    next_dataset: directory of the next AIRAC cycle, loaded in the background
+                  and switched to at its effective date (see stage_dataset).
+    """
+    from . import stage_dataset
+    server = RouteServer(host, port, workers, max_pending)
+    server.warm_up(fls, directions, algorithms)
+    if next_dataset:
+        stage_dataset(next_dataset, airac=next_airac,
+                      profiles=[(fl, direction) for fl in fls for direction in directions])
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print("[route_engine] Server stopped")
@@ -0,0 +1,74 @@
+import os
+import json
+import shutil
+import datetime
+from .points import PointStore
+from .data_loader import source_hashes, SOURCE_FILES
+from .airac import current_airac
+from .config import GRAPH_CACHE_DIR, FRA_COVER_FILE
+
+SNAPSHOT_FORMAT_VERSION = 3
+
+def snapshot_path(version, cache_dir=GRAPH_CACHE_DIR):
+    return os.path.join(cache_dir, version, f"snapshot_v{SNAPSHOT_FORMAT_VERSION}")
+
+def write_snapshot(version, points_db, edges, airport_index, cache_dir=GRAPH_CACHE_DIR,
+                   paths=SOURCE_FILES, cover_file=FRA_COVER_FILE):
+    """
+    Writes a binary snapshot of the loaded dataset for `version` (see
+    data_loader.dataset_version) parsed from `paths`. Points are stored as
+    .npy arrays that load memory-mapped; DCT edges and airport indexes as JSON.
+    """
+    path = snapshot_path(version, cache_dir)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    
+    points_db.save(os.path.join(tmp, 'points'))
+    with open(os.path.join(tmp, 'edges.json'), 'w', encoding='utf-8') as f:
+        json.dump(edges, f)
+    with open(os.path.join(tmp, 'airports.json'), 'w', encoding='utf-8') as f:
+        json.dump(airport_index, f)
+    # Manifest last: a snapshot without one is never loaded
+    with open(os.path.join(tmp, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump({
+            'format': SNAPSHOT_FORMAT_VERSION,
+            'version': version,
+            'airac': current_airac(cover_file),
+            'sources': source_hashes(paths),
+            'created': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'points': len(points_db),
+        }, f, indent=2)
+    
+    shutil.rmtree(path, ignore_errors=True)
+    os.rename(tmp, path)
+    return path
+
+def load_snapshot(version, cache_dir=GRAPH_CACHE_DIR):
+    """
+    Loads the snapshot for `version`, or returns None if there is none (or it
+    was written by another format version). Returns (points_db, edges, airport_index).
+    """
+    path = snapshot_path(version, cache_dir)
+    try:
+        with open(os.path.join(path, 'manifest.json'), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('format') != SNAPSHOT_FORMAT_VERSION or manifest.get('version') != version:
+            return None
+        points_db = PointStore.load(os.path.join(path, 'points'))
+        with open(os.path.join(path, 'edges.json'), 'r', encoding='utf-8') as f:
+            edges = json.load(f)
+        with open(os.path.join(path, 'airports.json'), 'r', encoding='utf-8') as f:
+            airport_index = json.load(f)
+    except (OSError, ValueError, KeyError):
+        return None
+    return points_db, edges, airport_index
+
+def prune_cache(keep_version, cache_dir=GRAPH_CACHE_DIR):
+    """Removes cached data of every dataset version other than keep_version."""
+    if not os.path.isdir(cache_dir):
+        return
+    for name in os.listdir(cache_dir):
+        p = os.path.join(cache_dir, name)
+        if name != keep_version and os.path.isdir(p):
+            shutil.rmtree(p, ignore_errors=True)
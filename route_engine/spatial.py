@@ -0,0 +1,116 @@
+import numpy as np
+from .utils import to_unit_vectors, EARTH_RADIUS_KM
+
+class SpatialIndex:
+    """
+    KD-tree over 3-D unit vectors of FRA points.
+    
+    Great-circle radius queries are answered exactly at every latitude by
+    converting the radius to a chord length on the unit sphere.
+    Build once per dataset and share across queries (read-only).
+    """
+    
+    def __init__(self, names, lats, lons, leaf_size=32):
+        self.names = list(names)
+        self.name_to_id = {n: i for i, n in enumerate(self.names)}
+        self.xyz = to_unit_vectors(np.asarray(lats, dtype=np.float64), np.asarray(lons, dtype=np.float64))
+        self.leaf_size = leaf_size
+        self._build()
+    
+    def __len__(self):
+        return len(self.names)
+    
+    def _build(self):
+        n = len(self.names)
+        order = np.arange(n, dtype=np.int64)
+        lo, hi, start, end, left, right = [], [], [], [], [], []
+        
+        def new_node(s, e):
+            pts = self.xyz[order[s:e]]
+            lo.append(pts.min(axis=0) if e > s else np.zeros(3))
+            hi.append(pts.max(axis=0) if e > s else np.zeros(3))
+            start.append(s)
+            end.append(e)
+            left.append(-1)
+            right.append(-1)
+            return len(start) - 1
+        
+        root = new_node(0, n)
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            s, e = start[node], end[node]
+            if e - s <= self.leaf_size:
+                continue
+            # Split on the axis with the largest spread, at the median
+            axis = int(np.argmax(hi[node] - lo[node]))
+            mid = (s + e) // 2
+            seg = order[s:e]
+            part = np.argpartition(self.xyz[seg, axis], mid - s)
+            order[s:e] = seg[part]
+            left[node] = new_node(s, mid)
+            right[node] = new_node(mid, e)
+            stack.append(left[node])
+            stack.append(right[node])
+        
+        self.order = order
+        self._xyz_sorted = self.xyz[order]
+        # Plain tuples: indexing numpy rows in the traversal loop is slow
+        self._boxes = [tuple(map(float, l)) + tuple(map(float, h)) for l, h in zip(lo, hi)]
+        self._start = start
+        self._end = end
+        self._left = left
+        self._right = right
+    
+    def _query_vector(self, point):
+        if isinstance(point, str):
+            return self.xyz[self.name_to_id[point]]
+        if isinstance(point, (int, np.integer)):
+            return self.xyz[point]
+        lat, lon = point
+        return to_unit_vectors(np.array([lat], dtype=np.float64), np.array([lon], dtype=np.float64))[0]
+    
+    def query_radius_ids(self, point, km):
+        """Returns ids of all points within `km` great-circle distance of `point`."""
+        q = self._query_vector(point)
+        chord = 2.0 * np.sin(min(km / EARTH_RADIUS_KM, np.pi) / 2.0)
+        r2 = chord * chord + 1e-12
+        q0, q1, q2 = float(q[0]), float(q[1]), float(q[2])
+        boxes = self._boxes
+        
+        hits = []
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            # Squared distance from q to the node's bounding box
+            l0, l1, l2, h0, h1, h2 = boxes[node]
+            d0 = l0 - q0 if q0 < l0 else (q0 - h0 if q0 > h0 else 0.0)
+            d1 = l1 - q1 if q1 < l1 else (q1 - h1 if q1 > h1 else 0.0)
+            d2 = l2 - q2 if q2 < l2 else (q2 - h2 if q2 > h2 else 0.0)
+            if d0 * d0 + d1 * d1 + d2 * d2 > r2:
+                continue
+            if self._left[node] < 0:
+                s, e = self._start[node], self._end[node]
+                diff = self._xyz_sorted[s:e] - q
+                mask = np.einsum('ij,ij->i', diff, diff) <= r2
+                if mask.any():
+                    hits.append(self.order[s:e][mask])
+                continue
+            stack.append(self._left[node])
+            stack.append(self._right[node])
+        
+        if not hits:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(hits)
+    
+    def query_radius(self, point, km):
+        """
+        Returns names of all points within `km` great-circle distance of `point`.
+        `point` may be a point name, a point id or a (lat, lon) tuple in degrees.
+        """
+        names = self.names
+        return [names[i] for i in self.query_radius_ids(point, km)]
+
+def build_spatial_index(points_db):
+    """Builds the shared spatial index over a PointStore (ids match the store's ids)."""
+    return SpatialIndex(points_db.names, points_db.lat, points_db.lon)
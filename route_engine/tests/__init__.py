@@ -0,0 +1,33 @@
+"""
+Regression tests for route_engine:
+
+    python -m unittest discover -s route_engine/tests -t .
+
+They run against the dataset in config.BASE_DIR. Graphs are loaded from (or
+built into) route_cache/ as for any engine, so the first run of a profile is
+slow.
+"""
+import io
+import contextlib
+import threading
+
+_ENGINE = None
+_LOCK = threading.Lock()
+
+def engine():
+    """RouteEngine over the default dataset, loaded once per test run."""
+    global _ENGINE
+    with _LOCK:
+        if _ENGINE is None:
+            from route_engine.engine import RouteEngine
+            with quiet():
+                _ENGINE = RouteEngine()
+    return _ENGINE
+
+def quiet():
+    """Silences the engine's progress prints."""
+    return contextlib.redirect_stdout(io.StringIO())
+
+def route_length(path, edge_info):
+    """Length in km of a (path, edge_info) search result."""
+    return sum(edge_info[u][v]['Dist'] for u, v in zip(path, path[1:]))
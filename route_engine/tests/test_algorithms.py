@@ -0,0 +1,25 @@
+"""A*, bidirectional A* and the contraction hierarchy find routes of the same length."""
+import unittest
+from route_engine.benchmark import sample_pairs
+from route_engine.tests import engine, quiet
+
+class TestAlgorithmsAgree(unittest.TestCase):
+
+    def test_sample_pairs(self):
+        e = engine()
+        found = 0
+        with quiet():
+            for start, end in sample_pairs(25, seed=1, engine=e) + [('EDDF', 'LGAV'), ('EHAM', 'LIRF')]:
+                results = {a: e.find_route(start, end, algorithm=a) for a in ('astar', 'bidir', 'ch')}
+                expected = results['astar']
+                for algorithm in ('bidir', 'ch'):
+                    with self.subTest(start=start, end=end, algorithm=algorithm):
+                        result = results[algorithm]
+                        self.assertEqual(result is None, expected is None)
+                        if expected is not None:
+                            self.assertAlmostEqual(result['total_distance'], expected['total_distance'], places=6)
+                found += expected is not None
+        self.assertGreater(found, 10)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+"""Bounded-suboptimal (epsilon) and anytime (deadline_ms) routes stay within the reported bound."""
+import unittest
+from route_engine.config import ANYTIME_INITIAL_WEIGHT
+from route_engine.benchmark import sample_pairs
+from route_engine.tests import engine, quiet
+
+class TestBound(unittest.TestCase):
+
+    def assertWithinBound(self, result, shortest, epsilon):
+        self.assertLessEqual(result['bound'], epsilon)
+        self.assertGreaterEqual(result['bound'], 1.0)
+        self.assertLessEqual(result['total_distance'], shortest * result['bound'] + 1e-6)
+
+    def test_sample_pairs(self):
+        e = engine()
+        checked = 0
+        with quiet():
+            for start, end in sample_pairs(20, seed=3, engine=e) + [('LFEB', 'LEDA')]:
+                shortest = e.find_route(start, end)
+                if shortest is None:
+                    continue
+                self.assertEqual(shortest['bound'], 1.0)
+                for epsilon in (1.1, 1.5, 3.0):
+                    with self.subTest(start=start, end=end, epsilon=epsilon):
+                        self.assertWithinBound(e.find_route(start, end, epsilon=epsilon),
+                                               shortest['total_distance'], epsilon)
+                with self.subTest(start=start, end=end, deadline_ms=500):
+                    self.assertWithinBound(e.find_route(start, end, deadline_ms=500),
+                                           shortest['total_distance'], ANYTIME_INITIAL_WEIGHT)
+                checked += 1
+        self.assertGreater(checked, 10)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+"""delta.apply_delta gives the same graph and routes as loading the changed dataset from scratch."""
+import os
+import csv
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from route_engine import RouteEngine, apply_delta
+from route_engine.data_loader import DatasetFiles
+from route_engine.config import BASE_DIR, FRA_POINTS_NAME, ANNEX_3B_DCT_NAME
+from route_engine.benchmark import sample_pairs
+from route_engine.tests import engine, quiet
+
+def _rewrite(path, edit):
+    with open(path, 'r', encoding='utf-8', errors='replace', newline='') as f:
+        rows = list(csv.reader(f))
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        csv.writer(f).writerows(edit(rows))
+
+def _changed_points(rows):
+    """Lifts three points above FL320 and drops a fourth."""
+    header, body = rows[0], rows[1:]
+    levels = header.index('Level Availability')
+    for row in body[100:3100:1000]:
+        row[levels] = 'FL400 / FL660'
+    return [header] + body[:5000] + body[5001:]
+
+def _added_dct(rows):
+    """Adds an Annex 3B DCT between the points of two existing rows."""
+    extra = list(rows[1])
+    extra[0], extra[2], extra[6] = 'XX0001', rows[200][2], ''
+    return rows + [extra]
+
+class TestApplyDelta(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp()
+        dataset = os.path.join(cls.tmp, 'dataset')
+        for src in DatasetFiles.in_dir(BASE_DIR):
+            dst = os.path.join(dataset, os.path.relpath(src, BASE_DIR))
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            shutil.copyfile(src, dst)
+        _rewrite(os.path.join(dataset, FRA_POINTS_NAME), _changed_points)
+        _rewrite(os.path.join(dataset, ANNEX_3B_DCT_NAME), _added_dct)
+
+        cls.old = engine()
+        cls.pairs = sample_pairs(30, seed=11, engine=cls.old)
+        with quiet():
+            for start, end in cls.pairs:
+                cls.old.find_route(start, end)
+            cls.new = apply_delta(cls.old, dataset)
+            cls.fresh = RouteEngine(dataset, use_snapshot=False, cache_dir=os.path.join(cls.tmp, 'cache'))
+
+    @classmethod
+    def tearDownClass(cls):
+        # The derived engine persists its graphs next to the old engine's
+        if cls.new.version != cls.old.version:
+            shutil.rmtree(os.path.join(cls.old.cache_dir, cls.new.version), ignore_errors=True)
+        shutil.rmtree(cls.tmp, ignore_errors=True)
+
+    def rows(self, e):
+        with quiet():
+            adj = e.adjacency()
+        names = e.dataset.points_db.names
+        rows = {}
+        for u in range(adj.num_nodes):
+            a, b = adj.indptr[u], adj.indptr[u + 1]
+            rows[names[u]] = sorted(zip((names[v] for v in adj.indices[a:b]),
+                                        np.round(adj.weights[a:b], 9).tolist(), adj.rules[a:b].tolist()))
+        return rows
+
+    def test_delta_is_not_empty(self):
+        self.assertNotEqual(self.new.version, self.old.version)
+        self.assertNotEqual(self.rows(self.new), self.rows(self.old))
+
+    def test_same_adjacency_as_fresh_build(self):
+        self.assertEqual(self.rows(self.new), self.rows(self.fresh))
+
+    def test_same_routes_as_fresh_build(self):
+        with quiet():
+            for start, end in self.pairs:
+                derived, fresh = self.new.find_route(start, end), self.fresh.find_route(start, end)
+                with self.subTest(start=start, end=end):
+                    self.assertEqual(derived is None, fresh is None)
+                    if fresh is not None:
+                        self.assertAlmostEqual(derived['total_distance'], fresh['total_distance'], places=6)
+
+if __name__ == '__main__':
+    unittest.main()
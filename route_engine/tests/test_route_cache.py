@@ -0,0 +1,24 @@
+"""Results served from the route result cache are independent copies."""
+import copy
+import unittest
+from route_engine.tests import engine, quiet
+
+class TestRouteCache(unittest.TestCase):
+
+    def test_changing_a_result_leaves_the_cache_intact(self):
+        e = engine()
+        with quiet():
+            first = e.find_route('LFPG', 'EPWA')
+            expected = copy.deepcopy(first)
+            for result in (first, e.find_route('LFPG', 'EPWA')):
+                result['route'][0]['name'] = 'XXXXX'
+                result['route'].append({'seq': 0})
+                result['annex_2b'].append({'id': 'XX0001'})
+                if result['annex_2b'][:-1]:
+                    result['annex_2b'][0]['location'] = 'XXXXX'
+                result['total_distance'] = 0.0
+            self.assertEqual(e.find_route('LFPG', 'EPWA'), expected)
+            self.assertEqual(e.find_route('LFPG', 'EPWA', output_format='table')['route'], expected['route'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+"""Resumed A* search trees (cache.SearchTreeCache) give the same routes as fresh searches."""
+import random
+import functools
+import unittest
+from unittest import mock
+from route_engine import router
+from route_engine.cache import SearchTreeCache
+from route_engine.tests import engine, quiet, route_length
+
+class TestSearchTreeCache(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        e = engine()
+        with quiet():
+            cls.adjacency = e.adjacency()
+            cls.landmarks = e.landmarks()
+        cls.dataset = e.dataset
+
+    def search(self, start, end, tree_cache=None):
+        d = self.dataset
+        path, edge_info = router.find_path_astar([start], [end], d.edges, d.points_db, d.spatial_index,
+                                                 self.adjacency, landmarks=self.landmarks, tree_cache=tree_cache)
+        return path and route_length(path, edge_info)
+
+    def test_resumed_searches_match_fresh(self):
+        names = self.dataset.points_db.names
+        degree = self.adjacency.indptr[1:] - self.adjacency.indptr[:-1]
+        ends = random.Random(7).sample([names[v] for v in range(len(names)) if degree[v]], 8)
+        tree_cache = SearchTreeCache()
+        with quiet():
+            for end in ['TALAS'] + ends + ['TALAS']:
+                with self.subTest(end=end):
+                    self.assertEqual(self.search('SULUS', end, tree_cache), self.search('SULUS', end))
+        self.assertEqual(len(tree_cache), 1)
+        self.assertGreater(tree_cache.hits, 0)
+
+    def test_aborted_search_is_not_resumed(self):
+        tree_cache = SearchTreeCache()
+        limited = functools.partial(router.astar_ids, max_iter=20)
+        with quiet():
+            with mock.patch.object(router, 'astar_ids', limited):
+                self.assertIsNone(self.search('SULUS', 'TALAS', tree_cache))
+            self.assertEqual(len(tree_cache), 0)
+            self.assertAlmostEqual(self.search('SULUS', 'TALAS', tree_cache), self.search('SULUS', 'TALAS'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+"""Request parameter validation of the HTTP service."""
+import unittest
+from route_engine.server import _route_params, BadRequest
+
+class TestRouteParams(unittest.TestCase):
+
+    def test_defaults(self):
+        start, end, fl, direction, algorithm, eobt, epsilon, deadline_ms = _route_params({'start': 'eddf', 'end': 'LGAV'})
+        self.assertEqual((start, end, direction, algorithm), ('EDDF', 'LGAV', 'EAST', 'astar'))
+        self.assertEqual((eobt, epsilon, deadline_ms), (None, 1.0, None))
+
+    def test_direction(self):
+        self.assertEqual(_route_params({'start': 'EDDF', 'end': 'LGAV', 'direction': 'west'})[3], 'WEST')
+        with self.assertRaises(BadRequest) as cm:
+            _route_params({'start': 'EDDF', 'end': 'LGAV', 'direction': 'FOO'})
+        self.assertEqual(cm.exception.status, 400)
+
+    def test_invalid_parameters(self):
+        for params in ({'start': 'EDDF'},
+                       {'start': 'EDDF', 'end': 'LGAV', 'fl': 'high'},
+                       {'start': 'EDDF', 'end': 'LGAV', 'algorithm': 'bfs'},
+                       {'start': 'EDDF', 'end': 'LGAV', 'algorithm': 'ch', 'epsilon': 1.2},
+                       {'start': 'EDDF', 'end': 'LGAV', 'eobt': 'tomorrow'}):
+            with self.subTest(params=params), self.assertRaises(BadRequest):
+                _route_params(params)
+
+if __name__ == '__main__':
+    unittest.main()
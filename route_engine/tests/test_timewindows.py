@@ -0,0 +1,134 @@
+"""
+Parity of timewindows with the RAD ETL time grammar (scripts/RAD_ETL_Parser_CSV_v2.py).
+
+The ETL reads times as RAD_GRAMMAR TIME_DLY / TIME_DAYS tokens ('DLY 0600-2200',
+'MON-FRI 0600-1500', bare '0600-2200') and stores them as (days, start, end)
+rows via RADParser.get_cond_time. timewindows reads the full Annex texts
+(HH:MM, summer times, day spans, '&', sections), so both must agree wherever
+the ETL grammar reads a text.
+"""
+import os
+import re
+import csv
+import glob
+import sys
+import unittest
+from route_engine.config import BASE_DIR
+from route_engine.timewindows import compile_time_windows, DAYS, WEEK_MINUTES
+from route_engine.dct import DctTable
+
+sys.path.insert(0, os.path.join(BASE_DIR, 'scripts'))
+try:
+    from RAD_ETL_Parser_CSV_v2 import RAD_GRAMMAR  # needs pandas
+except ImportError:
+    RAD_GRAMMAR = None
+
+def _etl_rows(text):
+    """(days, start, end) rows the ETL grammar gives for text, [] for H24, None if it cannot read it."""
+    s = text.upper().replace('\n', ' ').strip()
+    if s == 'H24':
+        return []
+    m = re.fullmatch(r'(\d{4})-(\d{4})', s)
+    if m:
+        return [('DLY',) + m.groups()]
+    tokens = [(name, p) for name, p in RAD_GRAMMAR if name.startswith('TIME')]
+    rows, rem = [], s + ' '
+    while rem.strip():
+        for name, pattern in tokens:
+            m = pattern.match(rem)
+            if m:
+                break
+        else:
+            return None
+        g = m.groups()
+        rows.append(('DLY', g[0], g[1]) if name == 'TIME_DLY' else (f"{g[0]}-{g[1]}", g[2], g[3]))
+        rem = rem[m.end():].strip()
+    return rows
+
+def _row_active(rows, minute):
+    """True if a week minute falls in one of the rows (a window ending at or before its start ends next day)."""
+    for days, start, end in rows:
+        a = int(start[:2]) * 60 + int(start[2:])
+        b = int(end[:2]) * 60 + int(end[2:])
+        if b <= a:
+            b += 1440
+        if days == 'DLY':
+            day_list = range(7)
+        else:
+            first, last = (DAYS.index(d) for d in days.split('-'))
+            day_list = [(first + k) % 7 for k in range((last - first) % 7 + 1)]
+        for d in day_list:
+            if (minute - (d * 1440 + a)) % WEEK_MINUTES < b - a:
+                return True
+    return False
+
+def _annex_time_values():
+    values = set()
+    for path in glob.glob(os.path.join(BASE_DIR, 'Annex_*.csv')):
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            reader = csv.DictReader(f)
+            columns = [c for c in reader.fieldnames or () if 'TIME' in c.upper()]
+            for row in reader:
+                values.update((row.get(c) or '').strip() for c in columns)
+    values.discard('')
+    return values
+
+@unittest.skipIf(RAD_GRAMMAR is None, "RAD ETL parser dependencies (pandas) not installed")
+class TestEtlParity(unittest.TestCase):
+
+    def assertSameWindows(self, text, etl_text=None):
+        rows = _etl_rows(etl_text or text)
+        self.assertIsNotNone(rows, etl_text or text)
+        windows = compile_time_windows(text)
+        if not rows:
+            self.assertIsNone(windows, text)
+            return
+        self.assertIsNotNone(windows, text)
+        for minute in range(0, WEEK_MINUTES, 5):
+            self.assertEqual(windows.active_at(minute), _row_active(rows, minute), f"{text!r} at minute {minute}")
+
+    def test_etl_token_forms(self):
+        for text in ('H24', '0600-2200', 'DLY 0600-2200', 'DLY 2200-0600', 'MON-FRI 0600-1500',
+                     'FRI-SUN 1900-0700', 'SUN-TUE 0000-2400', 'MON-FRI 0600-1500\nSAT-SUN 0800-1200'):
+            with self.subTest(text=text):
+                self.assertSameWindows(text)
+
+    def test_real_annex_values(self):
+        # Real values use HH:MM, which the ETL tokens only read without the colon
+        compared = 0
+        for text in sorted(_annex_time_values()):
+            etl_text = re.sub(r'(\d\d):(\d\d)', r'\1\2', text)
+            if _etl_rows(etl_text) is None:
+                continue
+            with self.subTest(text=text):
+                self.assertSameWindows(text, etl_text)
+            compared += 1
+        self.assertGreater(compared, 10)
+
+class TestTimeWindows(unittest.TestCase):
+
+    def test_summer_times_and_spans(self):
+        w = compile_time_windows('MON-FRI 06:00-15:00 (05:00-14:00)')
+        self.assertTrue(w.active_at(6 * 60))
+        self.assertFalse(w.active_at(5 * 60 + 30))
+        self.assertTrue(w.active_at(5 * 60 + 30, summer=True))
+        self.assertFalse(w.active_at(5 * 1440 + 7 * 60))  # Saturday
+        span = compile_time_windows('FRI 22:00-MON 06:00')
+        self.assertTrue(span.active_at(6 * 1440 + 12 * 60))  # Sunday noon
+        self.assertTrue(span.active_at(5 * 60))              # Monday 05:00, wrapped
+        self.assertFalse(span.active_at(2 * 1440))
+
+    def test_unevaluable_texts_apply_at_any_time(self):
+        for text in ('', 'H24', 'NOTAM ACT', 'AIRAC MAR - FIRST AIRAC OCT\n05:00-23:00 (04:00-22:00)'):
+            self.assertIsNone(compile_time_windows(text), text)
+
+    def test_compiled_texts_are_shared_per_table_only(self):
+        edge = {'Lower': 'FL100', 'Upper': 'FL200', 'Available': 'Y', 'Time': 'DLY 06:00-22:00'}
+        edges = {'AAAAA': [dict(edge, To='BBBBB')], 'CCCCC': [dict(edge, To='DDDDD')]}
+        first, second = DctTable(edges), DctTable(edges)
+        times = first.rules('AAAAA', 'BBBBB', 150)[0].times
+        self.assertIs(first.rules('CCCCC', 'DDDDD', 150)[0].times, times)
+        self.assertIsNot(second.rules('AAAAA', 'BBBBB', 150)[0].times, times)
+
+if __name__ == '__main__':
+    unittest.main()
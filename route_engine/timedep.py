@@ -0,0 +1,86 @@
+"""
+Time-dependent routing (find_route(..., eobt=...)).
+
+The estimated time over each point follows from the EOBT, the distance flown
+and a cruise speed, so the search can check time-limited restrictions at the
+time each edge is entered. Only adjacency edges whose Annex 3B pair has
+time-limited rows at the graph's FL band are checked at all; their rows and
+time windows are compiled once (DctTable / TimeWindows), so an expansion
+costs one byte test per edge plus a bisect on the few flagged ones.
+"""
+import datetime
+import numpy as np
+from .dct import DCT_AVAILABLE
+from .graph import RULE_EXPLICIT
+from .validator import connection_masks
+from .timewindows import week_minute, is_summer, WEEK_MINUTES
+from .utils import haversine_many
+from .config import CRUISE_SPEED_KMH, MAX_DCT_DISTANCE_KM
+
+class TimedEdges:
+    """
+    Edges of one adjacency whose availability depends on the time they are
+    entered. flags: one byte per CSR edge (1 = time-limited); edges: CSR
+    index -> (from name, to name, fallback), where fallback tells whether
+    the pair is still a valid simulated FRA connection while none of its
+    Annex 3B rows is in force.
+    """
+
+    def __init__(self, store, adjacency, dct, intended_fl):
+        self.dct = dct
+        self.fl = intended_fl
+        self.flags = bytearray(adjacency.num_edges)
+        self.edges = {}
+        name_to_id = store.name_to_id
+        for u, v in dct.pairs():
+            if u not in name_to_id or v not in name_to_id:
+                continue
+            if not any(r.times is not None for r in dct.rules(u, v, intended_fl)):
+                continue
+            a, b = name_to_id[u], name_to_id[v]
+            e = adjacency.edge_id(a, b)
+            if e is None:
+                continue
+            fallback = True
+            if adjacency.rules[e] == RULE_EXPLICIT:
+                same, cross = connection_masks(store, a, np.array([b]))
+                d = haversine_many(store.lat[a], store.lon[a], store.lat[b:b + 1], store.lon[b:b + 1])[0]
+                fallback = bool((same[0] or cross[0]) and d < MAX_DCT_DISTANCE_KM)
+            self.flags[e] = 1
+            self.edges[e] = (u, v, fallback)
+
+    def __len__(self):
+        return len(self.edges)
+
+    def usable(self, edge, minute, summer=False):
+        """True if the edge may be entered at the given week minute."""
+        u, v, fallback = self.edges[edge]
+        status = self.dct.status(u, v, self.fl, minute, summer)
+        return status is DCT_AVAILABLE or (status is None and fallback)
+
+class Departure:
+    """
+    EOBT and cruise speed of a time-dependent search: maps the distance flown
+    (km, the search's g-score) to a time and checks timed edges at it.
+    """
+
+    def __init__(self, eobt, timed_edges=None, speed_kmh=CRUISE_SPEED_KMH):
+        if eobt.tzinfo is not None:
+            eobt = eobt.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        self.eobt = eobt
+        self.timed = timed_edges
+        self.speed_kmh = speed_kmh
+        self.summer = is_summer(eobt)
+        self._minute = week_minute(eobt) + eobt.second / 60.0
+
+    def time_at(self, dist_km):
+        """Estimated UTC time (naive datetime) after dist_km."""
+        return self.eobt + datetime.timedelta(hours=dist_km / self.speed_kmh)
+
+    def minute_at(self, dist_km):
+        """Week minute (timewindows.week_minute) after dist_km."""
+        return (self._minute + dist_km * 60.0 / self.speed_kmh) % WEEK_MINUTES
+
+    def edge_ok(self, edge, dist_km):
+        """True if timed edge `edge` may be entered after dist_km."""
+        return self.timed.usable(edge, self.minute_at(dist_km), self.summer)
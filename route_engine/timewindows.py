@@ -0,0 +1,197 @@
+"""
+Time applicability of RAD rules ('H24', 'DLY 0600-2200', 'MON-FRI 06:00-15:00
+& 17:00-22:00', '22:00-05:00 (23:00-03:30)', 'FRI 22:00-MON 06:00', ...).
+
+Texts are compiled once into sorted UTC intervals over the week, one set for
+the winter period and one for the summer period (the bracketed times), so a
+check is a bisect. Within one compiled table (DctTable, Annex2BIndex) rules
+with the same text share one TimeWindows, like RADParser.get_cond_time shares
+tbl_Cond_Time rows; the memo lives and dies with that table.
+
+The RAD ETL grammar (RAD_GRAMMAR TIME_DLY / TIME_DAYS in
+scripts/RAD_ETL_Parser_CSV_v2.py) is not reused: it only reads HHMM tokens
+without summer times, day spans or sections, so of the Annex 'Time' values
+it reads nothing but 'H24', and it needs pandas. tests/test_timewindows.py
+checks that both agree wherever the ETL grammar reads a text.
+"""
+import re
+import bisect
+import datetime
+
+WEEK_MINUTES = 7 * 1440
+DAYS = ('MON', 'TUE', 'WED', 'THU', 'FRI', 'SAT', 'SUN')
+
+_DAY = r'(MON|TUE|WED|THU|FRI|SAT|SUN)'
+_TIME = r'(\d{2}):?(\d{2})'
+_SUMMER = r'(?:\s*\(' + _TIME + r'\))?'
+_DAYS_RE = re.compile(r'(?:DLY|' + _DAY + r'(?:-' + _DAY + r')?)')
+_DAILY_RE = re.compile(r'(?:(DLY|' + _DAY + r'(?:-' + _DAY + r')?)\s+)?'
+                       + _TIME + '-' + _TIME
+                       + r'(?:\s*\(' + _TIME + '-' + _TIME + r'\))?')
+_SPAN_RE = re.compile(_DAY + r'\s+' + _TIME + _SUMMER + '-' + _DAY + r'\s+' + _TIME + _SUMMER)
+_AT_RE = re.compile(r'\s+AT\s+\(?[A-Z0-9/, ]+\)?$')
+
+class TimeWindows:
+    """
+    Compiled weekly UTC windows of one time applicability text.
+    Intervals are [start, end) week minutes (Monday 00:00 UTC = 0), merged
+    and sorted, separately for the winter and the summer period.
+    """
+    __slots__ = ('text', '_winter', '_summer')
+
+    def __init__(self, text, winter, summer):
+        self.text = text
+        self._winter = _merge(winter)
+        self._summer = _merge(summer)
+
+    def __repr__(self):
+        return f"TimeWindows({self.text!r})"
+
+    def active_at(self, week_minute, summer=False):
+        """True if the windows contain the given week minute (see week_minute())."""
+        starts, ends = self._summer if summer else self._winter
+        i = bisect.bisect_right(starts, week_minute % WEEK_MINUTES) - 1
+        return i >= 0 and week_minute % WEEK_MINUTES < ends[i]
+
+    def active(self, when):
+        """True if the windows contain datetime `when` (naive = UTC)."""
+        return self.active_at(week_minute(when), is_summer(when))
+
+def week_minute(when):
+    """Minutes since Monday 00:00 UTC of the week containing datetime `when` (naive = UTC)."""
+    when = _utc(when)
+    return when.weekday() * 1440 + when.hour * 60 + when.minute
+
+def is_summer(when):
+    """True during the European summer period (last Sunday of March to last Sunday of October, 01:00 UTC)."""
+    when = _utc(when)
+    return _summer_start(when.year) <= when.replace(tzinfo=None) < _summer_end(when.year)
+
+def compile_time_windows(text, memo=None):
+    """
+    TimeWindows for a time applicability text, or None if the rule applies at
+    any time. Texts that cannot be evaluated offline (NOTAM / area activation,
+    seasons by AIRAC, holidays) also give None: such conditions are assumed
+    to hold. Alternatives separated by '----------' lines are combined.
+    memo: optional dict (text -> result) owned by the caller compiling a whole
+    table, so its rules with the same text share one TimeWindows.
+    """
+    key = (text or '').strip()
+    if memo is None:
+        return _compile(key)
+    if key not in memo:
+        memo[key] = _compile(key)
+    return memo[key]
+
+def _compile(text):
+    winter, summer = [], []
+    for section in re.split(r'\n?-{5,}\n?', text.upper()):
+        section = section.replace('_X000D_', '').replace('..', '-').replace('EXCEPT PUBLIC HOLIDAYS', '')
+        section = re.sub(r'[ \t]*-[ \t]*(?=\d|' + _DAY + ')', '-', section)
+        windows = _compile_section(section)
+        if windows is None:
+            return None
+        winter += windows[0]
+        summer += windows[1]
+    if not winter and not summer:
+        return None
+    return TimeWindows(text, winter, summer)
+
+def _compile_section(section):
+    """(winter, summer) interval lists of one alternative, or None if it is unrestricted / unknown."""
+    winter, summer = [], []
+    days = None
+    items = [i.strip() for line in section.split('\n') for i in line.split('&')]
+    for item in items:
+        item = _AT_RE.sub('', item).strip()
+        if not item or item.startswith('HOL'):
+            continue
+        if _DAYS_RE.fullmatch(item):
+            days = _days(item)
+            continue
+        if item == 'H24' or item.endswith(' H24') and _DAYS_RE.fullmatch(item[:-4].strip()):
+            if item == 'H24':
+                return None
+            for d in _days(item[:-4].strip()):
+                winter.append((d * 1440, d * 1440 + 1440))
+                summer.append((d * 1440, d * 1440 + 1440))
+            continue
+        m = _DAILY_RE.fullmatch(item)
+        if m:
+            g = m.groups()
+            if g[0]:
+                days = _days(g[0])
+            w = (_minutes(g[3], g[4]), _minutes(g[5], g[6]))
+            s = (_minutes(g[7], g[8]), _minutes(g[9], g[10])) if g[7] else w
+            for d in days if days is not None else range(7):
+                winter.append(_daily(d, *w))
+                summer.append(_daily(d, *s))
+            continue
+        m = _SPAN_RE.fullmatch(item)
+        if m:
+            g = m.groups()
+            d1, d2 = DAYS.index(g[0]), DAYS.index(g[5])
+            w1, w2 = _minutes(g[1], g[2]), _minutes(g[6], g[7])
+            s1 = _minutes(g[3], g[4]) if g[3] else w1
+            s2 = _minutes(g[8], g[9]) if g[8] else w2
+            winter.append(_span(d1 * 1440 + w1, d2 * 1440 + w2))
+            summer.append(_span(d1 * 1440 + s1, d2 * 1440 + s2))
+            continue
+        return None
+    return winter, summer
+
+def _days(spec):
+    """Day indexes of 'DLY', 'SAT' or 'MON-FRI' (ranges may wrap, e.g. 'FRI-SUN', 'SUN-TUE')."""
+    if spec == 'DLY':
+        return list(range(7))
+    first, _, last = spec.partition('-')
+    a = DAYS.index(first)
+    b = DAYS.index(last) if last else a
+    return [(a + k) % 7 for k in range((b - a) % 7 + 1)]
+
+def _minutes(hh, mm):
+    return min(int(hh) * 60 + int(mm), 1440)
+
+def _daily(day, start, end):
+    """Window from start on `day` to end (next day if end <= start), as a week interval."""
+    if end <= start:
+        end += 1440
+    return _span(day * 1440 + start, day * 1440 + end)
+
+def _span(start, end):
+    if end <= start:
+        end += WEEK_MINUTES
+    return start, end
+
+def _merge(intervals):
+    """Sorted, merged (starts, ends) lists; intervals past the end of the week wrap to Monday."""
+    flat = []
+    for a, b in intervals:
+        if b > WEEK_MINUTES:
+            flat.append((a, WEEK_MINUTES))
+            flat.append((0, b - WEEK_MINUTES))
+        else:
+            flat.append((a, b))
+    starts, ends = [], []
+    for a, b in sorted(flat):
+        if starts and a <= ends[-1]:
+            ends[-1] = max(ends[-1], b)
+        else:
+            starts.append(a)
+            ends.append(b)
+    return starts, ends
+
+def _utc(when):
+    if when.tzinfo is not None:
+        when = when.astimezone(datetime.timezone.utc)
+    return when
+
+def _last_sunday(year, month):
+    day = datetime.datetime(year, month + 1, 1) - datetime.timedelta(days=1)
+    return day - datetime.timedelta(days=(day.weekday() - 6) % 7)
+
+def _summer_start(year):
+    return _last_sunday(year, 3).replace(hour=1)
+
+def _summer_end(year):
+    return _last_sunday(year, 10).replace(hour=1)
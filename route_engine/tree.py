@@ -0,0 +1,67 @@
+from .router import _reconstruct_ids, _ids_to_route
+
+class RouteTree:
+    """
+    Result of one multi-target Dijkstra run from an origin's start options.
+
+    Distances to every requested target are available immediately; paths and
+    full route details are only reconstructed when asked for.
+    """
+
+    def __init__(self, origin, points_db, adjacency, g, parent, parent_edge,
+                 target_options, route_builder=None):
+        self.origin = origin
+        self._points_db = points_db
+        self._adjacency = adjacency
+        self._g = g
+        self._parent = parent
+        self._parent_edge = parent_edge
+        self._route_builder = route_builder
+        self._routes = {}
+
+        # target -> (distance, best end point id) for reachable targets
+        self._best = {}
+        for target, opts in target_options.items():
+            best = None
+            for v in opts:
+                if best is None or g[v] < g[best]:
+                    best = v
+            if best is not None and g[best] != float('inf'):
+                self._best[target] = (g[best], best)
+
+    def __contains__(self, target):
+        return target in self._best
+
+    def __len__(self):
+        return len(self._best)
+
+    @property
+    def distances(self):
+        """{target: shortest FRA distance in km} for every reachable target."""
+        return {t: d for t, (d, _) in self._best.items()}
+
+    def distance(self, target):
+        """Shortest distance (km) to target, or None if it is not reachable."""
+        best = self._best.get(target)
+        return best[0] if best else None
+
+    def path(self, target):
+        """Waypoint names of the shortest path to target (None if unreachable)."""
+        best = self._best.get(target)
+        if not best:
+            return None
+        names = self._points_db.names
+        return [names[i] for i in _reconstruct_ids(best[1], self._parent)]
+
+    def route(self, target):
+        """Full route details for target, as returned by find_route (built lazily)."""
+        if target in self._routes:
+            return self._routes[target]
+        best = self._best.get(target)
+        if not best:
+            return None
+        ids = _reconstruct_ids(best[1], self._parent)
+        path, edge_info = _ids_to_route(ids, self._parent_edge, self._adjacency, self._points_db)
+        route = self._route_builder(self.origin, target, path, edge_info) if self._route_builder else path
+        self._routes[target] = route
+        return route
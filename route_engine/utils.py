@@ -1,5 +1,8 @@
 import math
 import re
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
 
 def parse_coordinate(coord_str):
     """
@@ -71,7 +74,11 @@ def distance(p1, p2):
     if lat2 is None: lat2 = parse_coordinate(p2.get('FRA Point Latitude', ''))
     if lon2 is None: lon2 = parse_coordinate(p2.get('FRA Point Longitude', ''))
 
-    R = 6371.0 # Radius of Earth in km
+    return haversine(lat1, lon1, lat2, lon2)
+
+def haversine(lat1, lon1, lat2, lon2):
+    """Haversine distance in km between two lat/lon pairs given in degrees."""
+    R = EARTH_RADIUS_KM
     
     dlat = math.radians(lat2 - lat1)
     dlon = math.radians(lon2 - lon1)
@@ -80,3 +87,25 @@ def distance(p1, p2):
     c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
     
     return R * c
+
+def haversine_many(lat, lon, lats, lons):
+    """
+    Batched haversine: distances in km from one lat/lon (degrees) to arrays
+    of lats/lons (degrees). Returns a NumPy array.
+    """
+    lat1 = math.radians(lat)
+    lat2 = np.radians(lats)
+    dlat = lat2 - lat1
+    dlon = np.radians(np.asarray(lons) - lon)
+    
+    a = np.sin(dlat / 2)**2 + math.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2)**2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    
+    return EARTH_RADIUS_KM * c
+
+def to_unit_vectors(lats, lons):
+    """Converts arrays of lat/lon (degrees) to an (N, 3) array of unit vectors."""
+    lat_r = np.radians(lats)
+    lon_r = np.radians(lons)
+    cos_lat = np.cos(lat_r)
+    return np.column_stack((cos_lat * np.cos(lon_r), cos_lat * np.sin(lon_r), np.sin(lat_r)))
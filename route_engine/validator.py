@@ -1,6 +1,9 @@
+import numpy as np
 from .utils import parse_fl
+from .points import parse_indicators
+from .config import DEFAULT_INTENDED_FL, DEFAULT_FLOS_DIRECTION
 
-def is_point_valid(point_data, intended_fl=320, direction='EAST'):
+def is_point_valid(point_data, intended_fl=DEFAULT_INTENDED_FL, direction=DEFAULT_FLOS_DIRECTION):
     """
     Checks if a point is valid based on FRA constraints:
     1. Level Availability
@@ -44,10 +47,51 @@ def allow_simulated_connection(p1, p2):
         return True, "Same Airspace"
     
     # Rule 2: Cross-Border Logic (Strict P1 "Push")
-    # P1 must explicitly list P2's airspace in its Cross-Border list.
-    cb1 = p1.get('Cross-Border FRA States', '')
+    # P1 must explicitly list P2's airspace in its Cross-Border list (whole indicators only).
+    cb1 = parse_indicators(p1.get('Cross-Border FRA States', ''))
     
-    if as2 and cb1 and as2 in cb1: 
+    if as2 and as2 in cb1: 
         return True, f"Cross-Border > {as2}"
     
     return False, None
+
+def is_node_valid(store, point_id, intended_fl=DEFAULT_INTENDED_FL, direction=DEFAULT_FLOS_DIRECTION):
+    """Same checks as is_point_valid, as a bit test on the PointStore's precomputed validity rows."""
+    return store.is_valid(point_id, intended_fl, direction)
+
+def allow_node_connection(store, id1, id2):
+    """
+    Same rules as allow_simulated_connection, on interned airspace ids and the
+    cross-border matrix of a PointStore.
+    Returns: (is_allowed, reason_string)
+    """
+    as1 = store.airspace_id[id1]
+    as2 = store.airspace_id[id2]
+    
+    if as1 >= 0 and as1 == as2:
+        return True, "Same Airspace"
+    
+    if store.allows_cross_border(id1, as2):
+        return True, f"Cross-Border > {store.airspaces[as2]}"
+    
+    return False, None
+
+def valid_mask(store, ids=None, intended_fl=DEFAULT_INTENDED_FL, direction=DEFAULT_FLOS_DIRECTION):
+    """Vectorized is_node_valid over an array of point ids (None = all). Returns a bool array."""
+    mask = store.valid_mask(intended_fl, direction)
+    return mask if ids is None else mask[ids]
+
+def connection_masks(store, src_id, ids):
+    """
+    Vectorized allow_node_connection from src_id to an array of point ids.
+    Returns (same_airspace_mask, cross_border_mask); cross-border is only set
+    where the airspaces differ.
+    """
+    as1 = store.airspace_id[src_id]
+    as2 = store.airspace_id[ids]
+    same = (as2 == as1) if as1 >= 0 else np.zeros(len(ids), dtype=bool)
+    
+    allowed = store.cross_border[store.cross_border_set[src_id]]
+    # allowed[-1] (no airspace) reads the last column; the (as2 >= 0) term discards it
+    cross = (as2 >= 0) & allowed[as2] & ~same
+    return same, cross